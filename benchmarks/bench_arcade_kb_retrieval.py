@@ -0,0 +1,121 @@
+"""
+Benchmark: search_arcade_kb "file" mode (whole markdown file) vs. "chunks" mode (top-k chunks + neighbours
+under ARCADE_KB_TOKEN_BUDGET).
+
+Offline part: builds a throwaway local index of the Arcade knowledge base with a hashing embedding and
+reports the tool-result size, the search latency and the prompt tokens the results add to a tool loop
+(a tool result returned in round i is re-sent in every later round).
+
+With --llm provider:model it also runs the real tool loop (call_llm with ARCADE_TOOLS, using the configured
+knowledge base) in both modes and reports the end-to-end latency.
+
+Usage:
+    python -m benchmarks.bench_arcade_kb_retrieval
+    python -m benchmarks.bench_arcade_kb_retrieval --llm openai:gpt-4o-mini
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_rag_query import QUERIES, HashingEmbeddingFunction
+from config import config
+from src.generation.arcade_tools import ARCADE_TOOLS, estimate_tokens, search_arcade_kb
+from src.rag_service.ingest_arcade import file_chunks
+from src.rag_service.kb_store import get_kb_store
+from src.rag_service.local_index import LocalClient
+
+MODES = ("file", "chunks")
+
+
+class _LocalRag:
+    """The part of RagService that search_arcade_kb uses, backed by a LocalCollection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def query(self, question: str, filters: dict = None, n_results: int = 3):
+        return self.collection.query(query_texts=[question], n_results=n_results, where=filters)
+
+
+def build_index(index_dir: str) -> _LocalRag:
+    collection = LocalClient(index_dir).get_or_create_collection("bench", HashingEmbeddingFunction())
+    ids, documents, metadatas = [], [], []
+    for kb_file in get_kb_store().files():
+        for chunk, metadata in file_chunks(kb_file):
+            ids.append(f"{kb_file.name}:{metadata['chunk_index']}")
+            documents.append(chunk)
+            metadatas.append(metadata)
+    for i in range(0, len(ids), 500):
+        collection.upsert(ids=ids[i:i + 500], documents=documents[i:i + 500], metadatas=metadatas[i:i + 500])
+    return _LocalRag(collection)
+
+
+def tool_loop_prompt_tokens(result_tokens: list[int], rounds: int) -> int:
+    # 第 i 輪 (0-based) 的 tool 結果會在之後每一輪的 prompt 中重新送出
+    return sum(tokens * (rounds - i) for i, tokens in enumerate(result_tokens[:rounds]))
+
+
+def run_offline(rag: _LocalRag, queries: list[str], rounds: int, searches: int) -> None:
+    print(f"{'mode':<8} {'tokens/result':>14} {'max':>7} {'search p50':>11} {'loop prompt tokens':>19}")
+    for mode in MODES:
+        tokens, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            result = search_arcade_kb(query, rag=rag, mode=mode)
+            latencies.append((time.perf_counter() - start) * 1000)
+            tokens.append(estimate_tokens(result))
+
+        # 每個 tool loop 做 `searches` 次搜尋
+        loops = [tokens[i:i + searches] for i in range(0, len(tokens) - searches + 1, searches)]
+        loop_tokens = statistics.mean(tool_loop_prompt_tokens(loop, rounds) for loop in loops)
+        print(f"{mode:<8} {statistics.mean(tokens):14.0f} {max(tokens):7d} {statistics.median(latencies):9.2f}ms "
+              f"{loop_tokens:19.0f}")
+
+
+def run_llm(provider: str, model: str, repeats: int) -> None:
+    from src.utils import call_llm
+
+    system_prompt = "You are an Arcade 3.0 expert. Use search_arcade_kb before answering."
+    user_prompt = "Write a minimal Arcade 3.0 window with a sprite that moves with the arrow keys."
+    original_mode = config.ARCADE_KB_RETRIEVAL_MODE
+    try:
+        for mode in MODES:
+            config.ARCADE_KB_RETRIEVAL_MODE = mode
+            durations = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                call_llm(system_prompt, user_prompt, provider=provider, model=model, tools=ARCADE_TOOLS)
+                durations.append(time.perf_counter() - start)
+            print(f"{mode:<8} end-to-end {statistics.mean(durations):.2f}s (mean of {repeats})")
+    finally:
+        config.ARCADE_KB_RETRIEVAL_MODE = original_mode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=5, help="Tool-loop rounds (call_llm uses 5)")
+    parser.add_argument("--searches", type=int, default=3, help="search_arcade_kb calls per tool loop")
+    parser.add_argument("--llm", default=None, help="provider:model for an end-to-end run")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+    print(f"top-k {config.ARCADE_KB_TOP_K}, token budget {config.ARCADE_KB_TOKEN_BUDGET}\n")
+
+    index_dir = tempfile.mkdtemp(prefix="bench_kb_retrieval_")
+    try:
+        run_offline(build_index(index_dir), queries, args.rounds, args.searches)
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    if args.llm:
+        provider, model = args.llm.split(":", 1)
+        print()
+        run_llm(provider, model, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
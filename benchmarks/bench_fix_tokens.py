@@ -0,0 +1,212 @@
+"""
+Benchmark: tokens per fix, full-file rewrite (FIXER_PROMPT) vs. patch mode (PATCH_FIXER_PROMPT).
+
+Offline part: a typical generated Arcade game with one Arcade 2.x call in ``on_draw``. The full-rewrite answer is
+the whole corrected file, the patch answer a single SEARCH/REPLACE block (checked to apply with
+src.testing.patcher). Reports the estimated prompt / response tokens of one fix in each mode.
+
+With --llm provider:model it runs the real arun_fix in both modes on a copy of the game and reports the
+estimated tokens, latency and whether the result passes static_code_check.
+
+Usage:
+    python -m benchmarks.bench_fix_tokens
+    python -m benchmarks.bench_fix_tokens --llm openai:gpt-4o-mini --repeats 3
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from config import config
+from src.generation.arcade_tools import estimate_tokens
+from src.testing import fixer
+from src.testing.patcher import apply_patch
+from src.testing.prompts import FIXER_PROMPT, PATCH_FIXER_PROMPT
+
+BROKEN_LINE = "            arcade.draw_rectangle_filled(x, y, CELL_SIZE - 2, CELL_SIZE - 2, color)"
+FIXED_LINE = "            arcade.draw_rect_filled(arcade.XYWH(x, y, CELL_SIZE - 2, CELL_SIZE - 2), color)"
+
+GAME = '''import random
+import arcade
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+CELL_SIZE = 20
+SNAKE_SPEED = 10
+
+
+class Food:
+    def __init__(self):
+        self.respawn()
+
+    def respawn(self):
+        self.x = random.randint(0, SCREEN_WIDTH // CELL_SIZE - 1)
+        self.y = random.randint(0, SCREEN_HEIGHT // CELL_SIZE - 1)
+
+
+class SnakeGame(arcade.Window):
+    def __init__(self):
+        super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, "Snake")
+        arcade.set_background_color(arcade.color.BLACK)
+        self.snake = [(10, 10), (9, 10), (8, 10)]
+        self.direction = (1, 0)
+        self.food = Food()
+        self.score = 0
+        self.timer = 0.0
+        self.game_over = False
+        self.score_text = arcade.Text("Score: 0", 10, SCREEN_HEIGHT - 30, arcade.color.WHITE, 16)
+
+    def on_draw(self):
+        self.clear()
+        for index, (cx, cy) in enumerate(self.snake):
+            x = cx * CELL_SIZE + CELL_SIZE / 2
+            y = cy * CELL_SIZE + CELL_SIZE / 2
+            color = arcade.color.GREEN if index else arcade.color.LIME_GREEN
+{broken_line}
+        fx = self.food.x * CELL_SIZE + CELL_SIZE / 2
+        fy = self.food.y * CELL_SIZE + CELL_SIZE / 2
+        arcade.draw_circle_filled(fx, fy, CELL_SIZE / 2 - 2, arcade.color.RED)
+        self.score_text.draw()
+        if self.game_over:
+            arcade.draw_text("GAME OVER - press R", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2,
+                             arcade.color.WHITE, 24, anchor_x="center")
+
+    def on_update(self, delta_time: float):
+        if self.game_over:
+            return
+        self.timer += delta_time
+        if self.timer < 1 / SNAKE_SPEED:
+            return
+        self.timer = 0.0
+        head_x, head_y = self.snake[0]
+        new_head = (head_x + self.direction[0], head_y + self.direction[1])
+        out_of_bounds = not (0 <= new_head[0] < SCREEN_WIDTH // CELL_SIZE and 0 <= new_head[1] < SCREEN_HEIGHT // CELL_SIZE)
+        if out_of_bounds or new_head in self.snake:
+            self.game_over = True
+            return
+        self.snake.insert(0, new_head)
+        if new_head == (self.food.x, self.food.y):
+            self.score += 1
+            self.score_text.text = f"Score: {{self.score}}"
+            self.food.respawn()
+        else:
+            self.snake.pop()
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.R and self.game_over:
+            self.__init_state()
+            return
+        turns = {{
+            arcade.key.UP: (0, 1), arcade.key.DOWN: (0, -1),
+            arcade.key.LEFT: (-1, 0), arcade.key.RIGHT: (1, 0),
+        }}
+        if key in turns:
+            dx, dy = turns[key]
+            if (dx, dy) != (-self.direction[0], -self.direction[1]):
+                self.direction = (dx, dy)
+
+    def __init_state(self):
+        self.snake = [(10, 10), (9, 10), (8, 10)]
+        self.direction = (1, 0)
+        self.score = 0
+        self.score_text.text = "Score: 0"
+        self.game_over = False
+
+
+def main():
+    SnakeGame()
+    arcade.run()
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+ERROR = ("Runtime Logic Error (Crashed, fuzz seed 1): Traceback (most recent call last):\n"
+         "  File \"main.py\", line 38, in on_draw\n"
+         "AttributeError: module 'arcade' has no attribute 'draw_rectangle_filled'")
+
+PATCH_RESPONSE = f"""<<<<<<< SEARCH
+            color = arcade.color.GREEN if index else arcade.color.LIME_GREEN
+{BROKEN_LINE}
+=======
+            color = arcade.color.GREEN if index else arcade.color.LIME_GREEN
+{FIXED_LINE}
+>>>>>>> REPLACE
+"""
+
+
+def run_offline() -> None:
+    broken = GAME.format(broken_line=BROKEN_LINE)
+    fixed = GAME.format(broken_line=FIXED_LINE)
+    patched, _ = apply_patch(broken, PATCH_RESPONSE)
+    assert patched == fixed, "patch did not produce the fixed game"
+
+    rows = [
+        ("full", FIXER_PROMPT.format(code=broken, error=ERROR), f"```python\n{fixed}```"),
+        ("patch", PATCH_FIXER_PROMPT.format(code=broken, error=ERROR), PATCH_RESPONSE),
+    ]
+    print(f"game: {len(broken.splitlines())} lines, ~{estimate_tokens(broken)} tokens (estimated, 4 chars / token)\n")
+    print(f"{'mode':<6} {'prompt':>8} {'response':>9} {'total':>7}")
+    totals = {}
+    for mode, prompt, response in rows:
+        totals[mode] = estimate_tokens(prompt) + estimate_tokens(response)
+        print(f"{mode:<6} {estimate_tokens(prompt):8d} {estimate_tokens(response):9d} {totals[mode]:7d}")
+    print(f"\nresponse tokens saved by patch mode: "
+          f"{1 - estimate_tokens(PATCH_RESPONSE) / estimate_tokens(fixed):.0%}, total: {1 - totals['patch'] / totals['full']:.0%}")
+
+
+def run_llm(provider: str, model: str, repeats: int) -> None:
+    calls = []
+    original_acall_llm = fixer.acall_llm
+
+    async def recording_acall_llm(system_prompt, user_prompt, *args, **kwargs):
+        response = await original_acall_llm(system_prompt, user_prompt, *args, **kwargs)
+        calls.append(estimate_tokens(user_prompt) + estimate_tokens(response))
+        return response
+
+    fixer.acall_llm = recording_acall_llm
+    directory = tempfile.mkdtemp(prefix="bench_fix_tokens_")
+    patch_mode = config.FIXER_PATCH_MODE
+    try:
+        print(f"\n{provider}/{model}, {repeats} fixes per mode")
+        print(f"{'mode':<6} {'tokens p50':>11} {'latency p50':>12} {'LLM calls':>10} {'syntax ok':>10}")
+        for mode in ("full", "patch"):
+            config.FIXER_PATCH_MODE = mode == "patch"
+            tokens, latencies, call_counts, passed = [], [], [], 0
+            for _ in range(repeats):
+                path = os.path.join(directory, "main.py")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(GAME.format(broken_line=BROKEN_LINE))
+                calls.clear()
+                start = time.perf_counter()
+                new_path, _ = asyncio.run(fixer.arun_fix(path, ERROR, provider, model, "logic"))
+                latencies.append(time.perf_counter() - start)
+                tokens.append(sum(calls))
+                call_counts.append(len(calls))
+                passed += bool(new_path) and fixer.static_code_check(new_path)[0]
+            print(f"{mode:<6} {statistics.median(tokens):11.0f} {statistics.median(latencies):11.2f}s "
+                  f"{statistics.mean(call_counts):10.1f} {passed:>6}/{repeats}")
+    finally:
+        config.FIXER_PATCH_MODE = patch_mode
+        fixer.acall_llm = original_acall_llm
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm", default=None, help="provider:model, runs the real fixer in both modes")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    run_offline()
+    if args.llm:
+        provider, model = args.llm.split(":", 1)
+        run_llm(provider, model, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark: spawn-to-first-frame latency of a fuzz run, fresh interpreter (Popen) vs. the warm fork server pool.
+
+Writes a minimal game to a temp dir, starts it the way run_fuzz_workers does and measures the time until the
+first heartbeat (the first simulated frame), which is mostly interpreter start-up plus importing
+pygame / arcade / pymunk / PIL. The pool's one-time fork server start-up is reported separately.
+
+``--entry script`` runs the same measurement from a script entry point whose import takes
+``--entry-import-seconds`` (like ``python app.py`` importing Flask and the frontend), instead of ``-m``.
+A pool whose forked runs re-import the caller's ``__main__`` shows that cost on every run.
+
+Usage:
+    python -m benchmarks.bench_fuzz_spawn --engine arcade --runs 10
+    python -m benchmarks.bench_fuzz_spawn --engine pygame --runs 10
+    python -m benchmarks.bench_fuzz_spawn --engine arcade --runs 10 --entry script
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from config import config
+from src.testing.fuzzer import PYGAME_SIM_CLOCK_PATH, _FuzzWorker, arcade_harness_command, inject_monkey_bot
+from src.testing.warm_pool import WarmInterpreterPool
+
+ARCADE_GAME = """
+import arcade
+import pymunk
+from PIL import Image
+
+
+class GameWindow(arcade.Window):
+    def __init__(self):
+        super().__init__(800, 600, "bench")
+        self.space = pymunk.Space()
+
+    def on_update(self, delta_time):
+        self.space.step(delta_time)
+
+
+def main():
+    GameWindow()
+    arcade.run()
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+PYGAME_GAME = """
+import pygame
+import pymunk
+from PIL import Image
+
+pygame.init()
+screen = pygame.display.set_mode((800, 600))
+clock = pygame.time.Clock()
+space = pymunk.Space()
+running = True
+while running:
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+    space.step(1 / 60)
+    clock.tick(60)
+"""
+
+
+# 從 script 入口 (而不是 -m) 執行量測；模組層級的 sleep 模擬 app.py import Flask / frontend 的成本
+ENTRY_SCRIPT = """
+import sys
+import time
+
+time.sleep({import_seconds})
+sys.path.insert(0, {root!r})
+
+from benchmarks.bench_fuzz_spawn import run
+
+if __name__ == "__main__":
+    run({engine!r}, {runs})
+"""
+
+
+def write_game(directory: str, engine: str) -> list[str]:
+    """:return: the command run_fuzz_workers would use for this game"""
+    game_path = os.path.join(directory, "main.py")
+    if engine == "arcade":
+        with open(game_path, "w", encoding="utf-8") as f:
+            f.write(ARCADE_GAME)
+        return arcade_harness_command(game_path)
+
+    temp_file = os.path.join(directory, "main_fuzz_temp.py")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(inject_monkey_bot(PYGAME_GAME, "pass"))
+    return [sys.executable, PYGAME_SIM_CLOCK_PATH, temp_file]
+
+
+def first_frame_latency(command: list[str], env: dict, pool, timeout: float = 30.0) -> float:
+    start = time.perf_counter()
+    worker = _FuzzWorker(0, command, env, pool)
+    try:
+        while worker.last_beat is None:
+            if worker.process.poll() is not None:
+                raise RuntimeError(f"game exited before its first frame:\n{worker.stderr[-2000:]}")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError("no frame within the timeout")
+            time.sleep(0.002)
+        return time.perf_counter() - start
+    finally:
+        worker.stop()
+
+
+def report(label: str, latencies: list[float]) -> None:
+    ms = sorted(latency * 1000 for latency in latencies)
+    print(f"{label:<8} p50 {statistics.median(ms):8.1f} ms   min {ms[0]:8.1f} ms   max {ms[-1]:8.1f} ms")
+
+
+def run(engine: str, runs: int) -> None:
+    env = os.environ.copy()
+    env.update({"SDL_AUDIODRIVER": "dummy", "SDL_VIDEODRIVER": "dummy"})
+    if config.FUZZER_ARCADE_HEADLESS:
+        env["ARCADE_HEADLESS"] = "1"
+
+    directory = tempfile.mkdtemp(prefix="bench_fuzz_spawn_")
+    try:
+        command = write_game(directory, engine)
+
+        popen = [first_frame_latency(command, env, None) for _ in range(runs)]
+
+        start = time.perf_counter()
+        pool = WarmInterpreterPool(
+            preload=[name.strip() for name in config.FUZZER_WARM_POOL_PRELOAD.split(",") if name.strip()],
+            headless_arcade=config.FUZZER_ARCADE_HEADLESS
+        )
+        try:
+            warm_up = first_frame_latency(command, env, pool)
+            print(f"fork server start-up + first run: {(time.perf_counter() - start) * 1000:.1f} ms "
+                  f"(first run {warm_up * 1000:.1f} ms)\n")
+            pooled = [first_frame_latency(command, env, pool) for _ in range(runs)]
+        finally:
+            pool.close()
+
+        print(f"{engine}: spawn-to-first-frame over {runs} runs")
+        report("popen", popen)
+        report("pool", pooled)
+        print(f"\nspeed-up (p50): {statistics.median(popen) / statistics.median(pooled):.1f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_from_script(engine: str, runs: int, import_seconds: float) -> None:
+    directory = tempfile.mkdtemp(prefix="bench_fuzz_entry_")
+    try:
+        entry = os.path.join(directory, "app.py")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with open(entry, "w", encoding="utf-8") as f:
+            f.write(ENTRY_SCRIPT.format(import_seconds=import_seconds, root=root, engine=engine, runs=runs))
+        print(f"entry point: python {entry} (import takes {import_seconds:.1f}s)\n")
+        subprocess.run([sys.executable, entry], check=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=("arcade", "pygame"), default="arcade")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--entry", choices=("module", "script"), default="module",
+                        help="measure from this -m module or from a script entry point (like python app.py)")
+    parser.add_argument("--entry-import-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.entry == "script":
+        run_from_script(args.engine, args.runs, args.entry_import_seconds)
+    else:
+        run(args.engine, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: import-time cost of the Flask app (`import app`).
+
+Runs a fresh interpreter with `python -X importtime`, reports the total import time and the slowest
+top-level packages, and exits with status 1 when the total exceeds --max-ms (for catching startup
+regressions in CI).
+
+Usage:
+    python -m benchmarks.bench_import_time --module app --top 15 --max-ms 3000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> tuple[float, dict[str, int], str]:
+    """
+    :return: (wall-clock seconds, self-time microseconds per top-level package, stderr of the run)
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise RuntimeError(f"`import {module}` failed:\n{result.stderr[-2000:]}")
+
+    # 每一行格式: "import time: <self us> | <cumulative us> | <indent><module name>"
+    # 以 self time 依最外層 package 加總，才不會把子模組重複計算
+    per_package: dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        per_package[name.strip().split(".")[0]] += int(self_us)
+    return elapsed, per_package, result.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the total import time exceeds this")
+    parser.add_argument("--forbid", nargs="*", default=["chromadb"],
+                        help="Packages that must not be imported at startup")
+    args = parser.parse_args()
+
+    elapsed, per_package, stderr = measure(args.module)
+    total_ms = sum(per_package.values()) / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms of imports, {elapsed * 1000:.1f} ms process wall-clock\n")
+    for name, us in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+
+    failed = False
+    imported = {line.rsplit("|", 1)[-1].strip().split(".")[0] for line in stderr.splitlines() if "|" in line}
+    for name in args.forbid:
+        if name in imported:
+            print(f"\n❌ `{name}` is imported at startup (should be lazy)")
+            failed = True
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\n❌ Import time {total_ms:.1f} ms exceeds the budget of {args.max_ms:.1f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
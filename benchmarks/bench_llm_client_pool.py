@@ -0,0 +1,120 @@
+"""
+Benchmark: per-call overhead of a fresh LLM client vs. the pooled client registry.
+
+A local stub server mimics the OpenAI `/v1/chat/completions` and the Ollama
+`/api/chat` endpoints, so the numbers only contain client construction,
+connection setup and HTTP round trip costs (no model latency).
+
+Usage:
+    python -m benchmarks.bench_llm_client_pool --calls 50
+"""
+import argparse
+import contextlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import requests
+
+from config import config
+from src.utils import call_ollama, get_async_openai_client, run_sync
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    wbufsize = -1  # headers + body in one write, avoids Nagle / delayed-ACK stalls on reused sockets
+
+    def setup(self):
+        super().setup()
+        self.server.connection_count += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        if self.path.endswith("/chat/completions"):
+            body = {
+                "id": "stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "stub",
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "PASS"}
+                }]
+            }
+        else:
+            body = {"model": "stub", "message": {"role": "assistant", "content": "PASS"}, "done": True}
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.connection_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _measure(label: str, server: ThreadingHTTPServer, calls: int, fn) -> None:
+    server.connection_count = 0
+    fn()  # warm up (imports, first connection)
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / calls * 1000:8.2f} ms/call   connections opened: {server.connection_count}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    messages = [{"role": "user", "content": "ping"}]
+
+    def openai_fresh():
+        client = openai.OpenAI(api_key="stub", base_url=f"{base}/v1")
+        client.chat.completions.create(model="stub", messages=messages)
+
+    async def _openai_pooled():
+        client = get_async_openai_client("bench", f"{base}/v1", "stub")
+        await client.chat.completions.create(model="stub", messages=messages)
+
+    def openai_pooled():
+        run_sync(_openai_pooled())
+
+    def ollama_fresh():
+        requests.post(f"{base}/api/chat", json={"model": "stub", "messages": messages}, timeout=30).json()
+
+    config.OLLAMA_BASE_URL = base
+
+    def ollama_pooled():
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_ollama("system", "ping", "stub", 0.0)
+
+    print(f"Stub server: {base} ({args.calls} calls each)\n")
+    _measure("openai: new client per call", server, args.calls, openai_fresh)
+    _measure("openai: pooled client", server, args.calls, openai_pooled)
+    _measure("ollama: requests.post per call", server, args.calls, ollama_fresh)
+    _measure("ollama: pooled client", server, args.calls, ollama_pooled)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark: query latency of the local vector index (CHROMA_CLIENT_TYPE=local) vs. a Chroma HTTP server.
+
+The corpus is the Arcade knowledge base split into fixed-size chunks. Embeddings come from a deterministic
+hashing embedding (no model server needed), so the numbers measure the index / transport, not the model.
+
+Usage:
+    python -m benchmarks.bench_rag_query --queries 200
+    python -m benchmarks.bench_rag_query --spawn-chroma                       # start `chroma run` on a temp dir
+    python -m benchmarks.bench_rag_query --http-host localhost --http-port 8000
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+from config import config
+from src.rag_service.local_index import LocalClient
+
+QUERIES = [
+    "how to move a sprite", "draw a filled rectangle", "camera scrolling", "play a sound",
+    "physics engine platformer", "sprite list collision", "keyboard input on_key_press",
+    "load a texture", "draw text on screen", "tile map loading", "particle emitter", "gui button",
+]
+
+
+class HashingEmbeddingFunction(EmbeddingFunction):
+    """Feature-hashing bag of words; deterministic and fast, good enough to exercise the index."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = np.zeros((len(input), self.dim), dtype=np.float32)
+        for row, text in enumerate(input):
+            for token in re.findall(r"\w+", text.lower()):
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                vectors[row, int.from_bytes(digest[:4], "little") % self.dim] += 1.0
+        return [vector for vector in vectors]
+
+
+def load_chunks(limit: int, chunk_chars: int = 1200) -> tuple[list[str], list[dict]]:
+    documents, metadatas = [], []
+    for path in sorted(Path(config.ARCADE_SOURCE_DIR).glob("*.md")):
+        text = path.read_text(encoding="utf-8")
+        for start in range(0, len(text), chunk_chars):
+            chunk = text[start:start + chunk_chars]
+            if len(chunk.strip()) < 10:
+                continue
+            documents.append(chunk)
+            metadatas.append({"file_name": path.name})
+            if len(documents) >= limit:
+                return documents, metadatas
+    return documents, metadatas
+
+
+def fill(collection, documents: list[str], metadatas: list[dict], batch_size: int = 200) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(documents), batch_size):
+        collection.upsert(
+            ids=[f"chunk-{j}" for j in range(i, min(i + batch_size, len(documents)))],
+            documents=documents[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size]
+        )
+    return time.perf_counter() - start
+
+
+def measure(collection, queries: list[str], n_results: int) -> tuple[list[float], list[str]]:
+    latencies, top_ids = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_texts=[query], n_results=n_results)
+        latencies.append((time.perf_counter() - start) * 1000)
+        top_ids.append(result["ids"][0][0] if result["ids"][0] else None)
+    return latencies, top_ids
+
+
+def report(name: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<22} mean {statistics.mean(latencies):7.2f} ms   p50 {statistics.median(latencies):7.2f} ms   "
+          f"p95 {p95:7.2f} ms")
+
+
+def spawn_chroma(port: int) -> tuple[subprocess.Popen, str]:
+    data_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    process = subprocess.Popen(
+        ["chroma", "run", "--path", data_dir, "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    import requests
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://localhost:{port}/api/v2/heartbeat", timeout=1).ok:
+                return process, data_dir
+        except requests.RequestException:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError("chroma server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000, help="Maximum number of chunks to index")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=1)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--http-host", default=None)
+    parser.add_argument("--http-port", type=int, default=8000)
+    parser.add_argument("--spawn-chroma", action="store_true", help="Start a throwaway `chroma run` server")
+    args = parser.parse_args()
+
+    ef = HashingEmbeddingFunction(args.dim)
+    documents, metadatas = load_chunks(args.docs)
+    queries = [QUERIES[i % len(QUERIES)] + f" {i}" for i in range(args.queries)]
+    print(f"Corpus: {len(documents)} chunks, dim {args.dim}, {len(queries)} queries, top-{args.n_results}\n")
+
+    index_dir = tempfile.mkdtemp(prefix="bench_local_index_")
+    chroma_process, chroma_dir = None, None
+    try:
+        local = LocalClient(index_dir).get_or_create_collection("bench", embedding_function=ef)
+        print(f"local: indexed in {fill(local, documents, metadatas):.2f}s")
+
+        # 重新開啟，確認量到的是 memmap 讀取 (而不是剛寫入時的記憶體)
+        local = LocalClient(index_dir).get_or_create_collection("bench", embedding_function=ef)
+        local_latencies, local_top = measure(local, queries, args.n_results)
+
+        results = [("local (exact)", local_latencies)]
+
+        if args.spawn_chroma or args.http_host:
+            import chromadb
+            if args.spawn_chroma:
+                chroma_process, chroma_dir = spawn_chroma(args.http_port)
+            client = chromadb.HttpClient(host=args.http_host or "localhost", port=args.http_port)
+            remote = client.get_or_create_collection(
+                "bench_rag_query", embedding_function=ef, metadata={"hnsw:space": "cosine"}
+            )
+            print(f"http:  indexed in {fill(remote, documents, metadatas):.2f}s")
+            remote_latencies, remote_top = measure(remote, queries, args.n_results)
+            results.append(("chroma http", remote_latencies))
+            if not args.spawn_chroma:
+                client.delete_collection("bench_rag_query")
+
+            agreement = sum(a == b for a, b in zip(local_top, remote_top)) / len(queries)
+            print(f"top-1 agreement local vs. http: {agreement:.0%}")
+        else:
+            print("(pass --spawn-chroma or --http-host to compare against a Chroma HTTP server)")
+
+        print()
+        for name, latencies in results:
+            report(name, latencies)
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+        if chroma_process is not None:
+            chroma_process.terminate()
+            chroma_process.wait()
+            shutil.rmtree(chroma_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
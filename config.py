@@ -20,6 +20,14 @@ def get_env_int(var_name, default=0):
         return default
 
 
+def get_env_float(var_name, default=0.0):
+    """將環境變數轉換為 Float"""
+    try:
+        return float(os.getenv(var_name, default))
+    except (ValueError, TypeError):
+        return default
+
+
 def get_env_ssl_verify(var_name, default=True):
     """
     處理特殊的 SSL_VERIFY:
@@ -65,8 +73,88 @@ class Config:
     OLLAMA_API_KEY = os.getenv("OLLAMA_API_KEY")
     OLLAMA_MODEL_NAME = os.getenv("OLLAMA_MODEL_NAME", "llama3:8b")
 
+    # LLM client pool (process-wide keep-alive connections)
+    LLM_POOL_MAXSIZE = get_env_int("LLM_POOL_MAXSIZE", 20)
+    LLM_KEEPALIVE_EXPIRY = get_env_int("LLM_KEEPALIVE_EXPIRY", 60)
+    # 每個 provider 同時進行中的請求上限 (對應 provider 的 rate limit)
+    LLM_MAX_CONCURRENT_REQUESTS = get_env_int("LLM_MAX_CONCURRENT_REQUESTS", 8)
+
+    # LLM response cache (opt-in, on-disk, content-addressed)
+    LLM_CACHE_ENABLED = get_env_bool("LLM_CACHE_ENABLED", False)
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".llm_cache"))
+    LLM_CACHE_MAX_ENTRIES = get_env_int("LLM_CACHE_MAX_ENTRIES", 2000)
+    LLM_CACHE_MAX_BYTES = get_env_int("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    LLM_CACHE_TTL = get_env_int("LLM_CACHE_TTL", 7 * 24 * 3600)  # 秒，0 = 不過期
+    # 只快取 temperature <= 門檻的呼叫 (輸出較穩定)
+    LLM_CACHE_DETERMINISTIC_ONLY = get_env_bool("LLM_CACHE_DETERMINISTIC_ONLY", True)
+    LLM_CACHE_TEMPERATURE_THRESHOLD = get_env_float("LLM_CACHE_TEMPERATURE_THRESHOLD", 0.0)
+
+    # Core phase: Planner 是否要等美術素材 (JSON) 完成才開始 (False = 直接以 GDD 為草稿平行規劃)
+    CORE_PLANNER_WAITS_FOR_ASSETS = get_env_bool("CORE_PLANNER_WAITS_FOR_ASSETS", False)
+
+    # Background jobs (game generation queue)
+    JOB_WORKERS = get_env_int("JOB_WORKERS", 4)
+    JOB_QUEUE_MAX = get_env_int("JOB_QUEUE_MAX", 100)
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(os.path.dirname(__file__), ".jobs", "jobs.sqlite3"))
+    JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "output")
+    # Token delta 累積多少字元 / 幾秒才寫入一次 job event
+    JOB_DELTA_FLUSH_CHARS = get_env_int("JOB_DELTA_FLUSH_CHARS", 512)
+    JOB_DELTA_FLUSH_INTERVAL = get_env_float("JOB_DELTA_FLUSH_INTERVAL", 0.25)
+    JOB_STREAM_POLL_INTERVAL = get_env_float("JOB_STREAM_POLL_INTERVAL", 0.2)
+
     # Fuzzer
     FUZZER_RUNNING_TIME = 30
+    # 心跳 (heartbeat)：每個 worker 跑滿 FUZZER_MIN_FRAMES 個 frame 且處理 FUZZER_MIN_EVENTS 個 event 就提早判定通過；
+    # 連續收到 FUZZER_STEADY_BEATS 次間隔正常 (約 0.1 秒) 的心跳後，超過 FUZZER_HANG_TIMEOUT 秒沒有心跳判定為卡死；
+    # FUZZER_STARTUP_TIMEOUT 秒內沒有第一次心跳，或只有零星幾次心跳 (機器人注入到的 while 不是真正的主迴圈，
+    # 例如只跑一下的 spawn-retry / BFS 迴圈) 則退回「撐過 duration 秒」的判斷
+    FUZZER_MIN_FRAMES = get_env_int("FUZZER_MIN_FRAMES", 300)
+    FUZZER_MIN_EVENTS = get_env_int("FUZZER_MIN_EVENTS", 20)
+    FUZZER_HANG_TIMEOUT = get_env_float("FUZZER_HANG_TIMEOUT", 5.0)
+    FUZZER_STARTUP_TIMEOUT = get_env_float("FUZZER_STARTUP_TIMEOUT", 15.0)
+    FUZZER_STEADY_BEATS = get_env_int("FUZZER_STEADY_BEATS", 10)
+    # 模擬時脈：pygame 的 Clock.tick 不再 sleep (SDL_VIDEODRIVER=dummy)，遊戲以 CPU 能跑的最快速度前進；
+    # 每個 worker 至少要跑滿 FUZZER_SIMULATED_SECONDS 秒的遊戲時間才提早判定通過
+    FUZZER_SIMULATED_CLOCK = get_env_bool("FUZZER_SIMULATED_CLOCK", True)
+    FUZZER_SIMULATED_SECONDS = get_env_float("FUZZER_SIMULATED_SECONDS", 60.0)
+    # Arcade 遊戲 (arcade.run()) 改用 src/testing/arcade_harness.py 驅動：模擬的 frame 數 (60 frame = 1 秒遊戲時間)、
+    # 每幾個 frame 呼叫一次 on_draw (0 = 完全不繪製)、是否以 ARCADE_HEADLESS (EGL 無視窗) 建立 window
+    FUZZER_ARCADE_FRAMES = get_env_int("FUZZER_ARCADE_FRAMES", 3600)
+    FUZZER_ARCADE_DRAW_INTERVAL = get_env_int("FUZZER_ARCADE_DRAW_INTERVAL", 60)
+    FUZZER_ARCADE_HEADLESS = get_env_bool("FUZZER_ARCADE_HEADLESS", True)
+    # Warm pool：fuzz 的遊戲行程改由預先 import 好遊戲函式庫的 fork server (fork_server.py) fork 出來 (省下每次啟動 import 的時間)
+    FUZZER_WARM_POOL = get_env_bool("FUZZER_WARM_POOL", True)
+    FUZZER_WARM_POOL_PRELOAD = os.getenv("FUZZER_WARM_POOL_PRELOAD", "pygame,arcade,pymunk,PIL.Image,PIL.ImageDraw")
+    # 每次 fuzz 執行的資源上限 (0 = 不限制)：位址空間 (MB) 與 CPU 時間 (秒)
+    FUZZER_MEMORY_LIMIT_MB = get_env_int("FUZZER_MEMORY_LIMIT_MB", 4096)
+    FUZZER_CPU_LIMIT_SECONDS = get_env_int("FUZZER_CPU_LIMIT_SECONDS", 120)
+    # RLIMIT_NPROC 計算的是整個使用者的行程 + thread 數 (包含 Web server)，所以上限 = 目前數量 + FUZZER_PROCESS_HEADROOM
+    FUZZER_PROCESS_HEADROOM = get_env_int("FUZZER_PROCESS_HEADROOM", 64)
+    FUZZER_MAX_OPEN_FILES = get_env_int("FUZZER_MAX_OPEN_FILES", 256)
+    # 遊戲的 stdout / stderr 各只保留最後這麼多 bytes (ring buffer)
+    FUZZER_OUTPUT_LIMIT_BYTES = get_env_int("FUZZER_OUTPUT_LIMIT_BYTES", 64 * 1024)
+    # 平行 fuzz worker 數量 (上限為 CPU 核心數)，每個 worker 使用不同的 seed
+    FUZZER_WORKERS = get_env_int("FUZZER_WORKERS", 4)
+    # 固定的起始 seed (worker i 使用 FUZZER_SEED + i)，未設定時隨機產生；crash 訊息會附上 seed 以便重現
+    FUZZER_SEED = get_env_int("FUZZER_SEED", None)
+
+    # Fixer
+    # Speculative 修復：每次同時向 LLM 要 K 個修復候選並平行驗證，第一個通過所有檢查的勝出 (1 = 關閉)
+    FIXER_SPECULATIVE_CANDIDATES = get_env_int("FIXER_SPECULATIVE_CANDIDATES", 1)
+    # 候選依序使用的 temperature (逗號分隔，不足 K 個時循環使用)
+    FIXER_CANDIDATE_TEMPERATURES = os.getenv("FIXER_CANDIDATE_TEMPERATURES", "0.2,0.6,1.0")
+    # Patch 模式：LLM 只回傳 SEARCH/REPLACE 區塊 (或 unified diff) 而非整份程式碼，套用失敗時才改要求完整重寫
+    FIXER_PATCH_MODE = get_env_bool("FIXER_PATCH_MODE", True)
+    # Patch 區塊無法完全 (或忽略空白後) 對上時，採用相似度 >= 此門檻的最相近區塊
+    FIXER_PATCH_FUZZY_THRESHOLD = get_env_float("FIXER_PATCH_FUZZY_THRESHOLD", 0.85)
+    # 邏輯審查：rules = 只跑 AST 規則 (src/testing/static_rules.py)；rules+llm = 規則通過後才做 LLM 審查；llm = 只用 LLM
+    LOGIC_REVIEW_MODE = os.getenv("LOGIC_REVIEW_MODE", "rules+llm")
+    # 回報給 Fixer 的靜態規則問題數上限
+    STATIC_RULES_MAX_DIAGNOSTICS = get_env_int("STATIC_RULES_MAX_DIAGNOSTICS", 20)
+    # 語法通過後，邏輯審查與 Fuzzer 同時執行；其中一項失敗後最多再等另一項 FIXER_PIPELINE_MERGE_WINDOW 秒，
+    # 也失敗就把兩個錯誤合併成一次修復，否則取消它
+    FIXER_PIPELINED_CHECKS = get_env_bool("FIXER_PIPELINED_CHECKS", True)
+    FIXER_PIPELINE_MERGE_WINDOW = get_env_float("FIXER_PIPELINE_MERGE_WINDOW", 3.0)
 
     # Embedding model
     LLM_EMBEDDING_PROVIDER = os.getenv("LLM_EMBEDDING_PROVIDER")
@@ -74,15 +162,35 @@ class Config:
     LLM_EMBEDDING_SERVER_PORT = os.getenv("LLM_EMBEDDING_SERVER_PORT", "")
     LLM_EMBEDDING_MODEL_TYPE = os.getenv("LLM_EMBEDDING_MODEL_TYPE")
     LLM_EMBEDDING_CLIENT_TOKEN = os.getenv("LLM_EMBEDDING_CLIENT_TOKEN")
+    # Ollama /api/embed 批次設定：每個 request 幾筆文件、同時幾個 request、失敗重試次數與 backoff (秒)
+    LLM_EMBEDDING_BATCH_SIZE = get_env_int("LLM_EMBEDDING_BATCH_SIZE", 32)
+    LLM_EMBEDDING_MAX_IN_FLIGHT = get_env_int("LLM_EMBEDDING_MAX_IN_FLIGHT", 4)
+    LLM_EMBEDDING_MAX_RETRIES = get_env_int("LLM_EMBEDDING_MAX_RETRIES", 3)
+    LLM_EMBEDDING_RETRY_BACKOFF = get_env_float("LLM_EMBEDDING_RETRY_BACKOFF", 1.0)
 
     # Chroma
     CHROMA_TENANT = os.getenv("CHROMA_TENANT", "default_tenant")
     CHROMA_DATABASE = os.getenv("CHROMA_DATABASE")
     CHROMA_COLLECTION_NAME = os.getenv("CHROMA_COLLECTION_NAME")
 
-    # Chroma client type(http, cloud)
+    # Chroma client type(http, cloud, local)
     CHROMA_CLIENT_TYPE = os.getenv("CHROMA_CLIENT_TYPE")
 
+    # RagService.query 的檢索方式: "vector" (embedding)、"lexical" (BM25，不需要 embedding) 或 "hybrid" (兩者以 RRF 融合)
+    # BM25 索引需要下載整個 collection (remote Chroma 時較花時間)，在背景建立；建好前 hybrid 只用向量搜尋
+    RAG_QUERY_MODE = os.getenv("RAG_QUERY_MODE", "hybrid")
+    # hybrid 模式下兩邊各取幾個候選再融合，以及 reciprocal rank fusion 的 k
+    RAG_HYBRID_CANDIDATES = get_env_int("RAG_HYBRID_CANDIDATES", 20)
+    RAG_RRF_K = get_env_int("RAG_RRF_K", 60)
+    # RagService.query 的 LRU cache 大小：查詢結果 / query embedding (0 = 關閉)
+    RAG_QUERY_CACHE_SIZE = get_env_int("RAG_QUERY_CACHE_SIZE", 256)
+    RAG_EMBEDDING_CACHE_SIZE = get_env_int("RAG_EMBEDDING_CACHE_SIZE", 1024)
+
+    # Local vector index (CHROMA_CLIENT_TYPE=local): memory-mapped NumPy 矩陣 + JSON metadata，不需要 Chroma server
+    RAG_LOCAL_INDEX_DIR = os.getenv("RAG_LOCAL_INDEX_DIR", os.path.join(os.path.dirname(__file__), ".rag_index"))
+    # 資料量達到此數量且有安裝 hnswlib 時改用 ANN (HNSW) 搜尋
+    RAG_LOCAL_ANN_MIN_SIZE = get_env_int("RAG_LOCAL_ANN_MIN_SIZE", 20000)
+
     # Chroma cloud
     CHROMA_TOKEN = os.getenv("CHROMA_TOKEN")
 
@@ -99,5 +207,15 @@ class Config:
     # Arcade config
     ARCADE_SOURCE_DIR = os.path.join(os.path.dirname(__file__), "arcade_rag_knowledge_base")
     ARCADE_COLLECTION_NAME = "arcade_v3_knowledge"
+    # search_arcade_kb 的檢索方式: "chunks" (top-k chunks + 相鄰 chunk，受 token 預算限制) 或 "file" (整個檔案)
+    ARCADE_KB_RETRIEVAL_MODE = os.getenv("ARCADE_KB_RETRIEVAL_MODE", "chunks")
+    ARCADE_KB_TOP_K = get_env_int("ARCADE_KB_TOP_K", 4)
+    ARCADE_KB_TOKEN_BUDGET = get_env_int("ARCADE_KB_TOKEN_BUDGET", 1500)
+    # 知識庫檔案在記憶體中的 store 多久檢查一次檔案是否變更 (秒)
+    ARCADE_KB_STORE_CHECK_INTERVAL = get_env_float("ARCADE_KB_STORE_CHECK_INTERVAL", 2.0)
+    # Ingest: manifest (檔案 hash / chunk ids) 的位置、切分用的 process 數 (0 = CPU 核心數)、每累積幾個 chunk 寫入一次
+    ARCADE_INGEST_MANIFEST_DIR = os.getenv("ARCADE_INGEST_MANIFEST_DIR", os.path.join(os.path.dirname(__file__), ".rag_manifest"))
+    ARCADE_INGEST_WORKERS = get_env_int("ARCADE_INGEST_WORKERS", 0)
+    ARCADE_INGEST_FLUSH_SIZE = get_env_int("ARCADE_INGEST_FLUSH_SIZE", 512)
 
 config = Config()
\ No newline at end of file
@@ -1,19 +1,32 @@
-from src.utils import call_llm
+from src.utils import acall_llm, run_sync, DeltaCallback
+from typing import Optional
 from src.design.prompts import CEO_PROMPT, CPO_PROMPT
 
 
-def run_design_phase(user_input, provider="openai", model="gpt-4o-mini"):
+async def arun_design_phase(user_input, provider="openai", model="gpt-4o-mini", on_delta: Optional[DeltaCallback] = None):
     """
     流程：User -> CEO (分析) -> CPO (規則化) -> GDD
+    on_delta: 若有傳入，CEO / CPO 的輸出會以 token delta 即時串流出去
     """
     print(f"[Member 1] 收到需求: {user_input}")
 
     # 1. CEO 分析
-    ceo_response = call_llm(CEO_PROMPT, user_input, provider=provider, model=model)
+    if on_delta:
+        on_delta("\n--- CEO ---\n")
+    ceo_response = await acall_llm(CEO_PROMPT, user_input, provider=provider, model=model, on_delta=on_delta)
     print(f"[Member 1] CEO 分析完成: {ceo_response[:50]}...")
 
     # 2. CPO 產出文件
     cpo_input = f"用戶想法: {user_input}\nCEO 分析: {ceo_response}"
-    gdd_context = call_llm(CPO_PROMPT, cpo_input, provider=provider, model=model)
+    if on_delta:
+        on_delta("\n--- CPO (GDD) ---\n")
+    gdd_context = await acall_llm(CPO_PROMPT, cpo_input, provider=provider, model=model, on_delta=on_delta)
 
-    return gdd_context
\ No newline at end of file
+    return gdd_context
+
+
+def run_design_phase(user_input, provider="openai", model="gpt-4o-mini", on_delta: Optional[DeltaCallback] = None):
+    """
+    arun_design_phase 的同步版本
+    """
+    return run_sync(arun_design_phase(user_input, provider, model, on_delta))
@@ -1,12 +1,15 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, stream_with_context
+import time
+from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, stream_with_context, jsonify
 from flask_session import Session
 from config import config
 
-from src.design.chains import run_design_phase
-from src.generation.core import run_core_phase
 from src.testing.runner import launch_game
 from src.testing.fixer import run_fix_loop
+from src.llm_cache import get_llm_cache
+from src.jobs.manager import get_job_manager
+from src.jobs.store import FINISHED_STATES
+from src.utils import format_sse
 
 app = Flask(__name__)
 # --- Flask session config ---
@@ -44,19 +47,12 @@ def index():
                     flash("請輸入遊戲點子！", "warning")
                     return redirect(url_for("index"))
 
-                # --- Phase 1: Design ---
-                session['gdd_result_global'] = run_design_phase(user_input, provider, model_name)
-                # --- Phase 2: Core ---
-                session['game_file_path_global'] = run_core_phase(session.get('gdd_result_global'), provider, model_name)
-
-                print("[Member 2] Generation complete")
-
-                if session.get('game_file_path_global'):
-                    session['auto_start_fix'] = True
-                    flash("核心代碼生成完畢，準備開始驗證...", "info")
-                else:
-                    flash("❌ 程式碼生成失敗，未能解析出 Python Block。", "danger")
-
+                # 生成流程交給背景 job 執行，HTTP request 立即返回；進度由 /jobs/<id>/stream 推送
+                job_id = get_job_manager().submit(user_input, provider, model_name)
+                if not job_id:
+                    flash("目前排隊的生成任務已滿，請稍後再試。", "warning")
+                    return redirect(url_for("index"))
+                session['job_id'] = job_id
 
             elif action == "launch_game":
                 path = session.get('game_file_path_global')
@@ -72,21 +68,106 @@ def index():
 
         return redirect(url_for("index"))
     # --- Get ---
+    active_job_id = None
+    job_id = session.get('job_id')
+    if job_id:
+        job = get_job_manager().store.get_job(job_id)
+        if job is None:
+            session.pop('job_id', None)
+        elif job['status'] in FINISHED_STATES:
+            session.pop('job_id', None)
+            session['gdd_result_global'] = job['gdd']
+            session['game_file_path_global'] = job['game_file_path']
+            if job['verified']:
+                flash("✅ 遊戲生成完畢，並通過所有驗證！", "success")
+            elif job['game_file_path']:
+                flash("⚠️ 遊戲已生成，但未通過全部驗證。", "warning")
+            else:
+                flash(f"❌ 生成失敗: {job['error']}", "danger")
+        else:
+            active_job_id = job_id
+
     file_content = None
     path = session.get('game_file_path_global')
     if path and os.path.exists(path):
         with open(path, "r", encoding="utf-8") as f:
             file_content = f.read()
-    auto_start_fix = session.pop('auto_start_fix', None)
 
     return render_template("index.html",
                            gdd_result=session.get('gdd_result_global'),
                            game_file_path=session.get('game_file_path_global'),
                            file_content=file_content,
                            providers=PROVIDERS,
-                           auto_start_fix=auto_start_fix
+                           active_job_id=active_job_id
     )
 
+
+@app.route('/jobs', methods=["POST"])
+def create_job():
+    """
+    Enqueue a generation job. Accepts JSON or form fields: provider, user_input.
+    """
+    data = request.get_json(silent=True) or request.form
+    provider = data.get("provider", "openai").lower()
+    user_input = data.get("user_input", "").strip()
+    model_name = os.getenv(f"{provider.upper()}_MODEL_NAME")
+
+    if provider not in PROVIDERS:
+        return jsonify({"error": f"不支援的 Provider: {provider}"}), 400
+    if not user_input:
+        return jsonify({"error": "user_input is required"}), 400
+    if not os.getenv(f"{provider.upper()}_API_KEY") or not model_name:
+        return jsonify({"error": f"{provider} API Key 或 Model Name 尚未設定！"}), 400
+
+    job_id = get_job_manager().submit(user_input, provider, model_name)
+    if not job_id:
+        return jsonify({"error": "Job queue is full"}), 503
+    return jsonify({"job_id": job_id, "status_url": url_for("job_status", job_id=job_id),
+                    "stream_url": url_for("job_stream", job_id=job_id)}), 202
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job_manager().store.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job)
+
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """
+    SSE progress stream of one job (replayed from the job store, resumable with Last-Event-ID).
+    The stream ends with an "event: done" message carrying the job summary.
+    """
+    store = get_job_manager().store
+    if store.get_job(job_id) is None:
+        return Response(format_sse("RESULT_FAIL: 找不到此 job。", event="done"), mimetype='text/event-stream')
+
+    # 格式錯誤的 Last-Event-ID 視為從頭重播，而不是回傳 500
+    try:
+        last_event_id = max(int(request.headers.get("Last-Event-ID") or 0), 0)
+    except ValueError:
+        last_event_id = 0
+
+    def event_gen():
+        after_id = last_event_id
+        while True:
+            events = store.get_events(job_id, after_id)
+            for event in events:
+                after_id = event["id"]
+                yield f"id: {after_id}\n" + format_sse(event["data"], event=event["event"])
+                if event["event"] == "done":
+                    return
+            if not events:
+                job = store.get_job(job_id)
+                if job is None or (job["status"] in FINISHED_STATES and not store.get_events(job_id, after_id)):
+                    return
+                time.sleep(config.JOB_STREAM_POLL_INTERVAL)
+
+    return Response(stream_with_context(event_gen()), mimetype='text/event-stream')
+
+
 @app.route('/fix_stream')
 def fix_stream():
     """"
@@ -107,6 +188,25 @@ def fix_stream():
         mimetype='text/event-stream'
     )
 
+@app.route('/llm_cache/stats')
+def llm_cache_stats():
+    """
+    LLM response cache 的 hit / miss 計數與節省的時間 (LLM_CACHE_ENABLED 未開啟時回傳 enabled: false)
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats()})
+
+@app.route('/rag/stats')
+def rag_stats():
+    """
+    RAG 查詢結果 / query embedding cache 的命中率 (只包含已經建立連線的知識庫)
+    """
+    # 延後 import：沒有用到 RAG 時不需要載入 chromadb
+    from src.rag_service.rag import get_rag_cache_stats
+    return jsonify({"collections": get_rag_cache_stats()})
+
 def create_app():
     app.secret_key = config.SECRET_KEY
     return app
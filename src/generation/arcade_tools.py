@@ -1,6 +1,19 @@
-from src.rag_service.rag import RagService
 from config import config
-import os
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from src.rag_service.kb_store import KnowledgeBaseStore
+    from src.rag_service.rag import RagService
+
+
+def get_arcade_rag() -> "RagService":
+    """
+    Arcade 知識庫的 RagService (lazy singleton)：第一次呼叫 search_arcade_kb 時才連線 Chroma，
+    避免 import 時就建立連線 (Chroma 掛掉時也不會讓整個 app 無法啟動)。
+    """
+    # chromadb 的 import 很重，延後到真正需要時
+    from src.rag_service.rag import get_rag_service
+    return get_rag_service(config.ARCADE_COLLECTION_NAME)
 
 
 def get_arcade_3_0_api_conventions() -> str:
@@ -18,22 +31,178 @@ def get_arcade_3_0_api_conventions() -> str:
     """
 
 
-def search_arcade_kb(query: str, rag: RagService) -> str:
+def estimate_tokens(text: str) -> int:
+    """粗估 token 數 (英文 / 程式碼約 4 個字元一個 token)"""
+    return (len(text) + 3) // 4
+
+
+def get_kb_store() -> "KnowledgeBaseStore":
+    from src.rag_service.kb_store import get_kb_store as _get_kb_store
+    return _get_kb_store(config.ARCADE_SOURCE_DIR)
+
+
+def get_file_chunks(file_name: str) -> tuple[str, ...]:
+    # 與 ingest 使用相同的切分 (KnowledgeBaseStore 預先算好的 offsets)，chunk_index 才會對得上
+    kb_file = get_kb_store().get(file_name)
+    return kb_file.chunks if kb_file is not None else ()
+
+
+def _join_adjacent(previous: str, following: str, max_overlap: int = 400) -> str:
+    # 相鄰 chunk 之間有 overlap，接起來時去掉重複的部分
+    for size in range(min(len(previous), len(following), max_overlap), 0, -1):
+        if previous.endswith(following[:size]):
+            return previous + following[size:]
+    return previous + "\n" + following
+
+
+SECTION_SEPARATOR = "\n\n---\n\n"
+
+
+def _section_header(file_name: str, first: int, last: int, total: int) -> str:
+    return f"### {file_name} (chunks {first}-{last} of {total})\n"
+
+
+def select_chunks(hits: list[tuple[str, int]], token_budget: int) -> dict[str, set[int]]:
     """
-    搜尋 Arcade 3.0 的官方文件與程式碼範例。
+    Choose which chunks to return: every hit first (in rank order), then neighbouring chunks
+    (distance 1, 2, ... around each hit, best-ranked hit first) while the token budget allows.
+    A chunk that starts a new section is also charged for its header and separator, so the formatted
+    result of _search_chunks stays within the budget.
+    :param hits: (file name, chunk index) of the matched chunks, best first
+    :type hits: list[tuple[str, int]]
+
+    :param token_budget: The maximum number of (estimated) tokens to return
+    :type token_budget: int
+
+    :return: The selected chunk indices per file
+    :rtype: dict[str, set[int]]
     """
+    selected: dict[str, set[int]] = {}
+    used = 0
+
+    def try_add(file_name: str, index: int) -> bool:
+        nonlocal used
+        chunks = get_file_chunks(file_name)
+        indices = selected.get(file_name, set())
+        if not 0 <= index < len(chunks) or index in indices:
+            return False
+        # 每段估算都無條件進位，分開計算的總和不會少於整段結果的估算
+        cost = estimate_tokens("\n" + chunks[index])  # _join_adjacent 可能多接一個換行
+        if index - 1 not in indices and index + 1 not in indices:
+            # 與已選的 chunk 不相鄰：會成為新的一段 (header 的編號以最大值估算)
+            total = len(chunks)
+            cost += estimate_tokens(SECTION_SEPARATOR + _section_header(file_name, total, total, total))
+        if used + cost > token_budget:
+            return False
+        selected.setdefault(file_name, set()).add(index)
+        used += cost
+        return True
+
+    for file_name, index in hits:
+        try_add(file_name, index)
+
+    max_distance = max((len(get_file_chunks(name)) for name, _ in hits), default=0)
+    for distance in range(1, max_distance):
+        added = False
+        for file_name, index in hits:
+            added |= try_add(file_name, index - distance)
+            added |= try_add(file_name, index + distance)
+        if not added and used >= token_budget:
+            break
+    return selected
+
+
+def _locate_chunk(file_name: str, document: str, metadata: dict) -> Optional[int]:
+    chunks = get_file_chunks(file_name)
+    index = metadata.get("chunk_index")
+    if isinstance(index, int) and 0 <= index < len(chunks) and chunks[index] == document:
+        return index
+    # 舊的 collection 沒有 chunk_index (或檔案已更新)：以內容找回位置
+    try:
+        return chunks.index(document)
+    except ValueError:
+        return None
+
+
+def _search_chunks(query: str, rag: "RagService", top_k: int, token_budget: int) -> str:
+    results = rag.query(query, n_results=top_k)
+    if not results or not results.get("ids") or not results["ids"][0]:
+        return "No relevant documentation found."
+
+    hits: list[tuple[str, int]] = []
+    for document, metadata in zip(results["documents"][0], results["metadatas"][0]):
+        file_name = (metadata or {}).get("file_name")
+        if not file_name or file_name not in get_kb_store():
+            continue
+        index = _locate_chunk(file_name, document, metadata)
+        if index is not None and (file_name, index) not in hits:
+            hits.append((file_name, index))
+
+    if not hits:
+        # 找不到對應的檔案時，直接回傳 Chroma 裡存的 chunk 內容
+        return SECTION_SEPARATOR.join(results["documents"][0])[:token_budget * 4]
+
+    selected = select_chunks(hits, token_budget)
+    if not selected:
+        # 最相關的 chunk 本身就超過預算：截斷後回傳
+        file_name, index = hits[0]
+        return get_file_chunks(file_name)[index][:token_budget * 4]
+
+    sections = []
+    for file_name in dict.fromkeys(name for name, _ in hits):
+        if file_name not in selected:
+            continue
+        chunks = get_file_chunks(file_name)
+        indices = sorted(selected[file_name])
+        # 連續的 chunk 合併成一段
+        runs, start = [], indices[0]
+        for previous, current in zip(indices, indices[1:] + [None]):
+            if current != previous + 1:
+                runs.append((start, previous))
+                start = current
+        for first, last in runs:
+            text = chunks[first]
+            for index in range(first + 1, last + 1):
+                text = _join_adjacent(text, chunks[index])
+            sections.append(_section_header(file_name, first, last, len(chunks)) + text)
+    return SECTION_SEPARATOR.join(sections)
+
+
+def _search_whole_file(query: str, rag: "RagService") -> str:
     results = rag.query(query, n_results=1)
 
     if results and "metadatas" in results:
         filename = results["metadatas"][0][0]["file_name"]
-        full_path = os.path.join(config.ARCADE_SOURCE_DIR, filename)
-        with open(full_path, "r", encoding="utf-8") as f:
-            rag_context = f.read()
-        return rag_context
+        kb_file = get_kb_store().get(filename)
+        if kb_file is not None:
+            return kb_file.text
 
     return "No relevant documentation found."
 
 
+def search_arcade_kb(query: str, rag: Optional["RagService"] = None, mode: Optional[str] = None) -> str:
+    """
+    搜尋 Arcade 3.0 的官方文件與程式碼範例。
+    未指定 rag 時使用共用的 Arcade 知識庫 (get_arcade_rag)。
+    mode (預設 ARCADE_KB_RETRIEVAL_MODE):
+    - "chunks": 回傳 top-k 個相關 chunk，並在 token 預算內補上前後相鄰的 chunk
+    - "file": 回傳最相關 chunk 所屬的整個 markdown 檔案
+    """
+    if rag is None:
+        try:
+            rag = get_arcade_rag()
+        except Exception as e:
+            print(f"[RAG Error] Arcade knowledge base unavailable: {e}")
+            return f"Error: Arcade knowledge base is unavailable ({e})."
+
+    mode = (mode or config.ARCADE_KB_RETRIEVAL_MODE).lower()
+    if mode == "file":
+        return _search_whole_file(query, rag)
+    if mode == "chunks":
+        return _search_chunks(query, rag, config.ARCADE_KB_TOP_K, config.ARCADE_KB_TOKEN_BUDGET)
+    raise ValueError(f"Unsupported ARCADE_KB_RETRIEVAL_MODE: {mode}. Please use 'chunks' or 'file'")
+
+
 ARCADE_TOOLS = [
     {
         "type": "function",
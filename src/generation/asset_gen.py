@@ -1,9 +1,9 @@
 import re
-from src.utils import call_llm
+from src.utils import acall_llm, run_sync
 from src.generation.prompts import ART_PROMPT
 
 
-def generate_assets(
+async def agenerate_assets(
         gdd_context: str,
         provider: str = "openai",
         model: str = "gpt-4o-mini"
@@ -22,7 +22,7 @@ def generate_assets(
     :return: The generated assets json
     :rtype: str
     """
-    response = call_llm(ART_PROMPT, f"GDD Content:\n{gdd_context}", provider=provider, model=model)
+    response = await acall_llm(ART_PROMPT, f"GDD Content:\n{gdd_context}", provider=provider, model=model)
 
     try:
         # Find {...} structure
@@ -31,4 +31,15 @@ def generate_assets(
             return json_match.group(0)
         return response
     except:
-        return "{}"
\ No newline at end of file
+        return "{}"
+
+
+def generate_assets(
+        gdd_context: str,
+        provider: str = "openai",
+        model: str = "gpt-4o-mini"
+) -> str:
+    """
+    agenerate_assets 的同步版本
+    """
+    return run_sync(agenerate_assets(gdd_context, provider, model))
@@ -1,15 +1,13 @@
-from src.utils import call_llm
+from src.utils import acall_llm, run_sync, DeltaCallback
 from src.generation.prompts import PROGRAMMER_PROMPT_TEMPLATE, FUZZER_GENERATION_PROMPT
-from src.generation.asset_gen import generate_assets
+from src.generation.asset_gen import agenerate_assets
 from src.generation.file_utils import save_code_to_file
-from src.rag_service.rag import RagService, RagConfig
 from config import config
 from src.generation.arcade_tools import ARCADE_TOOLS
+from src.generation.task_graph import TaskGraph
+from typing import Optional
 import os
-
-
-rag_config = RagConfig(collection_name=config.ARCADE_COLLECTION_NAME)
-rag = RagService(rag_config=rag_config)
+import time
 
 COMMON_DEVELOPER_INSTRUCTION = """
 CRITICAL INSTRUCTIONS FOR TOOL USAGE:
@@ -31,12 +29,13 @@ Please generate the code now based on these findings.
 """
 
 
-def planner(
+async def aplanner(
         gdd_context: str,
         asset_json: str,
         provider: str = "mistral",
         model: str = "codestral-latest",
-        temperature: float = 0.5
+        temperature: float = 0.5,
+        on_delta: Optional[DeltaCallback] = None
 ) -> str:
     """
     第一階段：規劃。
@@ -69,26 +68,44 @@ def planner(
     Return the plan in plain text.
     """
 
-    return call_llm(system_prompt, full_prompt, provider=provider, model=model, temperature=temperature)
+    return await acall_llm(system_prompt, full_prompt, provider=provider, model=model, temperature=temperature, on_delta=on_delta)
 
 
-def generate_code(
+def planner(
+        gdd_context: str,
+        asset_json: str,
+        provider: str = "mistral",
+        model: str = "codestral-latest",
+        temperature: float = 0.5,
+        on_delta: Optional[DeltaCallback] = None
+) -> str:
+    """
+    aplanner 的同步版本
+    """
+    return run_sync(aplanner(gdd_context, asset_json, provider, model, temperature, on_delta))
+
+
+async def agenerate_code(
         gdd_context: str,
         asset_json: str,
         provider: str = "openai",
         model: str = "gpt-4o-mini",
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        plan: Optional[str] = None,
+        on_delta: Optional[DeltaCallback] = None
 ) -> str:
     """
     第二階段：使用 Tool Use 模式生成程式碼。
+    若已經有 (平行產生的) plan 可直接傳入，否則會先執行 Planner。
+    on_delta: 若有傳入，Planner 與 Programmer 的輸出會以 token delta 即時串流出去
     """
 
     # 1. 執行 Planner (現在它會自動幫我們想好數學邏輯)
-    print("📝 正在規劃遊戲架構與關鍵約束...")
-    plan = planner(gdd_context, asset_json, provider=provider, model=model, temperature=0.5)
+    if plan is None:
+        print("📝 正在規劃遊戲架構與關鍵約束...")
+        plan = await aplanner(gdd_context, asset_json, provider=provider, model=model, temperature=0.5, on_delta=on_delta)
 
-    # 2. 初始化 RAG
-    print("🔍 準備 Arcade 3.0 知識庫連線...")
+    # 2. RAG：知識庫連線會在第一次呼叫 search_arcade_kb 時才建立 (lazy singleton)
 
     # 3. 構建 Prompt
     programmer_system_prompt = (
@@ -125,7 +142,7 @@ def generate_code(
         f"Please pay special attention to the 'CRITICAL IMPLEMENTATION CONSTRAINTS' mentioned in the plan above."
     )
 
-    return call_llm(
+    return await acall_llm(
         programmer_system_prompt,
         user_input,
         provider=provider,
@@ -133,11 +150,26 @@ def generate_code(
         temperature=temperature,
         max_tokens=8192,
         tools=ARCADE_TOOLS,
-        rag_instance=rag,
-        tool_additional_instruction=dynamic_instruction  # <--- 自動化的關鍵
+        tool_additional_instruction=dynamic_instruction,  # <--- 自動化的關鍵
+        on_delta=on_delta
     )
 
 
+def generate_code(
+        gdd_context: str,
+        asset_json: str,
+        provider: str = "openai",
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.1,
+        plan: Optional[str] = None,
+        on_delta: Optional[DeltaCallback] = None
+) -> str:
+    """
+    agenerate_code 的同步版本
+    """
+    return run_sync(agenerate_code(gdd_context, asset_json, provider, model, temperature, plan, on_delta))
+
+
 
 def generate_structural_code(
         gdd_context: str,
@@ -167,7 +199,7 @@ def generate_structural_code(
 
 
 
-def generate_fuzzer_logic(
+async def agenerate_fuzzer_logic(
         gdd_context: str,
         provider: str = "openai",
         model: str = "gpt-4o-mini"
@@ -189,13 +221,26 @@ def generate_fuzzer_logic(
     print("[Member 2] Start to generate fuzzer logic")
     prompt = FUZZER_GENERATION_PROMPT.replace("{gdd}", gdd_context)
     print("[Member 2] Generating the custom fuzzer test script (Fuzzer)...")
-    return call_llm("You are a QA Engineer.", prompt, provider=provider, model=model, temperature=0.2)
+    return await acall_llm("You are a QA Engineer.", prompt, provider=provider, model=model, temperature=0.2)
 
 
-def run_core_phase(
+def generate_fuzzer_logic(
         gdd_context: str,
         provider: str = "openai",
         model: str = "gpt-4o-mini"
+) -> str:
+    """
+    agenerate_fuzzer_logic 的同步版本
+    """
+    return run_sync(agenerate_fuzzer_logic(gdd_context, provider, model))
+
+
+async def arun_core_phase(
+        gdd_context: str,
+        provider: str = "openai",
+        model: str = "gpt-4o-mini",
+        on_delta: Optional[DeltaCallback] = None,
+        output_dir: str = "output"
 ) -> str:
     """
     Run the game and the logic tester (game tester) codes generation routine.
@@ -208,27 +253,81 @@ def run_core_phase(
     :param model: The LLM model to use
     :type model: str
 
+    :param on_delta: Optional callback receiving streamed tokens of the plan and the code
+    :type on_delta: Optional[DeltaCallback]
+
+    :param output_dir: The directory to save main.py and fuzz_logic.py to
+    :type output_dir: str
+
     :return: The file path of the generated code
     :rtype: str
     """
 
-    print("[Member 2] Start to generate the assets (JSON)...")
-    assets = generate_assets(gdd_context, provider, model)
-    print(f"[Member 2] Generation complete: {assets[:50]}...")
+    # 以 DAG 的方式執行：每個 LLM 呼叫在輸入就緒時立刻開始
+    #   assets ──────────┐
+    #   plan (draft) ────┴─> code -> file_path -> fuzzer_logic -> fuzz_logic_path
+    # fuzzer_logic 等程式碼存檔成功才開始，程式碼生成失敗時不浪費一次 LLM 呼叫
+    graph = TaskGraph()
+
+    async def assets_node(gdd_context):
+        print("[Member 2] Start to generate the assets (JSON)...")
+        assets = await agenerate_assets(gdd_context, provider, model)
+        print(f"[Member 2] Generation complete: {assets[:50]}...")
+        return assets
+
+    async def plan_node(gdd_context, assets=None):
+        print("📝 正在規劃遊戲架構與關鍵約束...")
+        # Planner 預設不等美術素材，直接以 GDD 為草稿開始規劃 (素材會在寫程式時一併提供)
+        asset_json = assets if assets is not None else "(Generated in parallel; follow the visuals described in the GDD.)"
+        if on_delta:
+            on_delta("\n--- Planner ---\n")
+        return await aplanner(gdd_context, asset_json, provider=provider, model=model, temperature=0.5, on_delta=on_delta)
+
+    async def code_node(gdd_context, assets, plan):
+        print("[Member 2] Start to generate the code...")
+        if on_delta:
+            on_delta("\n--- Programmer ---\n")
+        return await agenerate_code(gdd_context, assets, provider, model, plan=plan, on_delta=on_delta)
+
+    async def save_code_node(code):
+        print("[Member 2] Saving file...")
+        return save_code_to_file(code, output_dir=output_dir)
+
+    async def fuzzer_logic_node(gdd_context, file_path):
+        if not file_path:
+            return None
+        return await agenerate_fuzzer_logic(gdd_context, provider, model)
+
+    async def save_fuzzer_logic_node(file_path, fuzzer_logic):
+        if not file_path or fuzzer_logic is None:
+            return None
+        output_dir = os.path.dirname(file_path)
+        return save_code_to_file(fuzzer_logic, output_dir=output_dir, filename="fuzz_logic.py")
 
-    print("[Member 2] Start to generate the code...")
-    raw_code = generate_code(gdd_context, assets, provider, model)
-    # print("[=============================================================]")
-    # print(raw_code)
-    # print("[=============================================================]")
+    plan_deps = ("gdd_context", "assets") if config.CORE_PLANNER_WAITS_FOR_ASSETS else ("gdd_context",)
 
-    print("[Member 2] Saving file...")
-    file_path = save_code_to_file(raw_code)
+    graph.add("assets", assets_node, deps=("gdd_context",))
+    graph.add("plan", plan_node, deps=plan_deps)
+    graph.add("code", code_node, deps=("gdd_context", "assets", "plan"))
+    graph.add("file_path", save_code_node, deps=("code",))
+    graph.add("fuzzer_logic", fuzzer_logic_node, deps=("gdd_context", "file_path"))
+    graph.add("fuzz_logic_path", save_fuzzer_logic_node, deps=("file_path", "fuzzer_logic"))
 
-    if file_path:
-        fuzzer_logic_code = generate_fuzzer_logic(gdd_context, provider, model)
-        output_dir = os.path.dirname(file_path)
+    start = time.perf_counter()
+    results = await graph.run(gdd_context=gdd_context)
+    print(f"[Member 2] Core phase timings:\n{graph.format_timings(time.perf_counter() - start)}")
 
-        save_code_to_file(fuzzer_logic_code, output_dir=output_dir, filename="fuzz_logic.py")
+    return results["file_path"]
 
-    return file_path
+
+def run_core_phase(
+        gdd_context: str,
+        provider: str = "openai",
+        model: str = "gpt-4o-mini",
+        on_delta: Optional[DeltaCallback] = None,
+        output_dir: str = "output"
+) -> str:
+    """
+    arun_core_phase 的同步版本
+    """
+    return run_sync(arun_core_phase(gdd_context, provider, model, on_delta, output_dir))
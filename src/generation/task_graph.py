@@ -0,0 +1,123 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+@dataclass
+class TaskNode:
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class NodeTiming:
+    start: float = 0.0
+    end: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class TaskGraph:
+    """
+    一個極簡的 async DAG executor：每個節點在它所有的依賴完成後立刻開始執行，
+    互不相依的節點 (例如美術素材與遊戲架構規劃) 會同時進行。
+    節點函式以 keyword arguments 接收依賴節點 (或初始 inputs) 的結果。
+    """
+    nodes: Dict[str, TaskNode] = field(default_factory=dict)
+    timings: Dict[str, NodeTiming] = field(default_factory=dict)
+
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], deps: Tuple[str, ...] = ()) -> None:
+        """
+        Register a node.
+        :param name: The unique node name (also the keyword its result is passed as)
+        :type name: str
+
+        :param func: The coroutine function to run
+        :type func: Callable[..., Awaitable[Any]]
+
+        :param deps: Names of the nodes / inputs this node depends on
+        :type deps: Tuple[str, ...]
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node: {name}")
+        self.nodes[name] = TaskNode(name, func, tuple(deps))
+
+    def _check(self, inputs: Dict[str, Any]) -> None:
+        # 確認依賴都存在且沒有循環
+        visiting, done = set(), set(inputs)
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if name in done:
+                return
+            if name not in self.nodes:
+                raise ValueError(f"Unknown dependency '{name}' (required by {path[-1] if path else '?'})")
+            if name in visiting:
+                raise ValueError(f"Cycle detected: {' -> '.join(path + (name,))}")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep, path + (name,))
+            visiting.discard(name)
+            done.add(name)
+
+        for node_name in self.nodes:
+            visit(node_name, ())
+
+    async def run(self, **inputs: Any) -> Dict[str, Any]:
+        """
+        Run every node as soon as its dependencies are ready.
+        If a node raises, the remaining nodes are cancelled and the error is re-raised.
+        :param inputs: Initial values that nodes can depend on (e.g. gdd_context)
+        :type inputs: Any
+
+        :return: A dict of inputs and node results keyed by name
+        :rtype: Dict[str, Any]
+        """
+        self._check(inputs)
+        self.timings = {}
+        origin = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def resolve(name: str) -> Any:
+            if name in inputs:
+                return inputs[name]
+            return await tasks[name]
+
+        async def run_node(node: TaskNode) -> Any:
+            kwargs = {dep: await resolve(dep) for dep in node.deps}
+            timing = NodeTiming(start=time.perf_counter() - origin)
+            self.timings[node.name] = timing
+            try:
+                return await node.func(**kwargs)
+            finally:
+                timing.end = time.perf_counter() - origin
+
+        for node in self.nodes.values():
+            tasks[node.name] = asyncio.create_task(run_node(node), name=f"task_graph:{node.name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        results = dict(inputs)
+        results.update({name: task.result() for name, task in tasks.items()})
+        return results
+
+    def format_timings(self, total: Optional[float] = None) -> str:
+        """
+        Render the per-node timings (start -> end, duration), ordered by start time.
+        """
+        lines = []
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1].start):
+            lines.append(f"  - {name:<16} {timing.start:7.2f}s -> {timing.end:7.2f}s  ({timing.duration:.2f}s)")
+        if total is not None:
+            lines.append(f"  = wall-clock {total:.2f}s (serial sum {sum(t.duration for t in self.timings.values()):.2f}s)")
+        return "\n".join(lines)
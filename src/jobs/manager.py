@@ -0,0 +1,208 @@
+import asyncio
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from config import config
+from src.design.chains import arun_design_phase
+from src.generation.core import arun_core_phase
+from src.jobs.store import JobStore, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_UNVERIFIED, JOB_FAILED
+from src.testing.fixer import arun_fix_loop
+from src.utils import astream_deltas, parse_sse, run_sync
+
+
+class JobContext:
+    """
+    讓 pipeline 回報進度：一般訊息直接寫入 store；token delta 先在記憶體累積，
+    每 JOB_DELTA_FLUSH_CHARS 字元或 JOB_DELTA_FLUSH_INTERVAL 秒才寫一次，避免每個 token 都寫 SQLite。
+    寫入經由 JobManager 的 writer thread 執行，不會卡住其他 job 的 LLM streaming。
+    """
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+        self._delta_buffer: list[str] = []
+        self._buffered_chars = 0
+        self._last_flush = time.monotonic()
+
+    async def emit(self, message: str, event: Optional[str] = None) -> None:
+        await self.flush()
+        await self.manager.write(self.manager.store.append_event, self.job_id, message, event)
+
+    async def emit_delta(self, delta: str) -> None:
+        self._delta_buffer.append(delta)
+        self._buffered_chars += len(delta)
+        if (self._buffered_chars >= config.JOB_DELTA_FLUSH_CHARS
+                or time.monotonic() - self._last_flush >= config.JOB_DELTA_FLUSH_INTERVAL):
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._delta_buffer:
+            data = "".join(self._delta_buffer)
+            self._delta_buffer = []
+            self._buffered_chars = 0
+            await self.manager.write(self.manager.store.append_event, self.job_id, data, "delta")
+        self._last_flush = time.monotonic()
+
+
+class JobManager:
+    """
+    Background job queue for game generation.
+    A fixed number of asyncio workers (JOB_WORKERS) run on the shared background event loop and pull job ids
+    from a bounded queue (JOB_QUEUE_MAX), so HTTP request threads return immediately.
+    SQLite access from the event loop goes through a single writer thread (see write()).
+    """
+
+    def __init__(self, store: JobStore, workers: int, queue_max: int):
+        self.store = store
+        self.workers = workers
+        self.queue_max = queue_max
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._requeue_task: Optional[asyncio.Task] = None
+        # 單一 thread：同一個 job 的 event 依呼叫順序寫入，也不會有多個 writer 搶 SQLite 的鎖
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store-writer")
+        run_sync(self._start())
+
+    async def write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a (blocking) JobStore call on the writer thread, so the shared event loop keeps streaming other jobs.
+        :param fn: A bound JobStore method, e.g. ``self.store.append_event``
+        :return: What ``fn`` returns
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._writer, partial(fn, *args, **kwargs))
+
+    async def _start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_max)
+
+        # 重新啟動時 (假設同一個 DB 只由一個 process 使用)：
+        # 執行到一半的 job 標記為失敗，排隊中的 job 重新放回佇列
+        for job_id in await self.write(self.store.list_jobs, (JOB_RUNNING,)):
+            await self.write(self.store.update_job, job_id, status=JOB_FAILED, error="Interrupted by server restart")
+            await self._finish(job_id)
+        backlog = await self.write(self.store.list_jobs, (JOB_QUEUED,))
+
+        for index in range(self.workers):
+            self._worker_tasks.append(asyncio.ensure_future(self._worker(index)))
+        if backlog:
+            self._requeue_task = asyncio.ensure_future(self._requeue(backlog))
+
+    async def _requeue(self, backlog: list[str]) -> None:
+        """
+        Put the queued jobs found at startup back in order; jobs beyond JOB_QUEUE_MAX wait for free slots
+        instead of staying "queued" forever.
+        """
+        for job_id in backlog:
+            await self._queue.put(job_id)
+        print(f"📥 [Jobs] re-enqueued {len(backlog)} queued job(s) after restart")
+
+    async def _finish(self, job_id: str) -> None:
+        summary = await self.write(self.store.job_summary, job_id)
+        await self.write(self.store.append_event, job_id, summary, "done")
+
+    async def _enqueue(self, job_id: str) -> bool:
+        if self._queue.full():
+            return False
+        self._queue.put_nowait(job_id)
+        return True
+
+    def submit(self, user_input: str, provider: str, model: str) -> Optional[str]:
+        """
+        Create and enqueue a job.
+        :return: The job id, or None if the queue is full
+        :rtype: Optional[str]
+        """
+        job_id = self.store.create_job(user_input, provider, model)
+        if not run_sync(self._enqueue(job_id)):
+            self.store.update_job(job_id, status=JOB_FAILED, error="Job queue is full")
+            return None
+        self.store.append_event(job_id, f"[Job] 已排入佇列 (queue size: {self._queue.qsize()})")
+        return job_id
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                traceback.print_exc()
+                await self.write(self.store.append_event, job_id, f"❌ 發生系統錯誤: {e}")
+                await self.write(self.store.update_job, job_id, status=JOB_FAILED, error=str(e))
+            finally:
+                await self._finish(job_id)
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        job = await self.write(self.store.get_job, job_id)
+        if job is None:
+            return
+        ctx = JobContext(self, job_id)
+        provider, model = job["provider"], job["model"]
+        await self.write(self.store.update_job, job_id, status=JOB_RUNNING)
+
+        # --- Phase 1: Design ---
+        await ctx.emit("[Member 1] 開始撰寫遊戲設計文件 (GDD)...")
+        gdd = ""
+        async for kind, value in astream_deltas(arun_design_phase, job["user_input"], provider, model):
+            if kind == "delta":
+                await ctx.emit_delta(value)
+            else:
+                gdd = value
+        await self.write(self.store.update_job, job_id, gdd=gdd)
+
+        # --- Phase 2: Core ---
+        await ctx.emit("[Member 2] 開始生成美術素材、程式碼與測試腳本...")
+        output_dir = os.path.join(config.JOB_OUTPUT_DIR, job_id)
+        game_file_path = None
+        async for kind, value in astream_deltas(arun_core_phase, gdd, provider, model, output_dir=output_dir):
+            if kind == "delta":
+                await ctx.emit_delta(value)
+            else:
+                game_file_path = value
+        await self.write(self.store.update_job, job_id, game_file_path=game_file_path)
+
+        if not game_file_path:
+            await ctx.emit("❌ 程式碼生成失敗，未能解析出 Python Block。")
+            await self.write(self.store.update_job, job_id, status=JOB_FAILED, error="Code generation failed")
+            return
+
+        # --- Phase 3: Testing & Fixing ---
+        verified = False
+        async for message in arun_fix_loop(gdd, game_file_path, provider, model):
+            event, data = parse_sse(message)
+            if event == "delta":
+                await ctx.emit_delta(data)
+                continue
+            await ctx.emit(data, event)
+            if data.startswith("RESULT_SUCCESS"):
+                verified = True
+        await ctx.flush()
+
+        if verified:
+            await self.write(self.store.update_job, job_id, status=JOB_SUCCEEDED, verified=True)
+        else:
+            await self.write(self.store.update_job, job_id, status=JOB_UNVERIFIED, verified=False,
+                             error="Generated game did not pass verification")
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Return the process-wide job manager (created on first use).
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                JobStore(config.JOB_DB_PATH),
+                workers=config.JOB_WORKERS,
+                queue_max=config.JOB_QUEUE_MAX
+            )
+    return _manager
@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Job 狀態
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+# 遊戲已生成，但修復迴圈結束時仍未通過驗證
+JOB_UNVERIFIED = "unverified"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_UNVERIFIED, JOB_FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    provider TEXT,
+    model TEXT,
+    user_input TEXT,
+    gdd TEXT,
+    game_file_path TEXT,
+    verified INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id);
+"""
+
+_JOB_FIELDS = ("status", "gdd", "game_file_path", "verified", "error")
+
+
+class JobStore:
+    """
+    SQLite 持久化的 job 與 progress event 紀錄 (不需要外部服務)。
+    每個 thread 使用自己的 connection；WAL 模式讓 SSE 讀取與 worker 寫入可以同時進行。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create_job(self, user_input: str, provider: str, model: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, provider, model, user_input, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, provider, model, user_input, now, now)
+            )
+        return job_id
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        unknown = set(fields) - set(_JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {unknown}")
+        if not fields:
+            return
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ?",
+                (*fields.values(), time.time(), job_id)
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job["verified"] is not None:
+            job["verified"] = bool(job["verified"])
+        return job
+
+    def list_jobs(self, statuses: tuple[str, ...]) -> List[str]:
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._connect().execute(
+            f"SELECT id FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at",
+            statuses
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def append_event(self, job_id: str, data: str, event: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, event, data, time.time())
+            )
+
+    def get_events(self, job_id: str, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT id, event, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (job_id, after_id, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def job_summary(self, job_id: str) -> str:
+        job = self.get_job(job_id) or {}
+        return json.dumps({
+            "job_id": job_id,
+            "status": job.get("status"),
+            "verified": job.get("verified"),
+            "game_file_path": job.get("game_file_path"),
+            "error": job.get("error")
+        }, ensure_ascii=False)
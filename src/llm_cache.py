@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import config
+
+
+class LLMResponseCache:
+    """
+    Content-addressed, on-disk cache for LLM responses.
+
+    - Key: sha256 of (provider, model, messages, temperature, tools). The messages already contain the
+      system prompt, the user prompt and the tool transcript of the current tool-loop round.
+    - Eviction: LRU, bounded by entry count and total bytes (file mtime = last access).
+    - TTL: entries older than ``ttl`` seconds are treated as misses and removed.
+    - deterministic_only: only cache calls whose temperature <= ``temperature_threshold``.
+    """
+
+    def __init__(
+            self,
+            cache_dir: str,
+            max_entries: int = 2000,
+            max_bytes: int = 256 * 1024 * 1024,
+            ttl: int = 7 * 24 * 3600,
+            deterministic_only: bool = True,
+            temperature_threshold: float = 0.0
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.deterministic_only = deterministic_only
+        self.temperature_threshold = temperature_threshold
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._lock = threading.Lock()
+        # key -> size in bytes, ordered from least to most recently used
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_index(self) -> None:
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            return
+
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def make_key(
+            provider: str,
+            model: str,
+            messages: List[Dict[str, Any]],
+            temperature: float,
+            tools: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "tools": tools
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def should_cache(self, temperature: float) -> bool:
+        if not self.deterministic_only:
+            return True
+        return temperature <= self.temperature_threshold
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value, or None on a miss (missing, expired or unreadable entry).
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+                self._drop(key)
+            return None
+
+        if self.ttl and time.time() - entry.get("created_at", 0) > self.ttl:
+            with self._lock:
+                self.misses += 1
+                self._drop(key)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += entry.get("elapsed", 0.0)
+            if key in self._index:
+                self._index.move_to_end(key)
+        return entry["value"]
+
+    def set(self, key: str, value: Any, elapsed: float = 0.0) -> None:
+        """
+        Store a value (atomically) and evict least recently used entries if the cache is over budget.
+        :param key: The cache key from make_key
+        :type key: str
+
+        :param value: A JSON-serialisable response
+        :type value: Any
+
+        :param elapsed: The latency of the original call, used to report saved time on later hits
+        :type elapsed: float
+        """
+        path = self._path(key)
+        data = json.dumps(
+            {"created_at": time.time(), "elapsed": elapsed, "value": value},
+            ensure_ascii=False
+        ).encode("utf-8")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # 寫入失敗 (磁碟已滿 / 權限) 時不留下半個 tmp 檔
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _drop(self, key: str) -> None:
+        # 呼叫端須持有 self._lock
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        # 呼叫端須持有 self._lock
+        while self._index and (len(self._index) > self.max_entries or self._total_bytes > self.max_bytes):
+            oldest_key = next(iter(self._index))
+            self._drop(oldest_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._index):
+                self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 2),
+                "entries": len(self._index),
+                "bytes": self._total_bytes
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide response cache, or None when LLM_CACHE_ENABLED is off.
+    """
+    global _cache
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    cache_dir=config.LLM_CACHE_DIR,
+                    max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                    max_bytes=config.LLM_CACHE_MAX_BYTES,
+                    ttl=config.LLM_CACHE_TTL,
+                    deterministic_only=config.LLM_CACHE_DETERMINISTIC_ONLY,
+                    temperature_threshold=config.LLM_CACHE_TEMPERATURE_THRESHOLD
+                )
+    return _cache
@@ -0,0 +1,136 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.rag_service.local_index import matches_where
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+(?:\.[A-Za-z0-9_]+)*")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+# 看起來像 API 名稱的查詢：draw_rect_filled、Camera2D、arcade.PhysicsEngineSimple ...
+_SYMBOL_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Identifier-aware tokenizer: every word is kept whole (lower-cased) so exact API names match,
+    and is also split on '.', '_' and camelCase boundaries so partial names still match.
+    e.g. "arcade.draw_rect_filled" -> arcade.draw_rect_filled, arcade, draw_rect_filled, draw, rect, filled
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        tokens.append(word.lower())
+        for component in word.split("."):
+            if component != word:
+                tokens.append(component.lower())
+            parts = [part for piece in component.split("_") for part in _CAMEL_RE.findall(piece)]
+            if len(parts) > 1:
+                tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+def is_symbol_query(query: str) -> bool:
+    """True for queries that are a single API symbol (contains '_', '.', or mixed case / digits)."""
+    query = query.strip()
+    if not _SYMBOL_RE.match(query):
+        return False
+    return "_" in query or "." in query or bool(re.search(r"[a-z][A-Z]|[A-Z][a-z]+[A-Z0-9]", query))
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over the chunks of a collection.
+    Postings are stored per term as NumPy arrays (doc indices, term frequencies), so scoring a query
+    only touches the documents that contain its terms and needs no embedding call.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Optional[dict]] = []
+        self._postings: Dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._idf: Dict[str, float] = {}
+        self._doc_norm: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(self, ids: List[str], documents: List[str], metadatas: Optional[List[Optional[dict]]] = None) -> None:
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+
+        postings: Dict[str, list[tuple[int, int]]] = defaultdict(list)
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for index, document in enumerate(self.documents):
+            counts = Counter(tokenize(document or ""))
+            lengths[index] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term].append((index, tf))
+
+        n_docs = len(documents)
+        avg_length = float(lengths.mean()) if n_docs else 0.0
+        self._postings = {
+            term: (np.array([doc for doc, _ in entries], dtype=np.int64),
+                   np.array([tf for _, tf in entries], dtype=np.float32))
+            for term, entries in postings.items()
+        }
+        self._idf = {
+            term: math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            for term, entries in postings.items()
+        }
+        # BM25 分母中與 query 無關的部分先算好
+        self._doc_norm = self.k1 * (1 - self.b + self.b * lengths / (avg_length or 1.0))
+
+    def has_term(self, term: str) -> bool:
+        return term.lower() in self._postings
+
+    def search(self, query: str, n_results: int = 10, where: Optional[dict] = None) -> List[tuple[int, float]]:
+        """
+        :return: (document index, score) pairs, best first; documents without any query term are not returned
+        :rtype: List[tuple[int, float]]
+        """
+        if not self.ids:
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        matched = np.zeros(len(self.ids), dtype=bool)
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._postings[term]
+            scores[docs] += self._idf[term] * tfs * (self.k1 + 1) / (tfs + self._doc_norm[docs])
+            matched[docs] = True
+
+        if where:
+            matched &= np.fromiter((matches_where(m, where) for m in self.metadatas), dtype=bool, count=len(self.ids))
+        candidates = np.flatnonzero(matched)
+        if len(candidates) == 0:
+            return []
+        n_results = min(n_results, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], n_results - 1)[:n_results]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(index), float(scores[index])) for index in top]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[tuple[str, float]]:
+    """
+    Fuse several ranked id lists: score(id) = sum over lists of 1 / (k + rank), rank starting at 1.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def to_query_result(ids: List[str], documents: List[str], metadatas: List[Any], distances: List[float]) -> Dict[str, Any]:
+    """Wrap a single query's hits in chromadb's QueryResult shape."""
+    return {
+        "ids": [ids], "documents": [documents], "metadatas": [metadatas], "distances": [distances],
+        "embeddings": None, "uris": None, "data": None,
+        "included": ["metadatas", "documents", "distances"]
+    }
@@ -1,7 +1,9 @@
+import argparse
+import json
 import os
-from pathlib import Path
+import time
 from tqdm import tqdm
-from langchain_text_splitters import MarkdownTextSplitter
+from src.rag_service.kb_store import CHUNK_OVERLAP, CHUNK_SIZE, KBFile, list_kb_entries, read_kb_files, split_kb_files
 from src.rag_service.rag import RagService, RagConfig
 from config import config
 
@@ -10,85 +12,142 @@ SOURCE_DIR = config.ARCADE_SOURCE_DIR
 COLLECTION_NAME = config.ARCADE_COLLECTION_NAME
 
 
-def main():
+def file_chunks(kb_file: KBFile) -> list[tuple[str, dict]]:
+    """
+    The chunks of one knowledge-base file with their metadata.
+    :return: [(chunk, metadata), ...]
+    :rtype: list[tuple[str, dict]]
+    """
+    source = kb_file.source
+    return [
+        (chunk, {"file_name": kb_file.name, "source": source, "chunk_index": index})
+        for index, chunk in enumerate(kb_file.chunks)
+    ]
+
+
+class IngestManifest:
+    """
+    記錄上次匯入時每個檔案的內容 hash 與 chunk ids，
+    讓下次匯入只處理新增 / 修改的檔案，並刪除已經不存在的 chunks。
+    """
+
+    def __init__(self, path: str, collection_name: str):
+        self.path = path
+        self.collection_name = collection_name
+        self.splitter = {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+        self.files: dict[str, dict] = {}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # collection 或切分參數不同時，舊的紀錄不能沿用
+            if data.get("collection") == collection_name and data.get("splitter") == self.splitter:
+                self.files = data.get("files", {})
+
+    def all_chunk_ids(self) -> set[str]:
+        return {chunk_id for entry in self.files.values() for chunk_id in entry["chunk_ids"]}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"collection": self.collection_name, "splitter": self.splitter, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+
+def main(full: bool = False):
+    start = time.perf_counter()
+
     # 1. 初始化你的 RagService
     # 它會自動讀取你的 config.py 並連接到你的 Ollama
     print("🤖 正在初始化 RagService (Ollama)...")
-    config = RagConfig(collection_name=COLLECTION_NAME)
-    rag = RagService(rag_config=config)
-
-    # 2. 準備 Markdown 切分器
-    # 這裡很關鍵：切分程式碼時盡量保持完整性
-    text_splitter = MarkdownTextSplitter(chunk_size=1200, chunk_overlap=150)
-
-    # 3. 讀取所有檔案並切分
-    all_contents = []
-    all_metadatas = []
-
-    path_list = list(Path(SOURCE_DIR).glob("*.md"))
-    if not path_list:
+    rag_config = RagConfig(collection_name=COLLECTION_NAME)
+    rag = RagService(rag_config=rag_config)
+
+    manifest_path = os.path.join(config.ARCADE_INGEST_MANIFEST_DIR, f"{rag.collection.name}.json")
+    manifest = IngestManifest(manifest_path, rag.collection.name)
+    previous_ids = manifest.all_chunk_ids()
+    if full:
+        manifest.files = {}
+
+    # 2. 讀取所有檔案並比對內容 hash，只有新增 / 修改的檔案才切分 (以 process pool 平行進行)
+    entries = list_kb_entries(SOURCE_DIR)
+    kb_files = read_kb_files([entries[name] for name in sorted(entries)])
+    if not kb_files:
         print(f"❌ 找不到目錄 {SOURCE_DIR} 或目錄內沒有 .md 檔案。")
         return
 
-    print(f"📄 正在處理 {len(path_list)} 個 Markdown 檔案...")
-
-    for file_path in tqdm(path_list):
-        with open(file_path, "r", encoding="utf-8") as f:
-            full_text = f.read()
-
-            # 從內容中提取來源標記 (你在上一個腳本加的 Source: ...)
-            source_line = "unknown"
-            if "Source: " in full_text:
-                source_line = full_text.split("\n")[0].replace("Source: ", "")
-
-            # 進行切分
-            chunks = text_splitter.split_text(full_text)
-
-            for chunk in chunks:
-                # 簡單過濾掉過短或只有空白的 chunk，避免重複的無意義 ID
-                if len(chunk.strip()) < 10:
+    file_names = {kb_file.name for kb_file in kb_files}
+    changed = [kb_file for kb_file in kb_files if manifest.files.get(kb_file.name, {}).get("hash") != kb_file.sha256]
+    removed = [name for name in manifest.files if name not in file_names]
+    print(f"📄 共 {len(kb_files)} 個 Markdown 檔案：{len(changed)} 個新增/修改，"
+          f"{len(kb_files) - len(changed)} 個未變更，{len(removed)} 個已刪除")
+    split_kb_files(changed, workers=config.ARCADE_INGEST_WORKERS or os.cpu_count() or 1)
+
+    # 已經在 collection 裡的 chunk 不需要重新 embedding
+    stored_ids = manifest.all_chunk_ids()
+    for name in removed:
+        del manifest.files[name]
+
+    # 3. 切好的 chunk 串流送進 batch_insert (不需要先把全部 chunk 收集起來)
+    pending_contents: list[str] = []
+    pending_metadatas: list[dict] = []
+    pending_files: dict[str, dict] = {}
+    inserted = 0
+
+    def flush():
+        nonlocal inserted
+        if pending_contents:
+            rag.batch_insert(pending_contents, metadatas=pending_metadatas)
+            inserted += len(pending_contents)
+        # 檔案的 chunk 全部寫入後才更新 manifest，中途失敗時下次會重做
+        manifest.files.update(pending_files)
+        manifest.save()
+        pending_contents.clear()
+        pending_metadatas.clear()
+        pending_files.clear()
+
+    if changed:
+        print(f"📦 正在發送向量化請求 (模型: {rag_config.model_type})...")
+        for kb_file in tqdm(changed):
+            chunk_ids = []
+            for chunk, metadata in file_chunks(kb_file):
+                # ID 是內容的 hash：內容完全一樣的 chunk 只存一份 (也避免同一批次內 ID 重複)
+                content_id = rag.hash_content(chunk)
+                chunk_ids.append(content_id)
+                if content_id in stored_ids:
                     continue
-
-                all_contents.append(chunk)
-                all_metadatas.append({
-                    "file_name": file_path.name,
-                    "source": source_line
-                })
-
-    # 4. [修復] 確保 IDs 唯一性
-    # 因為 RagService 使用 hash_content(content) 作為 ID，
-    # 如果內容完全一樣，ID 就會重複導致 ChromaDB 報錯。
-    print("🧹 正在檢查並移除重複內容...")
-    unique_contents = []
-    unique_metadatas = []
-    seen_ids = set()
-
-    for content, metadata in zip(all_contents, all_metadatas):
-        content_id = rag.hash_content(content)
-        if content_id not in seen_ids:
-            seen_ids.add(content_id)
-            unique_contents.append(content)
-            unique_metadatas.append(metadata)
-
-    print(f"📊 過濾後總計 {len(unique_contents)} 個獨特區塊。")
-
-    # 5. 批次寫入 ChromaDB
-    print(f"📦 正在發送向量化請求至 Ollama (模型: {config.model_type})...")
-    rag.batch_insert(unique_contents, metadatas=unique_metadatas)
-
-    print("\n✨ Arcade 3.0 知識庫導入完成！")
+                stored_ids.add(content_id)
+                pending_contents.append(chunk)
+                pending_metadatas.append(metadata)
+            pending_files[kb_file.name] = {"hash": kb_file.sha256, "chunk_ids": chunk_ids}
+
+            if len(pending_contents) >= config.ARCADE_INGEST_FLUSH_SIZE:
+                flush()
+    flush()
+
+    # 4. 刪除已經沒有任何檔案引用的 chunks
+    stale_ids = previous_ids - manifest.all_chunk_ids()
+    if stale_ids:
+        rag.delete(list(stale_ids))
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✨ Arcade 3.0 知識庫導入完成！新增/更新 {inserted} 個區塊，刪除 {len(stale_ids)} 個區塊 "
+          f"({elapsed:.1f}s, {inserted / elapsed if elapsed else 0:.1f} chunks/s)")
     print(f"現在你可以使用 rag.query(\"如何移動 Sprite\") 來查詢了。")
 
 
 if __name__ == "__main__":
-    # main()
-    print(SOURCE_DIR)
-    config = RagConfig(collection_name=COLLECTION_NAME)
-    rag = RagService(rag_config=config)
-
-    result = rag.query("how to move Sprite")
-
-    print(result)
-    print(result['documents'])
-    print(result['metadatas'][0])
-    print(result['metadatas'][0][0]['file_name'])
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ingest the Arcade knowledge base into the vector store")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-ingest every file")
+    parser.add_argument("--query", default=None, help="Run a test query instead of ingesting")
+    args = parser.parse_args()
+
+    if args.query:
+        print(SOURCE_DIR)
+        rag = RagService(rag_config=RagConfig(collection_name=COLLECTION_NAME))
+        result = rag.query(args.query)
+        print(result['documents'])
+        print(result['metadatas'][0])
+    else:
+        main(full=args.full)
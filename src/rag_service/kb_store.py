@@ -0,0 +1,203 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional
+
+from config import config
+
+# 切分參數 (ingest 與 search_arcade_kb 共用，chunk_index 才會一致)
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 150
+# 過短或只有空白的 chunk 不收錄，避免重複的無意義 ID
+MIN_CHUNK_CHARS = 10
+
+_splitter = None
+
+
+def _get_splitter():
+    # 每個 process 各自建立一次 (ingest 的 worker process 也會呼叫)
+    global _splitter
+    if _splitter is None:
+        from langchain_text_splitters import MarkdownTextSplitter
+        # 這裡很關鍵：切分程式碼時盡量保持完整性
+        _splitter = MarkdownTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return _splitter
+
+
+def chunk_spans(text: str) -> List[tuple[int, int]]:
+    """
+    Split a markdown document and return the (start, end) character offsets of its chunks.
+    The splitter returns (whitespace-stripped) substrings of the text, so each chunk is located after the
+    start of the previous one.
+    """
+    spans = []
+    position = 0
+    for chunk in _get_splitter().split_text(text):
+        if len(chunk.strip()) < MIN_CHUNK_CHARS:
+            continue
+        start = text.find(chunk, position)
+        if start < 0:
+            start = text.find(chunk)
+        if start < 0:
+            print(f"⚠️ [KB Store] chunk not found in its source text, skipped: {chunk[:40]!r}")
+            continue
+        spans.append((start, start + len(chunk)))
+        position = start + 1
+    return spans
+
+
+def extract_source(text: str) -> str:
+    # 從內容中提取來源標記 (Source: ...)
+    for line in text.split("\n")[:5]:
+        if line.startswith("Source: "):
+            return line.replace("Source: ", "").strip()
+    return "unknown"
+
+
+@dataclass
+class KBFile:
+    name: str
+    text: str
+    sha256: str
+    mtime_ns: int
+    size: int
+    spans: List[tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def source(self) -> str:
+        return extract_source(self.text)
+
+    def chunk(self, index: int) -> str:
+        start, end = self.spans[index]
+        return self.text[start:end]
+
+    @cached_property
+    def chunks(self) -> tuple[str, ...]:
+        return tuple(self.text[start:end] for start, end in self.spans)
+
+
+def read_kb_files(entries: List[os.DirEntry]) -> List[KBFile]:
+    """
+    Read and hash the given files without splitting them (``spans`` stays empty, see split_kb_files).
+    Hashing is cheap, so ingest reads every file and only splits the changed ones.
+    """
+    loaded = []
+    for entry in entries:
+        stat = entry.stat()
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        loaded.append(KBFile(
+            name=entry.name,
+            text=data.decode("utf-8"),
+            sha256=hashlib.sha256(data).hexdigest(),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size
+        ))
+    return loaded
+
+
+def split_kb_files(kb_files: List[KBFile], workers: int = 1) -> None:
+    """
+    Fill in the chunk offsets of ``kb_files``, with a process pool when ``workers`` > 1 (ingest of many files).
+    """
+    texts = [kb_file.text for kb_file in kb_files]
+    if workers > 1 and len(kb_files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            all_spans = list(executor.map(chunk_spans, texts, chunksize=16))
+    else:
+        all_spans = [chunk_spans(text) for text in texts]
+    for kb_file, spans in zip(kb_files, all_spans):
+        kb_file.spans = spans
+
+
+def list_kb_entries(source_dir: str) -> Dict[str, os.DirEntry]:
+    """The .md files directly under ``source_dir`` by name (empty if the directory does not exist)."""
+    current = {}
+    if os.path.isdir(source_dir):
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".md"):
+                    current[entry.name] = entry
+    return current
+
+
+class KnowledgeBaseStore:
+    """
+    把知識庫目錄下所有 .md 檔一次載入記憶體 (約 3 MB)，以檔名建立索引，並預先算好每個檔案的 chunk offsets。
+    存取時最多每 ``check_interval`` 秒檢查一次目錄 (mtime / size)，有新增、修改或刪除的檔案就只重新載入那些檔案。
+    """
+
+    def __init__(self, source_dir: str, check_interval: float = 2.0):
+        self.source_dir = source_dir
+        self.check_interval = check_interval
+        self._files: Dict[str, KBFile] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.refresh(force=True)
+
+    def _load_files(self, entries: List[os.DirEntry]) -> List[KBFile]:
+        loaded = read_kb_files(entries)
+        split_kb_files(loaded)
+        return loaded
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload files that were added or changed since the last check and drop deleted ones.
+        Without ``force`` this is a no-op if the directory was checked less than ``check_interval`` seconds ago.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return
+            current = list_kb_entries(self.source_dir)
+
+            files, changed = {}, []
+            for name, entry in current.items():
+                stat = entry.stat()
+                cached = self._files.get(name)
+                if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                    files[name] = cached
+                else:
+                    changed.append(entry)
+            for kb_file in self._load_files(changed):
+                files[kb_file.name] = kb_file
+            # 整個 dict 一次換掉，讀取端不需要鎖
+            self._files = files
+            self._last_check = time.monotonic()
+
+    def get(self, name: str) -> Optional[KBFile]:
+        self.refresh()
+        return self._files.get(name)
+
+    def files(self) -> List[KBFile]:
+        """All files, sorted by name."""
+        self.refresh()
+        return [self._files[name] for name in sorted(self._files)]
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+
+_stores: Dict[str, KnowledgeBaseStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_kb_store(source_dir: Optional[str] = None) -> KnowledgeBaseStore:
+    """
+    Return the process-wide store for ``source_dir`` (default: ARCADE_SOURCE_DIR), loading it on first use.
+    """
+    source_dir = os.path.abspath(source_dir or config.ARCADE_SOURCE_DIR)
+    store = _stores.get(source_dir)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(source_dir)
+            if store is None:
+                store = KnowledgeBaseStore(source_dir, check_interval=config.ARCADE_KB_STORE_CHECK_INTERVAL)
+                _stores[source_dir] = store
+    return store
@@ -0,0 +1,357 @@
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import hnswlib  # optional: approximate nearest neighbour search for large corpora
+except ImportError:
+    hnswlib = None
+
+
+_VECTORS_FILE = "vectors.f32"
+_META_FILE = "meta.json"
+
+
+def matches_where(metadata: Optional[dict], where: Optional[dict]) -> bool:
+    """
+    Evaluate the subset of Chroma's ``where`` syntax used in this project:
+    ``{"field": value}``, ``{"field": {"$eq" | "$ne" | "$in" | "$nin": ...}}``, ``$and`` and ``$or``.
+    """
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            for op, expected in condition.items():
+                value = metadata.get(key)
+                if op == "$eq" and value != expected:
+                    return False
+                if op == "$ne" and value == expected:
+                    return False
+                if op == "$in" and value not in expected:
+                    return False
+                if op == "$nin" and value in expected:
+                    return False
+                if op not in ("$eq", "$ne", "$in", "$nin"):
+                    raise ValueError(f"Unsupported where operator for the local index: {op}")
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class LocalCollection:
+    """
+    一個放在本機磁碟的向量 collection，介面與 chromadb 的 Collection 相容 (upsert / delete / query / count)，
+    讓 RagService 不用 Chroma server 也能運作。
+
+    - ``vectors.f32``: L2-normalised float32 矩陣 (row-major, 沒有 header)，查詢時以 np.memmap 開啟
+    - ``meta.json``: dim、ids、documents、metadatas (與矩陣的 row 一一對應)
+
+    查詢以 cosine similarity (= normalised dot product) 做向量化的 top-k；
+    如果有安裝 hnswlib 且資料量 >= ``ann_min_size``，改用記憶體內的 HNSW 索引 (第一次查詢時建立)。
+    """
+
+    def __init__(
+            self,
+            path: str,
+            name: str,
+            embedding_function: Callable[[List[str]], Any],
+            ann_min_size: int = 20000
+    ):
+        self.path = path
+        self.name = name
+        self.embedding_function = embedding_function
+        self.ann_min_size = ann_min_size
+
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Optional[dict]] = []
+        self._row_of: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._ann = None
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # --- persistence ---
+
+    def _load(self) -> None:
+        meta_path = os.path.join(self.path, _META_FILE)
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._dim = meta["dim"]
+        self._ids = meta["ids"]
+        self._documents = meta["documents"]
+        self._metadatas = meta["metadatas"]
+        self._row_of = {item_id: row for row, item_id in enumerate(self._ids)}
+        # upsert 先 append 向量再寫 meta：中途失敗會在檔尾留下 meta 沒有記錄的 row，載入時丟掉
+        self._truncate_vectors(len(self._ids))
+        self._open_matrix()
+
+    def _truncate_vectors(self, rows: int) -> None:
+        vectors_path = os.path.join(self.path, _VECTORS_FILE)
+        size = rows * (self._dim or 0) * np.dtype(np.float32).itemsize
+        if os.path.exists(vectors_path) and os.path.getsize(vectors_path) > size:
+            os.truncate(vectors_path, size)
+
+    def _open_matrix(self) -> None:
+        vectors_path = os.path.join(self.path, _VECTORS_FILE)
+        if not self._ids:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(self._ids), self._dim))
+
+    def _write_meta(self) -> None:
+        meta_path = os.path.join(self.path, _META_FILE)
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self._dim,
+                "ids": self._ids,
+                "documents": self._documents,
+                "metadatas": self._metadatas
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _write_vectors(self, matrix: np.ndarray) -> None:
+        # 整個矩陣重寫 (delete 之後 compact 用)
+        vectors_path = os.path.join(self.path, _VECTORS_FILE)
+        tmp_path = f"{vectors_path}.tmp"
+        np.ascontiguousarray(matrix, dtype=np.float32).tofile(tmp_path)
+        os.replace(tmp_path, vectors_path)
+
+    @staticmethod
+    def _normalise(vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    # --- chromadb Collection compatible API ---
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def upsert(
+            self,
+            ids: List[str],
+            documents: Optional[List[str]] = None,
+            metadatas: Optional[List[dict]] = None,
+            embeddings: Optional[Any] = None
+    ) -> None:
+        if embeddings is None:
+            if documents is None:
+                raise ValueError("upsert needs either documents or embeddings")
+            embeddings = self.embedding_function(documents)
+        vectors = self._normalise(embeddings)
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [None] * len(ids)
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the index ({self._dim})")
+
+            vectors_path = os.path.join(self.path, _VECTORS_FILE)
+            # 同一批次中重複的 id 以最後一筆為準
+            latest = {item_id: index for index, item_id in enumerate(ids)}
+            new_items = [index for item_id, index in latest.items() if item_id not in self._row_of]
+            updated_items = [index for item_id, index in latest.items() if item_id in self._row_of]
+
+            # 先寫檔案，成功後才更新記憶體中的 ids / documents / metadatas
+            if updated_items:
+                # 已存在的 id：就地覆寫該 row
+                updated = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(len(self._ids), self._dim))
+                for index in updated_items:
+                    updated[self._row_of[ids[index]]] = vectors[index]
+                updated.flush()
+                del updated
+            if new_items:
+                # 新的 row 直接 append 到檔案尾端，不需要重寫整個矩陣；
+                # 先截掉先前失敗的 upsert 可能留下的 row，確保新 row 對齊 meta 的 index
+                self._truncate_vectors(len(self._ids))
+                with open(vectors_path, "ab") as f:
+                    vectors[new_items].tofile(f)
+
+            for index in updated_items:
+                row = self._row_of[ids[index]]
+                self._documents[row] = documents[index]
+                self._metadatas[row] = metadatas[index]
+            for index in new_items:
+                self._row_of[ids[index]] = len(self._ids)
+                self._ids.append(ids[index])
+                self._documents.append(documents[index])
+                self._metadatas.append(metadatas[index])
+
+            self._write_meta()
+            self._open_matrix()
+            self._ann = None
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[dict] = None) -> None:
+        with self._lock:
+            to_delete = set(ids or [])
+            if where:
+                to_delete.update(item_id for item_id, metadata in zip(self._ids, self._metadatas)
+                                 if matches_where(metadata, where))
+            keep = [row for row, item_id in enumerate(self._ids) if item_id not in to_delete]
+            if len(keep) == len(self._ids):
+                return
+
+            matrix = np.asarray(self._matrix[keep]) if self._matrix is not None else np.empty((0, self._dim))
+            self._matrix = None
+            self._ids = [self._ids[row] for row in keep]
+            self._documents = [self._documents[row] for row in keep]
+            self._metadatas = [self._metadatas[row] for row in keep]
+            self._row_of = {item_id: row for row, item_id in enumerate(self._ids)}
+
+            self._write_vectors(matrix)
+            self._write_meta()
+            self._open_matrix()
+            self._ann = None
+
+    def get(
+            self,
+            ids: Optional[List[str]] = None,
+            where: Optional[dict] = None,
+            limit: Optional[int] = None,
+            offset: int = 0,
+            include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        # include 只是為了與 chromadb 介面相容：一律回傳 documents 與 metadatas
+        with self._lock:
+            rows = range(len(self._ids)) if ids is None else [self._row_of[i] for i in ids if i in self._row_of]
+            rows = [row for row in rows if matches_where(self._metadatas[row], where)]
+            rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "documents": [self._documents[row] for row in rows],
+                "metadatas": [self._metadatas[row] for row in rows]
+            }
+
+    def _get_ann(self):
+        # 呼叫端必須持有 self._lock
+        if hnswlib is None or self._matrix is None or len(self._ids) < self.ann_min_size:
+            return None
+        if self._ann is None:
+            index = hnswlib.Index(space="ip", dim=self._dim)
+            index.init_index(max_elements=len(self._ids), ef_construction=200, M=16)
+            index.add_items(np.asarray(self._matrix), np.arange(len(self._ids)))
+            index.set_ef(100)
+            self._ann = index
+        return self._ann
+
+    @staticmethod
+    def _top_k(
+            matrix: np.ndarray,
+            ann: Any,
+            query: np.ndarray,
+            n_results: int,
+            mask: Optional[np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if ann is not None:
+            # 有 filter 時多取一些再過濾，不夠的話退回精確搜尋
+            fetch = n_results if mask is None else min(len(matrix), n_results * 10)
+            labels, distances = ann.knn_query(query, k=fetch)
+            labels, scores = labels[0], 1.0 - distances[0]
+            if mask is not None:
+                keep = mask[labels]
+                labels, scores = labels[keep], scores[keep]
+            if len(labels) >= n_results or mask is None:
+                return labels[:n_results], scores[:n_results]
+
+        scores = matrix @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            n_results = min(n_results, int(mask.sum()))
+        n_results = min(n_results, len(scores))
+        if n_results == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, n_results - 1)[:n_results]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def query(
+            self,
+            query_texts: Optional[List[str]] = None,
+            n_results: int = 10,
+            where: Optional[dict] = None,
+            query_embeddings: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Return the ``n_results`` most similar documents per query, in the same shape as chromadb's QueryResult.
+        Distances are cosine distances (1 - cosine similarity), like a Chroma collection with ``hnsw:space=cosine``.
+        """
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        queries = self._normalise(query_embeddings)
+
+        # 在鎖內取得一致的快照 (matrix 與 ids / documents / metadatas 的 row 數相同)，計分時不持有鎖；
+        # upsert / delete 會換掉 self._matrix 並改動 list，快照不受影響
+        with self._lock:
+            matrix, ann = self._matrix, self._get_ann()
+            ids, documents, metadatas = list(self._ids), list(self._documents), list(self._metadatas)
+
+        result: Dict[str, Any] = {
+            "ids": [], "documents": [], "metadatas": [], "distances": [],
+            "embeddings": None, "uris": None, "data": None,
+            "included": ["metadatas", "documents", "distances"]
+        }
+        mask = None
+        if where:
+            mask = np.fromiter((matches_where(m, where) for m in metadatas), dtype=bool, count=len(ids))
+
+        for query in queries:
+            if matrix is None:
+                rows, scores = [], []
+            else:
+                rows, scores = self._top_k(matrix, ann, query, n_results, mask)
+            result["ids"].append([ids[row] for row in rows])
+            result["documents"].append([documents[row] for row in rows])
+            result["metadatas"].append([metadatas[row] for row in rows])
+            result["distances"].append([float(1.0 - score) for score in scores])
+        return result
+
+
+class LocalClient:
+    """
+    Minimal stand-in for a chromadb client: one LocalCollection per sub-directory of ``path``.
+    """
+
+    def __init__(self, path: str, ann_min_size: int = 20000):
+        self.path = path
+        self.ann_min_size = ann_min_size
+        self._collections: Dict[str, LocalCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(
+            self,
+            name: str,
+            embedding_function: Callable[[List[str]], Any],
+            metadata: Optional[dict] = None
+    ) -> LocalCollection:
+        # metadata (例如 hnsw:space) 只是為了與 chromadb 介面相容；本機索引一律使用 cosine
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = LocalCollection(
+                    os.path.join(self.path, name),
+                    name,
+                    embedding_function,
+                    ann_min_size=self.ann_min_size
+                )
+            return self._collections[name]
@@ -1,45 +1,111 @@
 import chromadb
+import copy
 import hashlib
+import json
 import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from chromadb import QueryResult, EmbeddingFunction, Documents, Embeddings
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 from config import Config
 from dataclasses import dataclass
+from src.rag_service.bm25 import BM25Index, is_symbol_query, reciprocal_rank_fusion, to_query_result
+from src.rag_service.local_index import LocalClient
+from src.rag_service.query_cache import LRUCache, normalize_query
 
 
 class RemoteOllamaAuthEF(EmbeddingFunction):
-    def __init__(self, base_url: str, api_key: str, model_name: str = "nomic-embed-text", timeout: int = 30):
-        self.api_url = f"{base_url}/api/embeddings"
+    """
+    Ollama embedding function.
+    Documents are sent in batches of ``batch_size`` to ``/api/embed`` (array input), with at most
+    ``max_in_flight`` batches running concurrently over a pooled keep-alive session.
+    Each batch is retried with exponential backoff on connection errors, timeouts, 429 and 5xx.
+    Older Ollama servers without ``/api/embed`` fall back to one ``/api/embeddings`` request per document.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            api_key: str,
+            model_name: str = "nomic-embed-text",
+            timeout: int = 30,
+            batch_size: int = 32,
+            max_in_flight: int = 4,
+            max_retries: int = 3,
+            retry_backoff: float = 1.0
+    ):
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api/embed"
+        self.legacy_api_url = f"{base_url}/api/embeddings"
         self.model_name = model_name
-        self.headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        self.api_key = api_key
         self.timeout = timeout
-
-    def __call__(self, input: Documents) -> Embeddings:
-        embeddings = []
-        for text in input:
-            payload = {
-                "model": self.model_name,
-                "prompt": text
-            }
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self._use_legacy_api = False
+
+    def _session(self) -> requests.Session:
+        from src.utils import get_http_session
+        return get_http_session("ollama_embedding", self.base_url, self.api_key)
+
+    def _post(self, url: str, payload: dict) -> dict:
+        last_error = None
+        for attempt in range(self.max_retries + 1):
             try:
-                response = requests.post(
-                    self.api_url,
-                    json=payload,
-                    headers=self.headers,
-                    timeout=self.timeout
-                )
+                response = self._session().post(url, json=payload, timeout=self.timeout)
+                if response.status_code == 404 and url == self.api_url:
+                    raise _EmbedEndpointMissing()
                 response.raise_for_status()
-                data = response.json()
-                embeddings.append(data["embedding"])
-            except Exception as e:
-                print(f"Error embedding text: {e}")
-                raise e
+                return response.json()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                # 4xx (除了 429) 是請求本身有問題，重試也沒用
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and status != 429 and status < 500:
+                    raise
+                last_error = e
+                if attempt < self.max_retries:
+                    delay = self.retry_backoff * (2 ** attempt)
+                    print(f"⚠️ Embedding request failed ({e}), retrying in {delay:.1f}s "
+                          f"({attempt + 1}/{self.max_retries})...")
+                    time.sleep(delay)
+        raise last_error
+
+    def _embed_batch(self, texts: list[str]) -> Embeddings:
+        if not self._use_legacy_api:
+            try:
+                data = self._post(self.api_url, {"model": self.model_name, "input": texts})
+                return data["embeddings"]
+            except _EmbedEndpointMissing:
+                if not self._use_legacy_api:
+                    print("⚠️ Ollama server has no /api/embed, falling back to /api/embeddings (one request per text)")
+                    self._use_legacy_api = True
+
+        return [
+            self._post(self.legacy_api_url, {"model": self.model_name, "prompt": text})["embedding"]
+            for text in texts
+        ]
+
+    def __call__(self, input: Documents) -> Embeddings:
+        batches = [input[i:i + self.batch_size] for i in range(0, len(input), self.batch_size)]
+        try:
+            if len(batches) <= 1 or self.max_in_flight == 1:
+                results = [self._embed_batch(batch) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(batches))) as executor:
+                    results = list(executor.map(self._embed_batch, batches))
+        except Exception as e:
+            print(f"Error embedding text: {e}")
+            raise e
 
-        return embeddings
+        return [embedding for batch in results for embedding in batch]
+
+
+class _EmbedEndpointMissing(Exception):
+    pass
 
 
 @dataclass
@@ -57,9 +123,22 @@ class RagConfig:
     # --- Cloud mode ---
     chroma_token: str = getattr(Config, 'CHROMA_TOKEN', None)
 
-    # client_type: 'cloud' or 'http'
+    # client_type: 'cloud', 'http' or 'local'
     client_type: str = getattr(Config, 'CHROMA_CLIENT_TYPE', 'http')
 
+    # --- Query ---
+    query_mode: str = getattr(Config, 'RAG_QUERY_MODE', 'hybrid')
+    hybrid_candidates: int = getattr(Config, 'RAG_HYBRID_CANDIDATES', 20)
+    rrf_k: int = getattr(Config, 'RAG_RRF_K', 60)
+
+    # --- Query cache (0 = 關閉) ---
+    query_cache_size: int = getattr(Config, 'RAG_QUERY_CACHE_SIZE', 256)
+    embedding_cache_size: int = getattr(Config, 'RAG_EMBEDDING_CACHE_SIZE', 1024)
+
+    # --- Local mode ---
+    local_index_dir: str = getattr(Config, 'RAG_LOCAL_INDEX_DIR', '.rag_index')
+    local_ann_min_size: int = getattr(Config, 'RAG_LOCAL_ANN_MIN_SIZE', 20000)
+
     # --- Http mode ---
     host: str = getattr(Config, 'CHROMA_HOST', 'localhost')
     port: int = getattr(Config, 'CHROMA_PORT', 8000)
@@ -105,6 +184,25 @@ class RagService:
             metadata={"hnsw:space": "cosine"}
         )
 
+        self.query_mode = rag_config.query_mode
+        self.hybrid_candidates = rag_config.hybrid_candidates
+        self.rrf_k = rag_config.rrf_k
+        # BM25 索引由 collection 的全部內容建立 (remote Chroma 要分頁下載整個 collection)，寫入後失效。
+        # 在背景 thread 建立；建好之前 hybrid 查詢只用向量搜尋，lexical 查詢則會等它建好
+        self._bm25: BM25Index | None = None
+        self._bm25_generation = -1
+        self._bm25_lock = threading.Lock()
+        self._bm25_building = False
+        self._bm25_building_lock = threading.Lock()
+
+        # 每次寫入 collection 時 +1；查詢結果的 cache key 包含它，所以寫入後舊的結果自動失效
+        self._generation = 0
+        self._embedding_cache = LRUCache(rag_config.embedding_cache_size)
+        self._result_cache = LRUCache(rag_config.query_cache_size)
+
+        if self.query_mode.lower() in ("hybrid", "lexical"):
+            self._schedule_bm25_build()
+
 
     def _get_client(self, config: RagConfig):
         mode = config.client_type.lower()
@@ -146,8 +244,12 @@ class RagService:
                 tenant=config.tenant
             )
 
+        elif mode == 'local':
+            print(f"Using local vector index at {config.local_index_dir}")
+            return LocalClient(config.local_index_dir, ann_min_size=config.local_ann_min_size)
+
         else:
-            raise ValueError(f"Unsupported Chroma client_type: {mode}。Please use 'cloud' or 'http'")
+            raise ValueError(f"Unsupported Chroma client_type: {mode}。Please use 'cloud', 'http' or 'local'")
 
     def _get_embedding_function(self, provider: str, base_url: str, base_port: str, model_type: str, token: str):
         model_type = model_type.lower()
@@ -157,7 +259,11 @@ class RagService:
                 base_url=f"{base_url}:{base_port}",
                 api_key=token,
                 model_name=model_type,
-                timeout=120
+                timeout=120,
+                batch_size=Config.LLM_EMBEDDING_BATCH_SIZE,
+                max_in_flight=Config.LLM_EMBEDDING_MAX_IN_FLIGHT,
+                max_retries=Config.LLM_EMBEDDING_MAX_RETRIES,
+                retry_backoff=Config.LLM_EMBEDDING_RETRY_BACKOFF
             )
 
         elif provider == "default":
@@ -176,6 +282,7 @@ class RagService:
             metadatas=[metadata] if metadata else None,
             ids=[new_id],
         )
+        self._invalidate()
         return new_id
 
     def batch_insert(self, contents: list[str], metadatas: list[dict] = None):
@@ -186,7 +293,10 @@ class RagService:
         ids = [self.hash_content(c) for c in contents]
 
         # ChromaDB 建議分批處理（例如每 100 筆一組）
-        batch_size = 100
+        # 若 embedding function 會平行送出多個 batch，每組至少要能填滿所有 in-flight 的 request
+        ef = self.embedding_function
+        batch_size = max(100, getattr(ef, "batch_size", 0) * getattr(ef, "max_in_flight", 0))
+        start = time.perf_counter()
         for i in range(0, len(contents), batch_size):
             end = i + batch_size
             self.collection.upsert(
@@ -194,15 +304,214 @@ class RagService:
                 metadatas=metadatas[i:end] if metadatas else None,
                 ids=ids[i:end]
             )
-        print(f"✅ 已成功插入/更新 {len(contents)} 筆資料到 Collection: {self.collection.name}")
+        self._invalidate()
+        elapsed = time.perf_counter() - start
+        print(f"✅ 已成功插入/更新 {len(contents)} 筆資料到 Collection: {self.collection.name} "
+              f"({elapsed:.1f}s, {len(contents) / elapsed if elapsed else 0:.1f} chunks/s)")
+
+    def delete(self, ids: list[str]):
+        """刪除指定 ids 的資料 (例如知識庫中已被移除的 chunks)"""
+        if not ids:
+            return
+
+        batch_size = 100
+        for i in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[i:i + batch_size])
+        self._invalidate()
+        print(f"🗑️ 已從 Collection: {self.collection.name} 刪除 {len(ids)} 筆資料")
+
+    def _invalidate(self) -> None:
+        """collection 內容改變：讓 BM25 索引與查詢結果 cache 失效 (query embedding 與內容無關，保留)"""
+        self._generation += 1
+        self._result_cache.clear()
+
+    def cache_stats(self) -> dict:
+        """查詢結果與 query embedding cache 的命中率"""
+        return {
+            "collection": self.collection.name,
+            "generation": self._generation,
+            "results": self._result_cache.stats(),
+            "embeddings": self._embedding_cache.stats()
+        }
 
-    def query(self, question: str, filters: dict = None, n_results: int = 3):
+    def _embed_query(self, question: str) -> list:
+        key = (self.collection.name, normalize_query(question))
+        embedding = self._embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.embedding_function([question])[0]
+            self._embedding_cache.set(key, embedding)
+        return embedding
+
+    def _vector_query(self, question: str, filters: dict, n_results: int):
         return self.collection.query(
-            query_texts=[question],
+            query_embeddings=[self._embed_query(question)],
             n_results=n_results,
             where=filters
         )
 
+    def _get_bm25(self) -> BM25Index:
+        generation = self._generation
+        index = self._bm25
+        if index is None or self._bm25_generation != generation:
+            with self._bm25_lock:
+                index = self._bm25
+                if index is None or self._bm25_generation != generation:
+                    # 與向量索引使用同一份 chunks (ingest 寫入的內容)
+                    ids, documents, metadatas = [], [], []
+                    page_size = 1000
+                    while True:
+                        page = self.collection.get(
+                            limit=page_size, offset=len(ids), include=["documents", "metadatas"]
+                        )
+                        ids.extend(page["ids"])
+                        documents.extend(page["documents"])
+                        metadatas.extend(page["metadatas"])
+                        if len(page["ids"]) < page_size:
+                            break
+                    index = BM25Index()
+                    index.build(ids, documents, metadatas)
+                    self._bm25, self._bm25_generation = index, generation
+        return index
+
+    def _ready_bm25(self) -> BM25Index | None:
+        """The BM25 index if it matches the current collection, otherwise None (and build it in the background)."""
+        index = self._bm25
+        if index is not None and self._bm25_generation == self._generation:
+            return index
+        self._schedule_bm25_build()
+        return None
+
+    def _schedule_bm25_build(self) -> None:
+        with self._bm25_building_lock:
+            if self._bm25_building:
+                return
+            self._bm25_building = True
+        threading.Thread(target=self._build_bm25_in_background, name="bm25-build", daemon=True).start()
+
+    def _build_bm25_in_background(self) -> None:
+        start = time.perf_counter()
+        try:
+            index = self._get_bm25()
+            print(f"🔎 BM25 索引已建立: {len(index.ids)} chunks ({time.perf_counter() - start:.1f}s)")
+        except Exception as e:
+            print(f"⚠️ BM25 索引建立失敗，hybrid 查詢暫時只使用向量搜尋: {e}")
+        finally:
+            with self._bm25_building_lock:
+                self._bm25_building = False
+
+    def _lexical_query(self, question: str, filters: dict, n_results: int):
+        index = self._get_bm25()
+        hits = index.search(question, n_results=n_results, where=filters)
+        return to_query_result(
+            [index.ids[i] for i, _ in hits],
+            [index.documents[i] for i, _ in hits],
+            [index.metadatas[i] for i, _ in hits],
+            [1.0 / (1.0 + score) for _, score in hits]
+        )
+
+    def _hybrid_query(self, question: str, filters: dict, n_results: int):
+        """Vector + BM25 fused with RRF, or None while the BM25 index is still being built."""
+        index = self._ready_bm25()
+        if index is None:
+            return None
+        # API 名稱 (draw_rect_filled、Camera2D ...) 若在語料中原樣出現，BM25 就足夠了，不需要 embedding
+        if is_symbol_query(question) and index.has_term(question):
+            return self._lexical_query(question, filters, n_results)
+
+        candidates = max(n_results, self.hybrid_candidates)
+        vector = self._vector_query(question, filters, candidates)
+        lexical = index.search(question, n_results=candidates, where=filters)
+
+        documents, metadatas = {}, {}
+        for item_id, document, metadata in zip(vector["ids"][0], vector["documents"][0], vector["metadatas"][0]):
+            documents[item_id], metadatas[item_id] = document, metadata
+        for i, _ in lexical:
+            documents.setdefault(index.ids[i], index.documents[i])
+            metadatas.setdefault(index.ids[i], index.metadatas[i])
+
+        fused = reciprocal_rank_fusion([vector["ids"][0], [index.ids[i] for i, _ in lexical]], k=self.rrf_k)
+        fused = fused[:n_results]
+        # 兩邊都排第一時 RRF 分數最高 (2 / (k + 1))，換算成 0 ~ 1 的距離
+        best = 2.0 / (self.rrf_k + 1)
+        return to_query_result(
+            [item_id for item_id, _ in fused],
+            [documents[item_id] for item_id, _ in fused],
+            [metadatas[item_id] for item_id, _ in fused],
+            [1.0 - score / best for _, score in fused]
+        )
+
+    def query(self, question: str, filters: dict = None, n_results: int = 3, mode: str = None):
+        """
+        Query the collection.
+        :param mode: "vector", "lexical" (BM25 only) or "hybrid" (vector + BM25 fused with reciprocal rank
+                     fusion); defaults to RAG_QUERY_MODE
+        :type mode: str
+
+        :return: chromadb's QueryResult shape (ids / documents / metadatas / distances per query)
+
+        Results are cached (LRU, RAG_QUERY_CACHE_SIZE) by normalised question, collection, filters, n_results
+        and mode; any insert / batch_insert / delete invalidates them. Query embeddings are cached separately
+        (RAG_EMBEDDING_CACHE_SIZE), so a repeated question never re-embeds.
+
+        The BM25 index needs the whole collection (paged ``collection.get``, i.e. a full download from a remote
+        Chroma); it is built in a background thread when the service starts and after every write. Until it is
+        ready, hybrid queries return (uncached) vector results; lexical queries wait for it.
+        """
+        mode = (mode or self.query_mode).lower()
+        if mode not in ("vector", "lexical", "hybrid"):
+            raise ValueError(f"Unsupported query mode: {mode}. Please use 'vector', 'lexical' or 'hybrid'")
+
+        key = (
+            self.collection.name,
+            self._generation,
+            normalize_query(question),
+            json.dumps(filters, sort_keys=True) if filters else None,
+            n_results,
+            mode
+        )
+        result = self._result_cache.get(key)
+        if result is None:
+            if mode == "lexical":
+                result = self._lexical_query(question, filters, n_results)
+            elif mode == "hybrid":
+                result = self._hybrid_query(question, filters, n_results)
+                if result is None:
+                    # BM25 索引還在背景建立：這次只用向量搜尋，也不放進 cache
+                    return self._vector_query(question, filters, n_results)
+            else:
+                result = self._vector_query(question, filters, n_results)
+            self._result_cache.set(key, result)
+        # 呼叫端可能修改結果，不要把 cache 裡的物件交出去
+        return copy.deepcopy(result)
+
+
+_rag_services: dict[str, RagService] = {}
+_rag_services_lock = threading.Lock()
+
+
+def get_rag_service(collection_name: str) -> RagService:
+    """
+    Return the process-wide RagService for the given collection, creating it on first use.
+    Construction connects to Chroma, so it is deferred until a query actually needs it; if it fails,
+    the exception propagates and the next call tries again.
+    """
+    service = _rag_services.get(collection_name)
+    if service is None:
+        with _rag_services_lock:
+            service = _rag_services.get(collection_name)
+            if service is None:
+                service = RagService(rag_config=RagConfig(collection_name=collection_name))
+                _rag_services[collection_name] = service
+    return service
+
+
+def get_rag_cache_stats() -> list[dict]:
+    """
+    Query cache metrics of every RagService created so far (see get_rag_service).
+    """
+    with _rag_services_lock:
+        services = list(_rag_services.values())
+    return [service.cache_stats() for service in services]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+"""
+Offline Arcade 3.0 API symbol table (arcade_api_symbols.json, built by build_arcade_symbols.py).
+
+Knows every public name of ``arcade`` and of the indexed submodules (``arcade.key``, ``arcade.color`` ...), the
+call signature of every function / class, and the Arcade 2.x names that were removed in 3.0, so the static rules
+can flag ``arcade.*`` typos, removed APIs and wrong argument counts without importing Arcade.
+"""
+import difflib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+SYMBOLS_PATH = os.path.join(os.path.dirname(__file__), "arcade_api_symbols.json")
+
+
+@dataclass
+class Signature:
+    # (name, has_default)，包含 positional-only 參數
+    positional: List[Tuple[str, bool]]
+    positional_only: int
+    var_positional: bool
+    keyword_only: List[Tuple[str, bool]]
+    var_keyword: bool
+
+    @classmethod
+    def parse(cls, tokens: str) -> "Signature":
+        """Parse the table's "rect, color, tilt_angle=" format (see build_arcade_symbols.signature_tokens)."""
+        signature = cls([], 0, False, [], False)
+        keyword_only = False
+        for token in filter(None, tokens.split(", ")):
+            if token == "/":
+                signature.positional_only = len(signature.positional)
+            elif token == "*":
+                keyword_only = True
+            elif token.startswith("**"):
+                signature.var_keyword = True
+            elif token.startswith("*"):
+                signature.var_positional = True
+                keyword_only = True
+            else:
+                parameter = (token.rstrip("="), token.endswith("="))
+                (signature.keyword_only if keyword_only else signature.positional).append(parameter)
+        return signature
+
+    def check_call(self, positional: int, keywords: List[str], star_args: bool, star_kwargs: bool) -> Optional[str]:
+        """
+        :param positional: number of positional arguments of the call (without ``*args``)
+        :param keywords: explicit keyword argument names (without ``**kwargs``)
+        :return: why the call cannot bind to this signature, or None if it can
+        """
+        if not star_args and not self.var_positional and positional > len(self.positional):
+            return f"takes at most {len(self.positional)} positional argument(s) but {positional} were given"
+
+        positional_only = {name for name, _ in self.positional[:self.positional_only]}
+        named = {name for name, _ in self.positional[self.positional_only:]} | {name for name, _ in self.keyword_only}
+        for keyword in keywords:
+            if keyword in positional_only:
+                return f"got positional-only argument '{keyword}' as a keyword"
+            if keyword not in named and not self.var_keyword:
+                return f"got an unexpected keyword argument '{keyword}'"
+
+        if star_args or star_kwargs:
+            return None
+        missing = [name for index, (name, has_default) in enumerate(self.positional)
+                   if index >= positional and not has_default and name not in keywords]
+        missing += [name for name, has_default in self.keyword_only if not has_default and name not in keywords]
+        if missing:
+            return f"missing required argument(s): {', '.join(missing)}"
+        return None
+
+
+class ArcadeApi:
+    def __init__(self, table: dict):
+        self.version: str = table["arcade_version"]
+        self.removed: Dict[str, str] = table["removed"]
+        self._names: Dict[str, Set[str]] = {}
+        self._signatures: Dict[Tuple[str, str], Optional[str]] = {}
+        for module, entry in table["modules"].items():
+            self._names[module] = set(entry["callables"]) | set(entry["constants"]) | set(entry["modules"])
+            for name, tokens in entry["callables"].items():
+                self._signatures[(module, name)] = tokens
+
+    def has_module(self, module: str) -> bool:
+        return module in self._names
+
+    def has(self, module: str, name: str) -> bool:
+        return name in self._names.get(module, ())
+
+    def signature(self, module: str, name: str) -> Optional[Signature]:
+        tokens = self._signatures.get((module, name))
+        return Signature.parse(tokens) if tokens is not None else None
+
+    def suggestions(self, module: str, name: str) -> List[str]:
+        return difflib.get_close_matches(name, self._names.get(module, ()), n=3, cutoff=0.7)
+
+
+_api: Optional[ArcadeApi] = None
+_api_lock = threading.Lock()
+
+
+def get_arcade_api() -> Optional[ArcadeApi]:
+    """The symbol table (loaded once, a few ms), or None when arcade_api_symbols.json is missing."""
+    global _api
+    if _api is None:
+        with _api_lock:
+            if _api is None:
+                if not os.path.exists(SYMBOLS_PATH):
+                    print(f"⚠️ [Static Rules] {SYMBOLS_PATH} not found, Arcade API checks are skipped")
+                    return None
+                with open(SYMBOLS_PATH, "r", encoding="utf-8") as f:
+                    _api = ArcadeApi(json.load(f))
+    return _api
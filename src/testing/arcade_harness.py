@@ -0,0 +1,228 @@
+"""
+Headless fuzz harness for Arcade 3.0 games (``arcade.Window`` + ``arcade.run()``, no ``while`` main loop).
+
+The fuzzer runs this file as a script (one process per seed)::
+
+    python src/testing/arcade_harness.py <game.py> [--logic fuzz_logic.py] [--frames 3600] [--draw-interval 60]
+
+``arcade.run`` is replaced by a loop that drives the game window directly: every simulated frame runs the
+monkey-bot logic, then ``on_fixed_update`` / ``on_update`` with a fixed ``delta_time`` of 1/60 s (simulated
+clock, no waiting for vsync). The simulated time also drives pyglet's scheduler (``arcade.schedule`` /
+``schedule_once`` callbacks) and Arcade's ``GLOBAL_CLOCK``, so timers fire on game time. Nothing is rendered, except that ``on_draw`` is called every ``--draw-interval``
+frames so drawing code is still exercised (0 disables it). Input handlers (``on_key_press``, ``on_mouse_*``, ...)
+are forwarded to the current ``arcade.View`` like pyglet's event dispatch does, and counted.
+
+This file only uses the standard library on purpose: it is executed with the game's interpreter and cwd,
+without the project on ``sys.path``. It reports "frames events game_seconds maxrss cpu_seconds" on
+``FUZZ_HEARTBEAT_FD`` like the injected pygame bot, and seeds the bot's random generator with ``FUZZ_SEED``.
+"""
+import argparse
+import os
+import random
+import sys
+import textwrap
+import time
+import types
+
+try:
+    import resource  # POSIX only: peak RSS / CPU time in the heartbeat
+except ImportError:
+    resource = None
+
+DELTA_TIME = 1 / 60
+HEARTBEAT_INTERVAL = 0.1
+
+INPUT_EVENTS = (
+    "on_key_press", "on_key_release",
+    "on_mouse_press", "on_mouse_release", "on_mouse_drag", "on_mouse_motion", "on_mouse_scroll"
+)
+
+# 沒有 fuzz_logic.py 時使用：隨機按鍵與滑鼠拖曳 (與 FUZZER_GENERATION_PROMPT 的格式相同，直接呼叫 window 的事件方法)
+DEFAULT_LOGIC = """
+if random.random() < 0.1:
+    _k = random.choice([arcade.key.SPACE, arcade.key.LEFT, arcade.key.RIGHT, arcade.key.UP, arcade.key.DOWN,
+                        arcade.key.A, arcade.key.W, arcade.key.S, arcade.key.D, arcade.key.ENTER])
+    window.on_key_press(_k, 0)
+    window.on_key_release(_k, 0)
+
+if random.random() < 0.05:
+    _x, _y = random.randint(0, window.width), random.randint(0, window.height)
+    window.on_mouse_press(_x, _y, arcade.MOUSE_BUTTON_LEFT, 0)
+    _dx, _dy = random.randint(-200, 200), random.randint(-200, 200)
+    window.on_mouse_drag(_x + _dx // 2, _y + _dy // 2, _dx // 2, _dy // 2, arcade.MOUSE_BUTTON_LEFT, 0)
+    window.on_mouse_release(_x + _dx, _y + _dy, arcade.MOUSE_BUTTON_LEFT, 0)
+"""
+
+
+class _Heartbeat:
+    def __init__(self, fd: str):
+        self.fd = int(fd) if fd else None
+        self.frames = 0
+        self.events = 0
+        self.seconds = 0.0
+        self._last = 0.0
+
+    def beat(self, force: bool = False) -> None:
+        if self.fd is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last < HEARTBEAT_INTERVAL:
+            return
+        self._last = now
+        line = f"{self.frames} {self.events} {self.seconds:.2f}"
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            line += f" {usage.ru_maxrss} {usage.ru_utime + usage.ru_stime:.2f}"
+        try:
+            os.write(self.fd, f"{line}\n".encode())
+        except OSError:
+            pass
+
+
+def load_logic(path: str) -> str:
+    if not path or not os.path.exists(path):
+        return DEFAULT_LOGIC
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    # random 一律用有 seed 的 generator (與 inject_monkey_bot 相同的處理)
+    lines = [line for line in lines if not line.strip().startswith("import random")]
+    return textwrap.dedent("\n".join(lines)).strip() or "pass"
+
+
+class ArcadeHarness:
+    def __init__(self, logic: str, frames: int, draw_interval: int, seed: str, heartbeat: _Heartbeat):
+        self.logic = compile(logic, "fuzz_logic.py", "exec")
+        self.frames = frames
+        self.draw_interval = draw_interval
+        self.random = random.Random(int(seed) if seed else None)
+        self.heartbeat = heartbeat
+        self.ran = False
+        self.now = 0.0
+        self._error = None
+
+    def _forward(self, window, name: str, count: bool):
+        """Replace ``window.<name>`` with a handler that calls the current view first, then the window."""
+        original = getattr(window, name, None)
+        if original is None:
+            return
+
+        def handler(*args):
+            if count:
+                self.heartbeat.events += 1
+            try:
+                view = getattr(window, "current_view", None)
+                view_handler = getattr(view, name, None) if view is not None else None
+                # pyglet: handler 回傳 True (EVENT_HANDLED) 就不再往下傳
+                if view_handler is not None and view_handler(*args) is True:
+                    return True
+                return original(*args)
+            except Exception as exc:
+                # 記下來自遊戲的例外，bot 邏輯本身的錯誤則忽略
+                self._error = exc
+                raise
+
+        setattr(window, name, handler)
+
+    def _simulated_clocks(self, arcade) -> list:
+        """
+        Point pyglet's default clock at the simulated time and return the clocks to tick every frame.
+        Every lookup is guarded: these are internals that differ between pyglet / Arcade versions.
+        """
+        tickers = []
+        try:
+            import pyglet
+            pyglet_clock = pyglet.clock.get_default()
+            pyglet_clock.time = lambda: self.now
+            tickers.append(lambda delta_time: pyglet_clock.tick())
+        except Exception:
+            pass
+        clock_module = getattr(arcade, "clock", None)
+        for name in ("GLOBAL_CLOCK", "GLOBAL_FIXED_CLOCK"):
+            arcade_clock = getattr(clock_module, name, None)
+            if hasattr(arcade_clock, "tick"):
+                tickers.append(arcade_clock.tick)
+        return tickers
+
+    def run(self, arcade, window) -> None:
+        """Replacement for ``arcade.run()``."""
+        self.ran = True
+        if window is None:
+            raise RuntimeError("arcade.run() was called before an arcade.Window was created")
+        tickers = self._simulated_clocks(arcade)
+        for name in INPUT_EVENTS:
+            self._forward(window, name, count=True)
+        for name in ("on_fixed_update", "on_update", "on_draw"):
+            self._forward(window, name, count=False)
+
+        # bot 邏輯自己的變數 (跨 frame 保留，不寫進遊戲的 globals)
+        bot_state = {"window": window, "random": self.random, "_monkey_random": self.random}
+        game_globals = sys.modules["__main__"].__dict__  # 遊戲的 module globals (SCREEN_WIDTH, arcade ...)
+        for frame in range(self.frames):
+            # globals 與 locals 必須是同一個 dict：否則 bot 邏輯中的 lambda / comprehension 看不到它自己設定的變數
+            namespace = {**game_globals, **bot_state}
+            try:
+                exec(self.logic, namespace)
+            except Exception as exc:
+                if exc is self._error:
+                    raise
+            for name, value in namespace.items():
+                if game_globals.get(name, bot_state) is not value:
+                    bot_state[name] = value
+            self.now += DELTA_TIME
+            for tick in tickers:
+                tick(DELTA_TIME)
+            window.on_fixed_update(DELTA_TIME)
+            window.on_update(DELTA_TIME)
+            if self.draw_interval and frame % self.draw_interval == 0:
+                window.on_draw()
+            self.heartbeat.frames += 1
+            self.heartbeat.seconds = self.now
+            self.heartbeat.beat()
+        self.heartbeat.beat(force=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("game")
+    parser.add_argument("--logic", default=None, help="Monkey-bot logic run before every frame")
+    parser.add_argument("--frames", type=int, default=3600, help="Simulated frames (60 per simulated second)")
+    parser.add_argument("--draw-interval", type=int, default=60, help="Call on_draw every N frames (0: never)")
+    args = parser.parse_args()
+
+    game_path = os.path.abspath(args.game)
+    harness = ArcadeHarness(
+        load_logic(args.logic),
+        args.frames,
+        args.draw_interval,
+        os.environ.get("FUZZ_SEED"),
+        _Heartbeat(os.environ.get("FUZZ_HEARTBEAT_FD"))
+    )
+
+    import arcade
+
+    def _run(*_args, **_kwargs):
+        harness.run(arcade, arcade.get_window())
+
+    # arcade.run() 與 Window.run() (內部呼叫 window_commands.run) 都改成 harness 的迴圈
+    arcade.run = _run
+    window_commands = getattr(arcade, "window_commands", None)
+    if window_commands is not None and hasattr(window_commands, "run"):
+        window_commands.run = _run
+
+    # 以 __main__ 執行遊戲 (與 `python main.py` 相同的 sys.path[0] 與 __name__)
+    sys.argv = [game_path]
+    sys.path[0] = os.path.dirname(game_path)
+    with open(game_path, "r", encoding="utf-8") as f:
+        code = compile(f.read(), game_path, "exec")
+    game_module = types.ModuleType("__main__")
+    game_module.__file__ = game_path
+    sys.modules["__main__"] = game_module
+    exec(code, game_module.__dict__)
+
+    if not harness.ran:
+        sys.stderr.write("Fuzz harness error: the game never called arcade.run(), so no frame was simulated.\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
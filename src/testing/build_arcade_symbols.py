@@ -0,0 +1,210 @@
+"""
+Build src/testing/arcade_api_symbols.json, the Arcade 3.0 symbol table used by the static rules (arcade_api.py).
+
+The table is extracted from an installed Arcade 3.x by introspection (names, call signatures) and committed, so the
+checks need neither Arcade nor a display at runtime. The knowledge base has no signatures (``doc_api_*`` only lists
+the API pages), so its example code is used to cross-check the result instead: every ``arcade.X`` used by the
+examples should resolve.
+
+Usage (in an environment with arcade 3.x installed; no display needed)::
+
+    python -m src.testing.build_arcade_symbols
+    python -m src.testing.build_arcade_symbols --check   # only compare with the committed table
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import re
+import sys
+
+from config import config
+from src.testing.arcade_api import SYMBOLS_PATH
+
+# 除了 arcade 本身，也建立索引的子模組 (arcade.key.X、arcade.color.X ...)
+SUBMODULES = ("key", "color", "csscolor", "uicolor", "math", "shape_list", "particles", "camera", "gui")
+
+# Arcade 2.x 有、3.0 已移除的名稱 -> 3.0 的寫法 (無法從 3.0 套件取得，手動維護；建置時會確認它們確實不存在)
+REMOVED_2X = {
+    "draw_rectangle_filled": "arcade.draw_rect_filled(arcade.XYWH(x, y, w, h), color)",
+    "draw_rectangle_outline": "arcade.draw_rect_outline(arcade.XYWH(x, y, w, h), color, border_width)",
+    "draw_lrtb_rectangle_filled": "arcade.draw_lrbt_rectangle_filled(left, right, bottom, top, color)",
+    "draw_lrtb_rectangle_outline": "arcade.draw_lrbt_rectangle_outline(left, right, bottom, top, color)",
+    "draw_xywh_rectangle_filled": "arcade.draw_rect_filled(arcade.LBWH(left, bottom, w, h), color)",
+    "draw_xywh_rectangle_outline": "arcade.draw_rect_outline(arcade.LBWH(left, bottom, w, h), color)",
+    "draw_texture_rectangle": "arcade.draw_texture_rect(texture, arcade.XYWH(x, y, w, h))",
+    "draw_scaled_texture_rectangle": "arcade.draw_texture_rect(texture, arcade.XYWH(x, y, w, h).scale(scale))",
+    "draw_lrwh_rectangle_textured": "arcade.draw_texture_rect(texture, arcade.LBWH(left, bottom, w, h))",
+    "Camera": "arcade.Camera2D()",
+    "set_viewport": "an arcade.Camera2D (camera.position / camera.projection) and camera.use()",
+    "get_viewport": "camera.viewport / camera.projection of an arcade.Camera2D",
+    "ShapeElementList": "arcade.shape_list.ShapeElementList",
+    "create_rectangle_filled": "arcade.shape_list.create_rectangle_filled",
+    "create_rectangle_outline": "arcade.shape_list.create_rectangle_outline",
+    "create_line": "arcade.shape_list.create_line",
+    "create_polygon": "arcade.shape_list.create_polygon",
+    "create_ellipse_filled": "arcade.shape_list.create_ellipse_filled",
+    "load_textures": "arcade.load_spritesheet(path).get_texture_grid(size, columns, count)",
+    "load_texture_pair": "(texture, texture.flip_left_right())",
+    "AnimatedTimeBasedSprite": "arcade.TextureAnimationSprite",
+    "AnimationKeyframe": "arcade.TextureKeyframe",
+    "get_scaling_factor": "window.get_pixel_ratio()",
+    "get_projection": "camera.projection of an arcade.Camera2D",
+    "process_layer": "arcade.load_tilemap(path).sprite_lists[layer_name]",
+    "quick_run": "arcade.run()",
+    "Emitter": "arcade.particles.Emitter",
+    "EmitBurst": "arcade.particles.EmitBurst",
+    "FadeParticle": "arcade.particles.FadeParticle",
+    "PhysicsEnginePymunk": "arcade.PymunkPhysicsEngine",
+}
+
+ARCADE_REFERENCE = re.compile(r"\barcade\.([A-Za-z_]\w*)(?:\.([A-Za-z_]\w*))?")
+
+
+def signature_tokens(obj) -> str | None:
+    """``draw_rect_filled`` -> "rect, color, tilt_angle=" (defaults and annotations dropped), None if unknown."""
+    try:
+        signature = inspect.signature(obj)
+    except (TypeError, ValueError):
+        return None
+    tokens = []
+    keyword_only_started = False
+    parameters = list(signature.parameters.values())
+    for index, parameter in enumerate(parameters):
+        default = "=" if parameter.default is not inspect.Parameter.empty else ""
+        if parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+            tokens.append(f"*{parameter.name}")
+            keyword_only_started = True
+        elif parameter.kind is inspect.Parameter.VAR_KEYWORD:
+            tokens.append(f"**{parameter.name}")
+        elif parameter.kind is inspect.Parameter.KEYWORD_ONLY:
+            if not keyword_only_started:
+                tokens.append("*")
+                keyword_only_started = True
+            tokens.append(parameter.name + default)
+        else:
+            tokens.append(parameter.name + default)
+            following = parameters[index + 1] if index + 1 < len(parameters) else None
+            if parameter.kind is inspect.Parameter.POSITIONAL_ONLY and \
+                    (following is None or following.kind is not inspect.Parameter.POSITIONAL_ONLY):
+                tokens.append("/")
+    return ", ".join(tokens)
+
+
+def defined_in(obj, module) -> bool:
+    """Whether ``obj`` is a class / function defined in ``module`` (or one of its submodules), not imported into it."""
+    owner = getattr(obj, "__module__", None)
+    return isinstance(owner, str) and (owner == module.__name__ or owner.startswith(module.__name__ + "."))
+
+
+def public_names(module) -> set[str]:
+    """
+    The module's API: ``__all__`` when it exists, so incidental imports (``arcade.os``, ``arcade.Path``,
+    ``arcade.annotations`` ...) are not valid names, plus the classes / functions the module defines itself that
+    ``__all__`` forgot (``arcade.math.rotate_around_point``). Modules without ``__all__`` (``arcade.key``,
+    ``arcade.color``) are constant tables, every public name of ``dir()`` minus imported modules.
+    """
+    names = {name for name in dir(module) if not name.startswith("_")}
+    exported = getattr(module, "__all__", None)
+    if exported is None:
+        return {name for name in names if not inspect.ismodule(getattr(module, name))}
+    return set(exported) | {name for name in names if defined_in(getattr(module, name), module)}
+
+
+def index_module(module) -> dict:
+    entry = {"callables": {}, "constants": [], "modules": []}
+    # arcade.gui 等子套件要另外 import 才會成為屬性，但 `import arcade.gui` 之後就是合法的用法
+    subpackages = {info.name for info in pkgutil.iter_modules(getattr(module, "__path__", []))
+                   if not info.name.startswith("_")}
+    names = public_names(module) | subpackages
+    for name in sorted(names):
+        obj = getattr(module, name, None)
+        if inspect.ismodule(obj) or (obj is None and name in subpackages):
+            entry["modules"].append(name)
+        elif callable(obj) and not isinstance(obj, (int, float, str, tuple)):
+            entry["callables"][name] = signature_tokens(obj)
+        else:
+            entry["constants"].append(name)
+    return entry
+
+
+def build() -> dict:
+    os.environ.setdefault("ARCADE_HEADLESS", "1")
+    import arcade
+
+    modules = {"arcade": index_module(arcade)}
+    for name in SUBMODULES:
+        try:
+            submodule = importlib.import_module(f"arcade.{name}")
+        except Exception as e:
+            print(f"⚠️ skip arcade.{name}: {e}")
+            continue
+        modules[f"arcade.{name}"] = index_module(submodule)
+
+    removed = {}
+    for name, hint in REMOVED_2X.items():
+        if hasattr(arcade, name):
+            print(f"⚠️ arcade.{name} still exists in {arcade.version.VERSION}, not listed as removed")
+        else:
+            removed[name] = hint
+
+    return {"arcade_version": arcade.version.VERSION, "modules": modules, "removed": removed}
+
+
+def unresolved_example_references(table: dict) -> dict[str, int]:
+    """``arcade.X`` / ``arcade.<submodule>.X`` used in the knowledge base's code that are not in ``table``."""
+    modules = table["modules"]
+    known = {module: set(entry["callables"]) | set(entry["constants"]) | set(entry["modules"])
+             for module, entry in modules.items()}
+    unresolved = {}
+    for file_name in sorted(os.listdir(config.ARCADE_SOURCE_DIR)):
+        if not file_name.endswith(".md"):
+            continue
+        with open(os.path.join(config.ARCADE_SOURCE_DIR, file_name), "r", encoding="utf-8") as f:
+            text = f.read()
+        for name, attribute in ARCADE_REFERENCE.findall(text):
+            if name not in known["arcade"]:
+                reference = f"arcade.{name}"
+            elif attribute and f"arcade.{name}" in known and attribute not in known[f"arcade.{name}"]:
+                reference = f"arcade.{name}.{attribute}"
+            else:
+                continue
+            unresolved[reference] = unresolved.get(reference, 0) + 1
+    return unresolved
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="Compare with the committed table instead of writing it")
+    args = parser.parse_args()
+
+    table = build()
+    counts = {module: sum(len(values) for values in entry.values()) for module, entry in table["modules"].items()}
+    print(f"arcade {table['arcade_version']}: " + ", ".join(f"{module} {count}" for module, count in counts.items())
+          + f", removed 2.x names {len(table['removed'])}")
+
+    unresolved = unresolved_example_references(table)
+    if unresolved:
+        print(f"knowledge base references not in the table ({len(unresolved)}, mostly 2.x docs or prose):")
+        for reference, count in sorted(unresolved.items(), key=lambda item: -item[1])[:30]:
+            print(f"  {reference} ({count})")
+
+    if args.check:
+        with open(SYMBOLS_PATH, "r", encoding="utf-8") as f:
+            committed = json.load(f)
+        if committed != table:
+            print(f"❌ {SYMBOLS_PATH} is out of date, rebuild it")
+            sys.exit(1)
+        print("✅ symbol table is up to date")
+        return
+
+    with open(SYMBOLS_PATH, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=1, sort_keys=True)
+        f.write("\n")
+    print(f"✅ wrote {SYMBOLS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
-from typing import Optional, Any, Generator
+from dataclasses import dataclass
+from typing import Optional, Any, Generator, AsyncGenerator, List
 
-from src.utils import call_llm
-from src.testing.prompts import FIXER_PROMPT, LOGIC_REVIEW_PROMPT, LOGIC_FIXER_PROMPT
+from src.utils import acall_llm, run_sync, iter_sync, astream_deltas, format_sse, DeltaCallback
+from src.testing.prompts import (FIXER_PROMPT, LOGIC_REVIEW_PROMPT, LOGIC_FIXER_PROMPT, PATCH_FIXER_PROMPT,
+                                 LOGIC_PATCH_FIXER_PROMPT)
+from src.testing.patcher import PatchError, apply_patch
+from src.testing.static_rules import static_rules_check
+from src.generation.arcade_tools import estimate_tokens
 from src.generation.file_utils import save_code_to_file
 from src.testing.fuzzer import run_fuzz_test
 from config import config
+import asyncio
 import os
 import ast
+import shutil
+import threading
+
+# 驗證階段 (越後面代表候選修復走得越遠)；"logic+runtime" 是 pipeline 模式下兩項檢查都失敗
+STAGES = ("syntax", "logic+runtime", "logic", "runtime")
+STAGE_LABELS = {"syntax": "語法錯誤", "logic": "邏輯錯誤", "runtime": "運行時錯誤 (Fuzzer)",
+                "logic+runtime": "邏輯錯誤 + 運行時錯誤 (Fuzzer)"}
 
 def static_code_check(file_path: str) -> tuple[bool, str]:
     """
@@ -23,11 +36,24 @@ def static_code_check(file_path: str) -> tuple[bool, str]:
     except Exception as e:
         return False, f"其他錯誤 ❌: {e}"
 
-def game_logic_check(gdd:str ,file_path: str, provider: str = "openai", model: str = "gpt-4o-mini") -> tuple[bool, str]:
+async def agame_logic_check(gdd:str ,file_path: str, provider: str = "openai", model: str = "gpt-4o-mini") -> tuple[bool, str]:
+    """
+    Logic review gate. Depending on LOGIC_REVIEW_MODE the deterministic AST rules (static_rules_check, milliseconds)
+    run first and the LLM review (LOGIC_REVIEW_PROMPT) only runs when they pass ("rules+llm"), never ("rules"),
+    or alone ("llm").
+    """
+    if config.LOGIC_REVIEW_MODE in ("rules", "rules+llm"):
+        rules_passed, error_msg = static_rules_check(file_path)
+        if not rules_passed:
+            print(f"[Member 3]: static rules of game_logic_check failed\n{error_msg}")
+            return False, error_msg
+        if config.LOGIC_REVIEW_MODE == "rules":
+            return True, ""
+
     with open(file_path, "r", encoding="utf-8") as f:
         code = f.read()
     prompt = LOGIC_REVIEW_PROMPT.format(code=code)
-    response = call_llm("You are a code logic reviewer.",
+    response = await acall_llm("You are a code logic reviewer.",
              prompt,
              provider=provider,
              model=model
@@ -36,12 +62,31 @@ def game_logic_check(gdd:str ,file_path: str, provider: str = "openai", model: s
     if "PASS" in response.upper() : return True, ""
     return False, response
 
-def run_fix(file_path: str, error_message: str, provider: str = "openai"
-                 , model: str  = "gpt-4o-mini", fix_type: str="syntax", gdd: Optional[str]="") -> tuple[str | None, str]:
+def game_logic_check(gdd:str ,file_path: str, provider: str = "openai", model: str = "gpt-4o-mini") -> tuple[bool, str]:
+    return run_sync(agame_logic_check(gdd, file_path, provider, model))
+
+def _log_fix_tokens(mode: str, prompt: str, response: str) -> int:
+    """印出一次修復呼叫的 (估計) token 數，回傳總數"""
+    prompt_tokens, response_tokens = estimate_tokens(prompt), estimate_tokens(response)
+    print(f"📊 [Fixer] {mode} fix: ~{prompt_tokens} prompt + ~{response_tokens} response tokens "
+          f"(~{prompt_tokens + response_tokens} total)")
+    return prompt_tokens + response_tokens
+
+
+async def arun_fix(file_path: str, error_message: str, provider: str = "openai"
+                 , model: str  = "gpt-4o-mini", fix_type: str="syntax", gdd: Optional[str]="",
+                   on_delta: Optional[DeltaCallback] = None, temperature: float = 0.7,
+                   filename: str = "main.py") -> tuple[str | None, str]:
     """
     Auto Fix Loop: Read Codes -> Submit Errors -> Get new codes -> save
     The first return is the path to the fixed file.
     The second return is the result message.
+    on_delta: optional callback receiving the fixer's streamed tokens.
+    temperature / filename: used by the speculative mode to sample different candidates into separate files.
+
+    With FIXER_PATCH_MODE the model only returns SEARCH/REPLACE blocks (PATCH_FIXER_PROMPT, or for logic fixes
+    LOGIC_PATCH_FIXER_PROMPT with the GDD), applied by src.testing.patcher; the full-rewrite prompts are used only
+    when the patch cannot be applied.
     """
     print(f"[Member 3] 正在嘗試修復代碼... (Error: {error_message[:50]}...)")
 
@@ -52,20 +97,50 @@ def run_fix(file_path: str, error_message: str, provider: str = "openai"
     with open(file_path, "r", encoding="utf-8") as f:
         broken_code = f.read()
 
+    output_dir: str = os.path.dirname(file_path)
     response: str  = ""
 
+    if config.FIXER_PATCH_MODE:
+        if fix_type == "logic":
+            # 邏輯 / 運行時錯誤需要 GDD，才能修成設計中的遊戲機制
+            system_prompt = "You are a code logics fixer."
+            patch_prompt: str = LOGIC_PATCH_FIXER_PROMPT.format(code=broken_code, error=error_message, gdd=gdd)
+        else:
+            system_prompt = "You are a Code error Fixer."
+            patch_prompt: str = PATCH_FIXER_PROMPT.format(code=broken_code, error=error_message)
+        response = await acall_llm(system_prompt, patch_prompt, provider=provider, model=model,
+                                   temperature=temperature, on_delta=on_delta)
+        _log_fix_tokens("patch", patch_prompt, response)
+        try:
+            patched_code, hunks = apply_patch(broken_code, response, config.FIXER_PATCH_FUZZY_THRESHOLD)
+            new_path = os.path.join(output_dir, filename)
+            with open(new_path, "w", encoding="utf-8") as f:
+                f.write(patched_code)
+            print(f"🩹 [Fixer] 已套用 {hunks} 個 patch 區塊")
+            return new_path, response
+        except PatchError as e:
+            # 模型沒照格式、直接給了整份程式碼時就直接使用，不必再呼叫一次
+            if "```python" in response and "<<<<<<<" not in response and "@@" not in response:
+                new_path = save_code_to_file(response, output_dir=output_dir, filename=filename)
+                if new_path:
+                    return new_path, response
+            print(f"⚠️ [Fixer] Patch 無法套用，改為完整重寫: {e}")
+
     if fix_type == "syntax":
         # Insert the codes to the prompt
         fix_syntax_full_prompt: str = FIXER_PROMPT.format(code=broken_code, error=error_message)
         # Call LLM for fixing
-        response = call_llm("You are a Code error Fixer.", fix_syntax_full_prompt, provider=provider, model=model)
+        response = await acall_llm("You are a Code error Fixer.", fix_syntax_full_prompt, provider=provider, model=model,
+                                   temperature=temperature, on_delta=on_delta)
+        _log_fix_tokens("full", fix_syntax_full_prompt, response)
     elif fix_type == "logic":
         fix_logic_full_prompt: str = LOGIC_FIXER_PROMPT.format(code=broken_code, error=error_message, gdd=gdd)
-        response = call_llm("You are a code logics fixer.", fix_logic_full_prompt, provider=provider, model=model)
+        response = await acall_llm("You are a code logics fixer.", fix_logic_full_prompt, provider=provider, model=model,
+                                   temperature=temperature, on_delta=on_delta)
+        _log_fix_tokens("full", fix_logic_full_prompt, response)
 
     # Save the fixed files (truncate)
-    output_dir: str = os.path.dirname(file_path)
-    new_path: str | None = save_code_to_file(response, output_dir=output_dir)
+    new_path: str | None = save_code_to_file(response, output_dir=output_dir, filename=filename)
 
     if new_path:
         return new_path, response
@@ -73,56 +148,254 @@ def run_fix(file_path: str, error_message: str, provider: str = "openai"
         return None, response
 
 
-def run_fix_loop(gdd: str, file_path: str, provider: str = "openai",
-                 model: str = "gpt-4o-mini") -> Generator[str, None, None]:
+def run_fix(file_path: str, error_message: str, provider: str = "openai"
+                 , model: str  = "gpt-4o-mini", fix_type: str="syntax", gdd: Optional[str]="",
+            on_delta: Optional[DeltaCallback] = None) -> tuple[str | None, str]:
+    return run_sync(arun_fix(file_path, error_message, provider, model, fix_type, gdd, on_delta))
+
+
+async def acheck_game(gdd: str, file_path: str, provider: str = "openai", model: str = "gpt-4o-mini",
+                      fuzz_workers: Optional[int] = None,
+                      cancel_event: Optional[threading.Event] = None) -> AsyncGenerator[tuple[str, Any], None]:
     """
-    Generator function for SSE (Server-Sent Events).
-    Yields strings in the format: "data: <message>\n\n"
+    Run the checks (syntax -> logic review -> fuzzer) on one file, stopping at the first failure.
+    Yields ("progress", SSE message) for every passed stage, then ("result", (passed, failed_stage, error_msg)) once;
+    failed_stage is one of STAGES (None when everything passed).
+    With FIXER_PIPELINED_CHECKS the logic review and the fuzzer run concurrently once the syntax passes
+    (see _acheck_pipelined).
     """
-    yield f"data: [Member 3] 收到需求，開始驗證: {os.path.basename(file_path)}\n\n"
+    syntax_is_valid, error_msg = static_code_check(file_path)
+    if not syntax_is_valid:
+        yield "result", (False, "syntax", error_msg)
+        return
+    yield "progress", "data: ✅ 語法正確\n\n"
 
-    max_retries: int = 3
-    game_is_valid = False
-    error_msg = ""
+    if config.FIXER_PIPELINED_CHECKS:
+        async for item in _acheck_pipelined(gdd, file_path, provider, model, fuzz_workers):
+            yield item
+        return
 
-    while (not game_is_valid) and (max_retries > 0):
-        syntax_is_valid, error_msg = static_code_check(file_path)
-        if not syntax_is_valid:
-            yield f"data: ❌ 語法錯誤: {error_msg} (嘗試修復中...)\n\n"
-            print(f"[Member3]: ❌ 語法錯誤: {error_msg}")
+    logic_is_valid, error_msg = await agame_logic_check(gdd, file_path, provider, model)
+    if not logic_is_valid:
+        yield "result", (False, "logic", error_msg)
+        return
+    yield "progress", "data: ✅ 邏輯正確\n\n"
 
-            file_path, error_msg = run_fix(file_path, error_msg, provider, model, "syntax")
-            max_retries -= 1
-            continue
+    # Fuzzer 是阻塞的 subprocess，丟到 thread 執行以免卡住 event loop
+    fuzz_passed, error_msg = await asyncio.to_thread(
+        run_fuzz_test, file_path, config.FUZZER_RUNNING_TIME, fuzz_workers or config.FUZZER_WORKERS,
+        None, cancel_event
+    )
+    if not fuzz_passed:
+        yield "result", (False, "runtime", error_msg)
+        return
+    yield "progress", "data: ✅ 運行功能正確\n\n"
 
-        yield "data: ✅ 語法正確\n\n"
+    yield "result", (True, None, "")
 
-        logic_is_valid, error_msg = game_logic_check(gdd, file_path, provider, model)
-        if not logic_is_valid:
-            yield f"data: ❌ 邏輯錯誤: {error_msg} (嘗試修復中...)\n\n"
-            print(f"[Member3]: ❌ 邏輯錯誤: {error_msg}")
 
-            file_path, error_msg = run_fix(file_path, error_msg, provider, model, "logic", gdd)
-            max_retries -= 1
-            continue
+async def _acheck_pipelined(gdd: str, file_path: str, provider: str, model: str,
+                            fuzz_workers: Optional[int]) -> AsyncGenerator[tuple[str, Any], None]:
+    """
+    Logic review and fuzzer at the same time. After the first failure the other check gets
+    FIXER_PIPELINE_MERGE_WINDOW more seconds: if it fails too, both errors are merged into one fix request
+    ("logic+runtime"), otherwise it is cancelled (the fuzz processes are killed through their cancel event).
+    """
+    loop = asyncio.get_running_loop()
+    fuzz_cancel = threading.Event()
+    pending = {
+        asyncio.ensure_future(agame_logic_check(gdd, file_path, provider, model)): "logic",
+        asyncio.ensure_future(asyncio.to_thread(
+            run_fuzz_test, file_path, config.FUZZER_RUNNING_TIME, fuzz_workers or config.FUZZER_WORKERS,
+            None, fuzz_cancel
+        )): "runtime",
+    }
+    passed_messages = {"logic": "data: ✅ 邏輯正確\n\n", "runtime": "data: ✅ 運行功能正確\n\n"}
+    errors: dict[str, str] = {}
+    deadline = None
+    try:
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break  # 合併等待時間已過，放棄另一項檢查
+            for task in done:
+                stage = pending.pop(task)
+                passed, error_msg = task.result()
+                if passed:
+                    yield "progress", passed_messages[stage]
+                else:
+                    errors[stage] = error_msg
+                    if deadline is None:
+                        deadline = loop.time() + config.FIXER_PIPELINE_MERGE_WINDOW
+    finally:
+        # 另一項檢查被取消 (或整個候選被取消) 時，停止仍在 thread 中執行的 fuzz
+        fuzz_cancel.set()
+        for task in pending:
+            task.cancel()
+
+    if not errors:
+        yield "result", (True, None, "")
+    elif len(errors) == 1:
+        stage, error_msg = next(iter(errors.items()))
+        yield "result", (False, stage, error_msg)
+    else:
+        merged = f"[Logic Review]\n{errors['logic']}\n\n[Runtime (Fuzzer)]\n{errors['runtime']}"
+        yield "result", (False, "logic+runtime", merged)
 
-        yield "data: ✅ 邏輯正確\n\n"
 
-        fuzz_passed, error_msg = run_fuzz_test(file_path, config.FUZZER_RUNNING_TIME)
-        if not fuzz_passed:
-            yield f"data: ❌ 運行時錯誤 (Fuzzer): {error_msg} (嘗試修復中...)\n\n"
-            print(f"[Member3]: ❌ 運行時錯誤 (Fuzzer): {error_msg}")
+@dataclass
+class FixCandidate:
+    index: int
+    temperature: float
+    path: Optional[str]
+    passed: bool
+    # 沒通過時：失敗的階段 (STAGES) 與錯誤訊息
+    stage: Optional[str] = None
+    error: str = ""
 
-            file_path, error_msg = run_fix(file_path, error_msg, provider, model, "logic", gdd)
-            max_retries -= 1
-            continue
 
-        yield "data: ✅ 運行功能正確\n\n"
+def candidate_temperatures(count: int) -> List[float]:
+    temperatures = [float(t) for t in config.FIXER_CANDIDATE_TEMPERATURES.split(",") if t.strip()] or [0.7]
+    return [temperatures[i % len(temperatures)] for i in range(count)]
 
-        game_is_valid = True
+
+async def arun_speculative_fix(file_path: str, error_message: str, provider: str = "openai",
+                               model: str = "gpt-4o-mini", fix_type: str = "syntax", gdd: Optional[str] = "",
+                               on_delta: Optional[DeltaCallback] = None,
+                               candidates: Optional[int] = None) -> FixCandidate:
+    """
+    Speculative fix: request ``candidates`` fixes in parallel (FIXER_CANDIDATE_TEMPERATURES), each saved to its own
+    file, and validate them concurrently with acheck_game. The first candidate that passes every check wins and
+    the others are cancelled (LLM calls and fuzz runs included).
+
+    The chosen candidate (the winner, or else the one that got furthest through the checks) is copied to
+    ``file_path`` and the candidate files are removed. on_delta receives one progress line per finished candidate.
+    """
+    count = candidates or config.FIXER_SPECULATIVE_CANDIDATES
+    output_dir = os.path.dirname(file_path)
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    # 同時跑 count 個 fuzz，每個候選分到的 worker 數跟著減少，避免 CPU 超賣
+    fuzz_workers = max(1, config.FUZZER_WORKERS // count)
+    cancel_event = threading.Event()
+
+    async def run_candidate(index: int, temperature: float) -> FixCandidate:
+        try:
+            path, _ = await arun_fix(file_path, error_message, provider, model, fix_type, gdd,
+                                     temperature=temperature, filename=f"{stem}_candidate_{index}.py")
+            if not path:
+                return FixCandidate(index, temperature, None, False, fix_type, "No code in the fixer response")
+            result = None
+            async for kind, value in acheck_game(gdd, path, provider, model, fuzz_workers, cancel_event):
+                if kind == "result":
+                    result = value
+            passed, stage, error = result
+            return FixCandidate(index, temperature, path, passed, stage, error)
+        except Exception as e:
+            return FixCandidate(index, temperature, None, False, fix_type, f"Candidate failed: {e}")
+
+    tasks = [asyncio.ensure_future(run_candidate(i, t)) for i, t in enumerate(candidate_temperatures(count))]
+    finished: List[FixCandidate] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            candidate = await next_done
+            finished.append(candidate)
+            if on_delta:
+                status = "✅ 通過所有驗證" if candidate.passed else f"❌ {STAGE_LABELS.get(candidate.stage, candidate.stage)}"
+                on_delta(f"[Fixer] 候選 {candidate.index + 1}/{count} (temperature {candidate.temperature}): {status}")
+            if candidate.passed:
+                break
+    finally:
+        # 第一個通過就取消其他候選 (fuzz 跑在 thread 裡，靠 cancel_event 停止)
+        cancel_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    with_code = [candidate for candidate in finished if candidate.path]
+    if with_code:
+        best = max(with_code, key=lambda c: (c.passed, STAGES.index(c.stage) if c.stage in STAGES else -1))
+        shutil.copyfile(best.path, file_path)
+    else:
+        best = finished[0]
+    for index in range(count):
+        path = os.path.join(output_dir, f"{stem}_candidate_{index}.py")
+        if os.path.exists(path):
+            os.remove(path)
+    best.path = file_path if best.path else None
+    return best
+
+
+async def arun_fix_loop(gdd: str, file_path: str, provider: str = "openai",
+                        model: str = "gpt-4o-mini") -> AsyncGenerator[str, None]:
+    """
+    Async generator function for SSE (Server-Sent Events).
+    Yields strings in the format: "data: <message>\n\n"
+    While a fix is being generated, its tokens are streamed as "event: delta" messages.
+    With FIXER_SPECULATIVE_CANDIDATES > 1 every fix is speculative (arun_speculative_fix): a candidate that
+    already passed all checks ends the loop, otherwise the best candidate's failure is fixed next without re-checking.
+    """
+    yield f"data: [Member 3] 收到需求，開始驗證: {os.path.basename(file_path)}\n\n"
+
+    max_retries: int = 3
+    game_is_valid = False
+    speculative = config.FIXER_SPECULATIVE_CANDIDATES > 1
+    # 已知目前檔案的失敗 (stage, error_msg)：speculative 模式下候選已經驗證過，不必重跑檢查
+    known_failure: Optional[tuple[str, str]] = None
+
+    while (not game_is_valid) and (max_retries > 0):
+        if known_failure is None:
+            result = None
+            async for kind, value in acheck_game(gdd, file_path, provider, model):
+                if kind == "progress":
+                    yield value
+                else:
+                    result = value
+            passed, stage, error_msg = result
+            if passed:
+                game_is_valid = True
+                break
+        else:
+            stage, error_msg = known_failure
+            known_failure = None
+
+        yield format_sse(f"❌ {STAGE_LABELS[stage]}: {error_msg} (嘗試修復中...)")
+        print(f"[Member3]: ❌ {STAGE_LABELS[stage]}: {error_msg}")
+        fix_type = "syntax" if stage == "syntax" else "logic"
+
+        if speculative:
+            yield format_sse(f"[Fixer] 平行產生 {config.FIXER_SPECULATIVE_CANDIDATES} 個修復候選並同時驗證...")
+            candidate = None
+            async for kind, value in astream_deltas(arun_speculative_fix, file_path, error_msg, provider, model,
+                                                    fix_type, gdd):
+                if kind == "delta":
+                    yield format_sse(value)
+                else:
+                    candidate = value
+            if candidate.passed:
+                yield format_sse(f"✅ 候選 {candidate.index + 1} (temperature {candidate.temperature}) 通過所有驗證")
+                game_is_valid = True
+            elif candidate.path:
+                known_failure = (candidate.stage, candidate.error)
+        else:
+            async for kind, value in astream_deltas(arun_fix, file_path, error_msg, provider, model, fix_type, gdd):
+                if kind == "delta":
+                    yield format_sse(value, event="delta")
+                else:
+                    file_path = value[0] or file_path
+        max_retries -= 1
 
     # The format let js can detect finished
     if game_is_valid:
         yield "data: RESULT_SUCCESS: 程式碼通過所有驗證！\n\n"
     else:
-        yield "data: RESULT_FAIL: 已達最大重試次數，驗證失敗。\n\n"
\ No newline at end of file
+        yield "data: RESULT_FAIL: 已達最大重試次數，驗證失敗。\n\n"
+
+
+def run_fix_loop(gdd: str, file_path: str, provider: str = "openai",
+                 model: str = "gpt-4o-mini") -> Generator[str, None, None]:
+    """
+    Generator function for SSE (Server-Sent Events), the sync version of arun_fix_loop.
+    Yields strings in the format: "data: <message>\n\n"
+    """
+    return iter_sync(arun_fix_loop(gdd, file_path, provider, model))
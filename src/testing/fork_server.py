@@ -0,0 +1,191 @@
+"""
+Fork server of the fuzzer's warm pool (see warm_pool.py). Started once as its own script::
+
+    python src/testing/fork_server.py <control fd> '{"preload": [...], "limits": [...]}'
+
+It imports the preload modules (pygame, arcade, pymunk, PIL), reports ready on the control socket and then forks
+one child per request with ``os.fork``. The child sets up its environment, stdout / stderr and resource limits and
+runs the game script with ``runpy``. Nothing of the caller is re-imported in the child (unlike a
+``multiprocessing`` forkserver, which prepares the parent's ``__main__``, e.g. the whole Flask app), and the server
+gets its environment from Popen, so the caller's ``os.environ`` is never modified.
+
+Protocol (Unix socket, one request at a time):
+
+* request: a 4-byte length sent together with 4 fds (status socket, heartbeat / stdout / stderr write ends),
+  then the JSON body ``{"command": [python, script, *args], "env": {...}, "cwd": "..."}``
+* on the status socket: the child's pid (8 bytes), later its exit code (4 bytes, ``-signal`` when killed)
+
+As a script this file only uses the standard library and sandbox.py next to it: it runs without the project on
+``sys.path``.
+"""
+import importlib
+import json
+import os
+import runpy
+import select
+import signal
+import socket
+import struct
+import sys
+import traceback
+from typing import Dict, List, Optional
+
+if __package__:
+    # warm_pool.py 只 import 這裡的 protocol 常數
+    from src.testing.sandbox import apply_resource_limits
+else:
+    # 以 script 執行 (fork server 本身)：專案不在 sys.path 上，sandbox.py 在同一個目錄
+    from sandbox import apply_resource_limits
+
+HEADER = struct.Struct("!I")
+PID = struct.Struct("!q")
+EXIT_CODE = struct.Struct("!i")
+READY = b"R"
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly ``size`` bytes, or fewer if the peer closed the socket."""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _receive(control: socket.socket) -> Optional[tuple[dict, List[int]]]:
+    """The next request and its fds, or None when the caller closed the control socket."""
+    try:
+        header, fds, _, _ = socket.recv_fds(control, HEADER.size, 4)
+    except ConnectionResetError:
+        return None
+    if not header:
+        return None
+    header += recv_exact(control, HEADER.size - len(header))
+    body = recv_exact(control, HEADER.unpack(header)[0])
+    return json.loads(body), fds
+
+
+def _run_child(request: dict, heartbeat_fd: int, stdout_fd: int, stderr_fd: int, limits: List[int]) -> None:
+    """Body of a forked child: behave like ``Popen(command, env=env, cwd=cwd, stdout=PIPE, stderr=PIPE)``."""
+    code = 1
+    try:
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        os.close(stdout_fd)
+        os.close(stderr_fd)
+
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.environ["FUZZ_HEARTBEAT_FD"] = str(heartbeat_fd)
+        os.chdir(request["cwd"])
+        apply_resource_limits(*limits)
+
+        command = request["command"]
+        script = os.path.abspath(command[1])
+        sys.argv = [script] + command[2:]
+        sys.path[0] = os.path.dirname(script)
+        # 遊戲目錄下自己的 sandbox.py 不能拿到 server 的模組
+        sys.modules.pop("sandbox", None)
+        runpy.run_path(script, run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        # 與直譯器相同：None -> 0，整數照用，其他值印到 stderr 並以 1 結束
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _reap(children: Dict[int, socket.socket]) -> None:
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        status_socket = children.pop(pid, None)
+        if status_socket is None:
+            continue
+        try:
+            status_socket.sendall(EXIT_CODE.pack(os.waitstatus_to_exitcode(status)))
+        except OSError:
+            pass
+        status_socket.close()
+
+
+def serve(control: socket.socket, preload: List[str], limits: List[int]) -> None:
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠️ [Warm Pool] preload {name} failed: {e}", file=sys.stderr)
+
+    # SIGCHLD 透過 wakeup fd 叫醒 select，在主迴圈中回收子行程並回報 exit code
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+
+    children: Dict[int, socket.socket] = {}
+    control.sendall(READY)
+    try:
+        while True:
+            try:
+                readable, _, _ = select.select([control, wakeup_r], [], [])
+            except InterruptedError:
+                continue
+            if wakeup_r in readable:
+                try:
+                    while os.read(wakeup_r, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+            _reap(children)
+            if control not in readable:
+                continue
+
+            received = _receive(control)
+            if received is None:
+                # 呼叫端關閉了 control socket (伺服器結束)
+                break
+            request, fds = received
+            status_socket = socket.socket(fileno=fds[0])
+            pid = os.fork()
+            if pid == 0:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                for sock in (control, status_socket, *children.values()):
+                    sock.close()
+                os.close(wakeup_r)
+                os.close(wakeup_w)
+                _run_child(request, *fds[1:], limits)
+            for fd in fds[1:]:
+                os.close(fd)
+            try:
+                status_socket.sendall(PID.pack(pid))
+            except OSError:
+                pass
+            children[pid] = status_socket
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+if __name__ == "__main__":
+    _options = json.loads(sys.argv[2])
+    serve(socket.socket(fileno=int(sys.argv[1])), _options["preload"], _options["limits"])
@@ -1,8 +1,18 @@
 import os
+import random
 import re
+import signal
 import subprocess
 import sys
 import textwrap
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from config import config
+from src.testing.sandbox import RingBuffer, drain, limited_command, maxrss_to_mb
+from src.testing.warm_pool import WarmInterpreterPool, get_warm_pool, resource_limits
 
 
 def get_dynamic_fuzz_logic(game_file_path: str) -> str:
@@ -84,12 +94,52 @@ def inject_monkey_bot(code_content: str, bot_logic: str) -> str:
     indented_logic = "\n".join(["            " + line for line in lines])
 
     # 3. Define the injection template
-    # Use "import random as _monkey_random" to avoid the conflict.
+    # _monkey_random 是獨立的 random.Random 實例 (避免與遊戲本身的 random 衝突)，
+    # 以環境變數 FUZZ_SEED 設定種子，讓 crash 可以用同一個 seed 重現。
+    # 每一圈主迴圈累計 frame 數，並包裝 pygame.event.get 累計送進遊戲事件處理的 event 數；
+    # 每 0.1 秒把 "frames events game_seconds maxrss cpu_seconds" 寫到 FUZZ_HEARTBEAT_FD (fuzzer 開的 pipe) 當作心跳；
+    # game_seconds 是 pygame.time.get_ticks() (模擬時脈模式下是模擬的遊戲時間)，maxrss / cpu_seconds 來自 getrusage。
     monkey_bot_template = """
     # --- [INJECTED DYNAMIC MONKEY BOT START] ---
     if 'pygame' in globals():
         try:
-            import random as _monkey_random
+            if '_monkey_random' not in globals():
+                import os as _monkey_os, random as _monkey_random_module, time as _monkey_time
+                _monkey_seed = _monkey_os.environ.get('FUZZ_SEED')
+                globals()['_monkey_random'] = _monkey_random_module.Random(int(_monkey_seed) if _monkey_seed else None)
+                _monkey_fd = _monkey_os.environ.get('FUZZ_HEARTBEAT_FD')
+                globals()['_monkey_state'] = {
+                    'fd': int(_monkey_fd) if _monkey_fd else None, 'frames': 0, 'events': 0, 'last': 0.0,
+                    'write': _monkey_os.write, 'clock': _monkey_time.monotonic,
+                    'ticks': getattr(getattr(pygame, 'time', None), 'get_ticks', lambda: 0)
+                }
+                if _monkey_fd:
+                    _monkey_os.set_blocking(int(_monkey_fd), False)
+                try:
+                    import resource as _monkey_resource
+                    _monkey_state['usage'] = lambda: _monkey_resource.getrusage(_monkey_resource.RUSAGE_SELF)
+                except ImportError:
+                    _monkey_state['usage'] = None
+                _monkey_get = pygame.event.get
+                def _monkey_counted_get(*_args, **_kwargs):
+                    _events = _monkey_get(*_args, **_kwargs)
+                    _monkey_state['events'] += len(_events)
+                    return _events
+                pygame.event.get = _monkey_counted_get
+            _monkey_state['frames'] += 1
+            if _monkey_state['fd'] is not None and _monkey_state['clock']() - _monkey_state['last'] >= 0.1:
+                _monkey_state['last'] = _monkey_state['clock']()
+                _monkey_beat = f"{_monkey_state['frames']} {_monkey_state['events']} {_monkey_state['ticks']() / 1000:.2f}"
+                if _monkey_state['usage'] is not None:
+                    _monkey_usage = _monkey_state['usage']()
+                    _monkey_beat += f" {_monkey_usage.ru_maxrss} {_monkey_usage.ru_utime + _monkey_usage.ru_stime:.2f}"
+                try:
+                    _monkey_state['write'](_monkey_state['fd'], (_monkey_beat + "\\n").encode())
+                except OSError:
+                    pass
+        except Exception as _e:
+            pass
+        try:
             # Dynamic Logic from GDD
 {indented_logic}
         except Exception as _e:
@@ -128,68 +178,429 @@ def inject_monkey_bot(code_content: str, bot_logic: str) -> str:
     return code_content
 
 
-def run_fuzz_test(file_path: str, duration: int = 5) -> tuple[bool, str]:
+ARCADE_HARNESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "arcade_harness.py")
+PYGAME_SIM_CLOCK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pygame_sim_clock.py")
+
+
+def is_arcade_game(code_content: str) -> bool:
     """
-    Run the fuzz test
+    True for Arcade games (``import arcade`` and no pygame): they have no ``while`` main loop to inject into
+    and are driven by arcade_harness.py instead.
+    """
+    uses_arcade = re.search(r"^\s*(import arcade|from arcade\b)", code_content, re.MULTILINE)
+    uses_pygame = re.search(r"^\s*(import pygame|from pygame\b)", code_content, re.MULTILINE)
+    return bool(uses_arcade) and not uses_pygame
+
+
+def arcade_harness_command(file_path: str) -> List[str]:
+    """
+    The command that runs an Arcade game under the headless harness, with the fuzz_logic.py next to it (if any).
+    """
+    command = [
+        sys.executable, ARCADE_HARNESS_PATH, file_path,
+        "--frames", str(config.FUZZER_ARCADE_FRAMES),
+        "--draw-interval", str(config.FUZZER_ARCADE_DRAW_INTERVAL)
+    ]
+    logic_path = os.path.join(os.path.dirname(file_path), "fuzz_logic.py")
+    if os.path.exists(logic_path):
+        command += ["--logic", logic_path]
+    return command
+
+
+@dataclass
+class FuzzResult:
+    passed: bool
+    message: str
+    # 造成 crash 的 seed (重現: run_fuzz_test(file_path, seeds=[seed]))
+    crash_seed: Optional[int] = None
+    seeds: List[int] = field(default_factory=list)
+    # 每個 worker 的 frames / events / fps / peak_rss_mb / cpu_seconds ... (_FuzzWorker.usage())
+    usage: List[dict] = field(default_factory=list)
+
+
+def pick_seeds(count: int, base_seed: Optional[int] = None) -> List[int]:
+    """
+    Seeds for ``count`` fuzz workers: ``base_seed, base_seed + 1, ...`` if a base seed is given, random otherwise.
+    """
+    if base_seed is not None:
+        return [base_seed + i for i in range(count)]
+    system_random = random.SystemRandom()
+    return [system_random.randrange(2 ** 31) for _ in range(count)]
+
+
+# 心跳間隔 0.1 秒；相鄰兩次心跳的間隔超過這個值就重新計算連續心跳
+STEADY_BEAT_GAP = 0.5
+
+
+class _FuzzWorker:
+    """
+    One fuzz subprocess plus the threads draining its heartbeat pipe and its stdout / stderr
+    (into ring buffers of FUZZER_OUTPUT_LIMIT_BYTES, so a game that spams output cannot fill the server's memory).
+    With a warm pool the process is forked from the pool's fork server instead of started with Popen.
+    Both run with the resource limits of ``resource_limits()``.
+    """
+
+    def __init__(self, seed: int, command: List[str], env: dict, pool: Optional[WarmInterpreterPool] = None):
+        self.seed = seed
+        self.frames = 0
+        self.events = 0
+        self.game_seconds = 0.0
+        self.peak_rss_mb = 0.0
+        self.cpu_seconds = 0.0
+        self.started = time.monotonic()
+        self.last_beat: Optional[float] = None
+        # 連續 FUZZER_STEADY_BEATS 次間隔正常的心跳之後才確定機器人在主迴圈裡，之後才做卡死偵測
+        self.consecutive_beats = 0
+        self.steady = False
+        # 沒有穩定的心跳 (完全沒有，或只有零星幾次)：注入的機器人多半不在真正的主迴圈裡
+        self.no_heartbeat = False
+        self.outcome: Optional[str] = None  # "healthy" / "exited" / "crashed" / "hung" / "survived" / "stopped"
+        self._stdout = RingBuffer(config.FUZZER_OUTPUT_LIMIT_BYTES)
+        self._stderr = RingBuffer(config.FUZZER_OUTPUT_LIMIT_BYTES)
+
+        if pool is not None:
+            self.process = pool.popen(command, {**env, "FUZZ_SEED": str(seed)})
+            read_fd, stdout_fd, stderr_fd = self.process.heartbeat_fd, self.process.stdout_fd, self.process.stderr_fd
+        else:
+            read_fd, write_fd = os.pipe()
+            try:
+                # 資源上限由 sandbox.py 在新的 interpreter 中設定後再 exec 遊戲 (web server 是多執行緒的，不能用 preexec_fn)
+                self.process = subprocess.Popen(
+                    limited_command(command, resource_limits()) if os.name == "posix" else command,
+                    stderr=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    env={**env, "FUZZ_SEED": str(seed), "FUZZ_HEARTBEAT_FD": str(write_fd)},
+                    pass_fds=(write_fd,)
+                )
+            finally:
+                os.close(write_fd)
+            # drain() 負責關閉自己的 fd
+            stdout_fd, stderr_fd = os.dup(self.process.stdout.fileno()), os.dup(self.process.stderr.fileno())
+            self.process.stdout.close()
+            self.process.stderr.close()
+
+        self._threads = [
+            threading.Thread(target=self._read_heartbeats, args=(read_fd,), daemon=True),
+            threading.Thread(target=drain, args=(stdout_fd, self._stdout), daemon=True),
+            threading.Thread(target=drain, args=(stderr_fd, self._stderr), daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _read_heartbeats(self, read_fd: int) -> None:
+        with os.fdopen(read_fd, "r") as pipe:
+            for line in pipe:
+                try:
+                    # "frames events [game_seconds [maxrss cpu_seconds]]"
+                    fields = line.split()
+                    self.frames, self.events = int(fields[0]), int(fields[1])
+                    if len(fields) > 2:
+                        self.game_seconds = float(fields[2])
+                    if len(fields) > 4:
+                        self.peak_rss_mb = maxrss_to_mb(float(fields[3]))
+                        self.cpu_seconds = float(fields[4])
+                    now = time.monotonic()
+                    if self.last_beat is not None and now - self.last_beat <= STEADY_BEAT_GAP:
+                        self.consecutive_beats += 1
+                    else:
+                        self.consecutive_beats = 1
+                    self.steady = self.steady or self.consecutive_beats >= config.FUZZER_STEADY_BEATS
+                    self.last_beat = now
+                except (ValueError, IndexError):
+                    continue
+
+    @property
+    def stdout(self) -> str:
+        return self._stdout.getvalue()
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr.getvalue()
+
+    @property
+    def fps(self) -> float:
+        """Frames per second of wall-clock time (with the simulated clock: how fast the game itself runs)."""
+        if self.last_beat is None:
+            return 0.0
+        return self.frames / max(self.last_beat - self.started, 1e-6)
+
+    def exit_reason(self) -> str:
+        """Why the process ended when it left no traceback (e.g. killed by SIGXCPU at the CPU limit)."""
+        returncode = self.process.poll()
+        if returncode is None or returncode >= 0:
+            return f"exit code {returncode}"
+        try:
+            name = signal.Signals(-returncode).name
+        except ValueError:
+            name = f"signal {-returncode}"
+        if name == "SIGXCPU":
+            return f"killed by {name} (CPU time limit of {config.FUZZER_CPU_LIMIT_SECONDS}s exceeded)"
+        return f"killed by {name}"
+
+    def usage(self) -> dict:
+        return {
+            "seed": self.seed,
+            "outcome": self.outcome,
+            "frames": self.frames,
+            "events": self.events,
+            "game_seconds": round(self.game_seconds, 2),
+            "fps": round(self.fps, 1),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "cpu_seconds": round(self.cpu_seconds, 2),
+            "output_dropped_bytes": self._stdout.dropped + self._stderr.dropped
+        }
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+
+def run_fuzz_workers(
+        file_path: str,
+        duration: int = 5,
+        seeds: Optional[List[int]] = None,
+        cancel_event: Optional[threading.Event] = None
+) -> FuzzResult:
+    """
+    Run one fuzz worker per seed in parallel (each with its own FUZZ_SEED for ``_monkey_random``).
+    All workers are stopped as soon as one of them crashes or hangs.
+
+    The injected monkey bot reports "frames events game_seconds maxrss cpu" over a heartbeat pipe. A worker is healthy (and
+    stopped early) once it reaches FUZZER_MIN_FRAMES frames and FUZZER_MIN_EVENTS handled events (and, with
+    FUZZER_SIMULATED_CLOCK, FUZZER_SIMULATED_SECONDS of game time); it is considered hung when no heartbeat
+    arrives for FUZZER_HANG_TIMEOUT seconds after a steady heartbeat (FUZZER_STEADY_BEATS beats in a row).
+    Games the bot could not be injected into fall back to surviving ``duration`` seconds, and so do workers without
+    a steady heartbeat: none within FUZZER_STARTUP_TIMEOUT, or a few beats and then silence (the bot was injected
+    into a loop that is not the main loop, e.g. a short spawn-retry loop).
+
+    With FUZZER_SIMULATED_CLOCK, pygame games run through pygame_sim_clock.py (``Clock.tick`` never sleeps and
+    advances a simulated clock) with ``SDL_VIDEODRIVER=dummy``, so minutes of gameplay take seconds.
+
+    Arcade games (no ``while`` main loop) run under arcade_harness.py instead: it simulates FUZZER_ARCADE_FRAMES
+    frames on a simulated clock without rendering and exits, so they are not stopped at FUZZER_MIN_FRAMES.
     :param file_path: The path to the game file
     :type file_path: str
 
-    :param duration: The duration of the fuzz test
+    :param duration: The maximum duration of the fuzz test
     :type duration: int
 
-    :return: A tuple (success_flag, message)
-    :rtype: tuple[bool, str]
+    :param seeds: The seeds to run (default: one random seed)
+    :type seeds: Optional[List[int]]
+
+    :param cancel_event: When set (e.g. by another thread), all workers are killed and the test fails as cancelled
+    :type cancel_event: Optional[threading.Event]
+
+    Each run is resource-limited (see sandbox.apply_resource_limits) and reports its peak RSS, CPU time and
+    frame rate in ``FuzzResult.usage``.
+
+    :return: The result, including the crashing seed if any
+    :rtype: FuzzResult
     """
+    seeds = list(seeds) if seeds else pick_seeds(1)
+    workers: List[_FuzzWorker] = []
     try:
         if not os.path.exists(file_path):
-            return False, "File not found"
+            return FuzzResult(False, "File not found", seeds=seeds)
 
         with open(file_path, "r", encoding="utf-8") as f:
             original_code = f.read()
 
-        bot_logic = get_dynamic_fuzz_logic(file_path)
-
-        fuzzed_code = inject_monkey_bot(original_code, bot_logic)
-
-        temp_file = file_path.replace(".py", "_fuzz_temp.py")
-        with open(temp_file, "w", encoding="utf-8") as f:
-            f.write(fuzzed_code)
-
-        print(f"[Fuzzer] 正在對 {os.path.basename(file_path)} 進行 {duration} 秒的動態壓力測試...")
-
         # 5. Set environment variable (disable sound effects to avoid interference)
         env = os.environ.copy()
         env["SDL_AUDIODRIVER"] = "dummy"
 
-        # 6. Run the main_fuzz_temp.py
-        cmd = [sys.executable, temp_file]
-        process = subprocess.Popen(
-            cmd,
-            stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            text=True,
-            env=env
-        )
-
-        try:
-            stdout, stderr = process.communicate(timeout=duration)
-        except subprocess.TimeoutExpired:
-            process.kill()
+        arcade_mode = is_arcade_game(original_code)
+        temp_file = None
+        if arcade_mode:
+            # Arcade: 沒有主迴圈可注入，由 harness 直接呼叫 window 的 on_update / on_key_press / on_mouse_*
+            command = arcade_harness_command(file_path)
+            heartbeat_enabled = True
+            if config.FUZZER_ARCADE_HEADLESS:
+                env["ARCADE_HEADLESS"] = "1"
+        else:
+            bot_logic = get_dynamic_fuzz_logic(file_path)
+
+            fuzzed_code = inject_monkey_bot(original_code, bot_logic)
+            # 找不到主迴圈 (沒有注入) 時不會有心跳，只能用「撐過 duration 秒」判斷
+            heartbeat_enabled = "FUZZ_HEARTBEAT_FD" in fuzzed_code
+
+            temp_file = file_path.replace(".py", "_fuzz_temp.py")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write(fuzzed_code)
+            command = [sys.executable, temp_file]
+            if config.FUZZER_SIMULATED_CLOCK:
+                command = [sys.executable, PYGAME_SIM_CLOCK_PATH, temp_file]
+                env["SDL_VIDEODRIVER"] = "dummy"
+
+        print(f"[Fuzzer] 正在對 {os.path.basename(file_path)} 進行最多 {duration} 秒的動態壓力測試 "
+              f"({len(seeds)} workers, seeds: {seeds}{', arcade harness' if arcade_mode else ''})...")
+
+        # 6. Run the game (main_fuzz_temp.py or the arcade harness), one process per seed
+        start = time.monotonic()
+        deadline = start + duration
+        min_game_seconds = config.FUZZER_SIMULATED_SECONDS if config.FUZZER_SIMULATED_CLOCK else 0
+        pool = get_warm_pool()
+        workers = [_FuzzWorker(seed, command, env, pool) for seed in seeds]
+
+        failed: Optional[_FuzzWorker] = None
+        cancelled = False
+        while failed is None and any(worker.outcome is None for worker in workers):
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            now = time.monotonic()
+            for worker in workers:
+                if worker.outcome is not None:
+                    continue
+                returncode = worker.process.poll()
+                if returncode is not None:
+                    worker.outcome = "exited" if returncode == 0 else "crashed"
+                elif now >= deadline:
+                    worker.outcome = "survived"
+                elif not heartbeat_enabled:
+                    continue
+                elif (not arcade_mode and worker.frames >= config.FUZZER_MIN_FRAMES
+                      and worker.events >= config.FUZZER_MIN_EVENTS
+                      # game_seconds 一直是 0 代表遊戲沒有呼叫 Clock.tick，沒有遊戲時間可以等
+                      and (worker.game_seconds >= min_game_seconds or worker.game_seconds == 0)):
+                    worker.outcome = "healthy"
+                elif not worker.steady:
+                    # 還沒有穩定的心跳時不判定卡死：完全沒有心跳，或送了幾次就停了 (機器人在只跑一下的內層迴圈裡)
+                    if worker.last_beat is None:
+                        quiet, timeout = now - worker.started, config.FUZZER_STARTUP_TIMEOUT
+                    else:
+                        quiet, timeout = now - worker.last_beat, config.FUZZER_HANG_TIMEOUT
+                    if not worker.no_heartbeat and quiet > timeout:
+                        worker.no_heartbeat = True
+                        print(f"[Fuzzer] seed {worker.seed}: no steady heartbeat ({worker.frames} frames, quiet for "
+                              f"{quiet:.0f}s; bot not injected into the main loop?), falling back to surviving {duration}s")
+                elif now - worker.last_beat > config.FUZZER_HANG_TIMEOUT:
+                    worker.outcome = "hung"
+
+                if worker.outcome in ("crashed", "hung"):
+                    failed = worker
+                    break
+                if worker.outcome is not None:
+                    worker.stop()
+            time.sleep(0.05)
+
+        # 第一個 crash / hang 出現就停止其他 worker
+        for worker in workers:
+            if worker.outcome is None:
+                worker.outcome = "stopped"
+            worker.stop()
+        elapsed = time.monotonic() - start
+
+        if cancelled:
+            if temp_file and os.path.exists(temp_file):
+                os.remove(temp_file)
+            return FuzzResult(False, "Fuzz Test Cancelled.", seeds=seeds)
+
+        usage = [worker.usage() for worker in workers]
+        for item in usage:
+            print(f"[Fuzzer] seed {item['seed']}: {item['outcome']}, {item['frames']} frames @ {item['fps']:.0f} FPS, "
+                  f"peak RSS {item['peak_rss_mb']:.0f} MB, CPU {item['cpu_seconds']:.1f}s"
+                  + (f", {item['output_dropped_bytes']} bytes of output dropped" if item['output_dropped_bytes'] else ""))
+
+        if failed is None:
             # if os.path.exists(temp_file):
             #     os.remove(temp_file)
-            return True, "Fuzz Test Passed (Survived random inputs)."
-
-        if os.path.exists(temp_file):
+            if heartbeat_enabled and all(worker.outcome in ("healthy", "exited") for worker in workers):
+                frames = min(worker.frames for worker in workers)
+                events = min(worker.events for worker in workers)
+                game_seconds = min(worker.game_seconds for worker in workers)
+                # 模擬 FPS：每個 worker 每秒實際時間跑了幾個 frame (平均)，也是遊戲本身效能的指標
+                simulated_fps = sum(worker.frames for worker in workers) / len(workers) / max(elapsed, 1e-6)
+                peak_rss_mb = max(item["peak_rss_mb"] for item in usage)
+                cpu_seconds = max(item["cpu_seconds"] for item in usage)
+                return FuzzResult(
+                    True,
+                    f"Fuzz Test Passed (each worker ran >= {frames} frames / {events} events / "
+                    f"{game_seconds:.0f}s of game time in {elapsed:.1f}s, {simulated_fps:.0f} simulated FPS, "
+                    f"peak RSS {peak_rss_mb:.0f} MB, CPU {cpu_seconds:.1f}s).",
+                    seeds=seeds,
+                    usage=usage
+                )
+            if any(worker.no_heartbeat and not worker.steady for worker in workers):
+                return FuzzResult(
+                    True,
+                    f"Fuzz Test Passed (Survived {duration}s of random inputs; no steady heartbeat from the monkey bot, "
+                    f"it may not be injected into the real main loop).",
+                    seeds=seeds,
+                    usage=usage
+                )
+            return FuzzResult(True, "Fuzz Test Passed (Survived random inputs).", seeds=seeds, usage=usage)
+
+        if temp_file and os.path.exists(temp_file):
             os.remove(temp_file)
 
-        if process.returncode != 0:
-            error_msg = stderr
-            if "Traceback" in stderr:
-                error_msg = "Traceback" + stderr.split("Traceback")[-1]
+        if failed.outcome == "hung":
+            return FuzzResult(
+                False,
+                f"Runtime Logic Error (Hang, fuzz seed {failed.seed}): the main loop stopped responding "
+                f"(no frame for {config.FUZZER_HANG_TIMEOUT}s after {failed.frames} frames / {failed.events} events). "
+                f"Check for infinite loops or blocking calls inside the game loop.",
+                crash_seed=failed.seed,
+                seeds=seeds,
+                usage=usage
+            )
+
+        crash_stderr = failed.stderr
+        error_msg = crash_stderr
+        if "Traceback" in crash_stderr:
+            error_msg = "Traceback" + crash_stderr.split("Traceback")[-1]
+        if not error_msg.strip():
+            # 被 signal 結束 (例如超過 RLIMIT_CPU) 時沒有 traceback
+            error_msg = f"The game process was {failed.exit_reason()} without a traceback."
+        elif "MemoryError" in error_msg and config.FUZZER_MEMORY_LIMIT_MB > 0:
+            error_msg += f"\n(The game exceeded the {config.FUZZER_MEMORY_LIMIT_MB} MB memory limit; check for unbounded allocations.)"
+
+        return FuzzResult(
+            False,
+            f"Runtime Logic Error (Crashed, fuzz seed {failed.seed}): {error_msg}",
+            crash_seed=failed.seed,
+            seeds=seeds,
+            usage=usage
+        )
+
+    except Exception as e:
+        for worker in workers:
+            worker.stop()
+        return FuzzResult(False, f"Fuzz Test Failed to Run: {str(e)}", seeds=seeds)
+
+
+def run_fuzz_test(
+        file_path: str,
+        duration: int = 5,
+        workers: int = 1,
+        seeds: Optional[List[int]] = None,
+        cancel_event: Optional[threading.Event] = None
+) -> tuple[bool, str]:
+    """
+    Run the fuzz test
+    :param file_path: The path to the game file
+    :type file_path: str
+
+    :param duration: The duration of the fuzz test
+    :type duration: int
 
-            return False, f"Runtime Logic Error (Crashed): {error_msg}"
+    :param workers: The number of parallel fuzz workers (bounded by the CPU count), each with a distinct seed
+    :type workers: int
 
-        return True, "Fuzz Test Passed."
+    :param seeds: Explicit seeds to run, e.g. to replay a crash (overrides workers)
+    :type seeds: Optional[List[int]]
 
-    except Exception as e:
-        return False, f"Fuzz Test Failed to Run: {str(e)}"
\ No newline at end of file
+    :param cancel_event: Set it to stop the test early (the result is then a failure)
+    :type cancel_event: Optional[threading.Event]
+
+    :return: A tuple (success_flag, message)
+    :rtype: tuple[bool, str]
+    """
+    if not seeds:
+        workers = max(1, min(workers, os.cpu_count() or 1))
+        seeds = pick_seeds(workers, config.FUZZER_SEED)
+    result = run_fuzz_workers(file_path, duration, seeds, cancel_event)
+    return result.passed, result.message
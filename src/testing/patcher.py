@@ -0,0 +1,230 @@
+"""
+Apply the fixer's patch-mode answers (PATCH_FIXER_PROMPT) to the broken file.
+
+Two formats are accepted, in any mix, inside or outside of code fences:
+
+- search / replace blocks::
+
+    <<<<<<< SEARCH
+    (lines copied from the current code)
+    =======
+    (replacement lines)
+    >>>>>>> REPLACE
+
+- unified diffs (``@@ -start,count +start,count @@`` hunks; the ``---`` / ``+++`` headers are optional).
+
+LLMs rarely copy the original lines perfectly, so each hunk is located with increasingly loose matching:
+exact lines, then lines equal after stripping whitespace (the replacement is re-indented by the same offset),
+then the most similar block of the same length (difflib ratio >= ``fuzzy_threshold``, clearly better than any
+other block). A fuzzy match only rewrites the lines the hunk changes: context lines keep the code's own text, and
+a changed line that does not match the code is a conflict. A hunk that cannot be located (or conflicts) raises
+PatchError and the caller falls back to a full rewrite.
+"""
+import difflib
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+SEARCH_MARKER = re.compile(r"^\s*<{5,}\s*SEARCH\s*$")
+DIVIDER_MARKER = re.compile(r"^\s*={5,}\s*$")
+REPLACE_MARKER = re.compile(r"^\s*>{5,}\s*REPLACE\s*$")
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+# 模糊比對時，最相似的區塊至少要比其他 (不重疊的) 區塊高出這麼多，否則視為不確定
+FUZZY_MARGIN = 0.02
+
+
+class PatchError(ValueError):
+    """The response contains no usable hunk, or a hunk does not match the code."""
+
+
+@dataclass
+class Hunk:
+    search: List[str]
+    replace: List[str]
+    # unified diff 的起始行號 (1-based)，用來在多處相同內容時挑最近的位置
+    line_hint: Optional[int] = None
+
+
+def parse_search_replace(text: str) -> List[Hunk]:
+    hunks = []
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        if not SEARCH_MARKER.match(lines[i]):
+            i += 1
+            continue
+        search, replace = [], []
+        i += 1
+        while i < len(lines) and not DIVIDER_MARKER.match(lines[i]):
+            search.append(lines[i])
+            i += 1
+        i += 1
+        while i < len(lines) and not REPLACE_MARKER.match(lines[i]):
+            replace.append(lines[i])
+            i += 1
+        if i >= len(lines):
+            raise PatchError("Unterminated SEARCH/REPLACE block (missing '>>>>>>> REPLACE')")
+        hunks.append(Hunk(search, replace))
+        i += 1
+    return hunks
+
+
+def parse_unified_diff(text: str) -> List[Hunk]:
+    hunks = []
+    current: Optional[Hunk] = None
+    for line in text.splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            current = Hunk([], [], int(header.group(1)))
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+        if line.startswith("```") or line.startswith("--- ") or line.startswith("+++ "):
+            # 區塊結束或下一個檔案的 header
+            current = None
+        elif line.startswith("-"):
+            current.search.append(line[1:])
+        elif line.startswith("+"):
+            current.replace.append(line[1:])
+        elif line.startswith(" ") or line == "":
+            current.search.append(line[1:])
+            current.replace.append(line[1:])
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        else:
+            current = None
+    return [hunk for hunk in hunks if hunk.search or hunk.replace]
+
+
+def parse_patch(text: str) -> List[Hunk]:
+    """All hunks of a patch-mode response (search / replace blocks first, then unified diff hunks)."""
+    return parse_search_replace(text) or parse_unified_diff(text)
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _reindent(lines: List[str], delta: int) -> List[str]:
+    if delta > 0:
+        return [(" " * delta + line) if line.strip() else line for line in lines]
+    if delta < 0:
+        return [line[min(-delta, _indent(line)):] for line in lines]
+    return lines
+
+
+def _trim_blank_edges(hunk: Hunk) -> Hunk:
+    # SEARCH 前後的空行常常與原始碼對不上，不影響定位
+    search, replace = list(hunk.search), list(hunk.replace)
+    while search and not search[0].strip() and replace and not replace[0].strip():
+        search.pop(0)
+        replace.pop(0)
+    while search and not search[-1].strip() and replace and not replace[-1].strip():
+        search.pop()
+        replace.pop()
+    return Hunk(search, replace, hunk.line_hint)
+
+
+def locate(lines: List[str], search: List[str], fuzzy_threshold: float,
+           line_hint: Optional[int] = None) -> Tuple[int, int, bool]:
+    """
+    Find ``search`` in ``lines``.
+    :return: (start index of the match, indentation offset of the code relative to ``search``,
+        whether the match is fuzzy, i.e. the lines differ beyond whitespace)
+    :rtype: Tuple[int, int, bool]
+    """
+    size = len(search)
+    starts = range(len(lines) - size + 1)
+
+    def nearest(candidates: List[int]) -> int:
+        if line_hint is None:
+            return candidates[0]
+        return min(candidates, key=lambda start: abs(start + 1 - line_hint))
+
+    # 1. 完全相同
+    exact = [start for start in starts if lines[start:start + size] == search]
+    if exact:
+        return nearest(exact), 0, False
+
+    # 2. 去掉前後空白後相同 (縮排不同、行尾空白)
+    stripped = [line.strip() for line in search]
+    loose = [start for start in starts if [line.strip() for line in lines[start:start + size]] == stripped]
+    first = next((i for i, line in enumerate(search) if line.strip()), 0)
+    if loose:
+        start = nearest(loose)
+        return start, _indent(lines[start + first]) - _indent(search[first]), False
+
+    # 3. 最相似的同長度區塊
+    target = "\n".join(stripped)
+    ratios = []
+    for start in starts:
+        window = "\n".join(line.strip() for line in lines[start:start + size])
+        ratios.append(difflib.SequenceMatcher(None, window, target, autojunk=False).ratio())
+    best_start = max(range(len(ratios)), key=ratios.__getitem__, default=None)
+    best_ratio = ratios[best_start] if best_start is not None else 0.0
+    preview = "\n".join(search[:3])
+    if best_start is None or best_ratio < fuzzy_threshold:
+        raise PatchError(f"Hunk not found in the code (best similarity {best_ratio:.2f}):\n{preview}")
+    # 與最佳區塊重疊的位置 (只差幾行) 本來就相似，不算競爭者
+    runner_up = max((ratio for start, ratio in enumerate(ratios) if abs(start - best_start) >= size), default=0.0)
+    if best_ratio - runner_up < FUZZY_MARGIN:
+        raise PatchError(f"Hunk matches several places in the code (similarity {best_ratio:.2f} vs "
+                         f"{runner_up:.2f}):\n{preview}")
+    return best_start, _indent(lines[best_start + first]) - _indent(search[first]), True
+
+
+def _merge_fuzzy(window: List[str], search: List[str], replace: List[str], delta: int) -> List[str]:
+    """
+    Apply a fuzzily matched hunk to ``window`` (the matched code, as long as ``search``) line by line:
+    lines the hunk keeps come from the code, so a context line the model misquoted (``if`` for ``elif``) is not
+    rewritten; lines the hunk changes must match the code modulo whitespace, otherwise PatchError.
+    """
+    merged = []
+    matcher = difflib.SequenceMatcher(None, search, replace, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            merged.extend(window[i1:i2])
+            continue
+        if [line.strip() for line in window[i1:i2]] != [line.strip() for line in search[i1:i2]]:
+            conflict = next(line for line, quoted in zip(window[i1:i2], search[i1:i2]) if line.strip() != quoted.strip())
+            raise PatchError(f"Hunk changes a line that differs from the code: {conflict.strip()!r}")
+        merged.extend(_reindent(replace[j1:j2], delta))
+    return merged
+
+
+def apply_hunks(code: str, hunks: List[Hunk], fuzzy_threshold: float = 0.85) -> str:
+    lines = code.splitlines()
+    # unified diff 的行號以原始檔為準，前面的 hunk 增減的行數要算進去
+    offset = 0
+    for hunk in hunks:
+        hunk = _trim_blank_edges(hunk)
+        if not hunk.search:
+            raise PatchError("Hunk without any context line, cannot tell where to apply it")
+        hint = hunk.line_hint + offset if hunk.line_hint is not None else None
+        start, delta, fuzzy = locate(lines, hunk.search, fuzzy_threshold, hint)
+        if fuzzy:
+            replacement = _merge_fuzzy(lines[start:start + len(hunk.search)], hunk.search, hunk.replace, delta)
+        else:
+            replacement = _reindent(hunk.replace, delta)
+        lines[start:start + len(hunk.search)] = replacement
+        offset += len(replacement) - len(hunk.search)
+    return "\n".join(lines) + "\n"
+
+
+def apply_patch(code: str, response: str, fuzzy_threshold: float = 0.85) -> Tuple[str, int]:
+    """
+    Apply every hunk of a patch-mode LLM response to ``code``.
+    :param fuzzy_threshold: minimum difflib similarity for a hunk that matches neither exactly nor modulo whitespace
+    :type fuzzy_threshold: float
+
+    :return: (patched code, number of hunks applied)
+    :rtype: Tuple[str, int]
+    """
+    hunks = parse_patch(response)
+    if not hunks:
+        raise PatchError("No SEARCH/REPLACE block or unified diff hunk in the response")
+    patched = apply_hunks(code, hunks, fuzzy_threshold)
+    if patched.strip() == code.strip():
+        raise PatchError("The patch does not change the code")
+    return patched, len(hunks)
@@ -91,4 +91,63 @@ The code has logical issues (e.g., crashes on empty cells, objects not moving) o
    - For Drag-and-Shoot: Ensure `on_mouse_release` calculates vector and applies force/velocity.
 
 4. Output the FULL corrected code in ```python ... ``` block.
-"""
\ No newline at end of file
+"""
+# Patch 模式共用的輸出格式 (SEARCH/REPLACE 區塊，由 src/testing/patcher.py 套用)
+PATCH_OUTPUT_FORMAT = """
+【OUTPUT FORMAT】:
+Do NOT output the whole file. Output only SEARCH/REPLACE blocks, scoped to the failing function(s):
+
+<<<<<<< SEARCH
+(the exact lines of the current code to replace, including a few unchanged lines around them)
+=======
+(the new lines)
+>>>>>>> REPLACE
+
+- Copy the SEARCH lines exactly, with their indentation, and keep each block small and unique in the file.
+- Use one block per change; blocks are applied from top to bottom.
+- To add an import or a helper, replace a nearby existing line with itself plus the new lines.
+"""
+
+# Patch Fixer Prompt (Arcade 3.0) - 只回傳修改的部分 (FIXER_PATCH_MODE)
+PATCH_FIXER_PROMPT = """
+You are a Python Arcade 3.0 Expert and QA Engineer.
+The code below crashed or has logic / API errors. Fix it with the SMALLEST possible edit.
+
+【ERROR MESSAGE】:
+{error}
+
+【CODE】:
+{code}
+
+【COMMON ARCADE 3.0 FIXES】:
+- `draw_rectangle_filled(x, y, w, h, color)` -> `arcade.draw_rect_filled(arcade.XYWH(x, y, w, h), color)`.
+- `arcade.Texture("name", image)` -> `arcade.Texture(image)`.
+- Sprite `update()` must accept `delta_time`: `def update(self, delta_time: float = 1/60):`.
+- `grid[r][c].attr` on a cell that may be None -> `if grid[r][c] is not None and grid[r][c].attr:`.
+- Do NOT just try/except the error.
+""" + PATCH_OUTPUT_FORMAT
+
+# Logic Patch Fixer Prompt (Arcade 3.0) - 邏輯 / 運行時錯誤的 patch 版本，保留 GDD 與遊戲機制檢查 (LOGIC_FIXER_PROMPT)
+LOGIC_PATCH_FIXER_PROMPT = """
+You are a Python Arcade 3.0 Developer and QA Engineer.
+The code has logical issues (e.g., crashes on empty cells, objects not moving, rules that differ from the design)
+or is using the OLD API. Fix it with the SMALLEST possible edit, keeping the game as designed.
+
+【GAME DESIGN (GDD)】:
+{gdd}
+
+【ERROR MESSAGE】:
+{error}
+
+【CODE】:
+{code}
+
+【CHECKLIST】:
+1. **Drawing API**: `draw_rectangle_filled(x, y, w, h, color)` -> `arcade.draw_rect_filled(arcade.XYWH(x, y, w, h), color)`;
+   all shapes use `arcade.XYWH` / `arcade.LBWH`. `arcade.Texture("name", image)` -> `arcade.Texture(image)`.
+2. **Grid/NoneType**: every `grid[r][c].attr` on a cell that may be None is guarded with `if grid[r][c] is not None:`.
+3. **Controls/Physics**: `on_update` calls `self.all_sprites.update()`; Sprite `update` accepts `delta_time`;
+   input handlers change the state the GDD describes (e.g. Drag-and-Shoot: `on_mouse_release` computes the vector
+   and applies force/velocity).
+4. The fixed code must still implement the mechanics of the GDD. Do NOT just try/except the error.
+""" + PATCH_OUTPUT_FORMAT
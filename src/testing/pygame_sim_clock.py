@@ -0,0 +1,76 @@
+"""
+Run a pygame game on a simulated clock, as fast as the CPU allows (fuzzer bootstrap)::
+
+    python src/testing/pygame_sim_clock.py <main_fuzz_temp.py>
+
+Before the game is executed, ``pygame.time`` is patched:
+
+- ``Clock.tick(framerate)`` / ``tick_busy_loop`` never sleep; they advance the simulated time by ``1000 / framerate``
+  ms (1000 / 60 when no framerate is given) and return that as the frame time, so ``dt``-based movement behaves
+  exactly as at the real frame rate.
+- ``get_ticks()`` returns the simulated time, ``wait()`` / ``delay()`` advance it instead of sleeping.
+
+The fuzzer sets ``SDL_VIDEODRIVER=dummy`` so nothing is shown. Like arcade_harness.py this file only uses the
+standard library and runs the game as ``__main__`` with the game's directory as ``sys.path[0]``, so line numbers
+in tracebacks are those of the game file.
+"""
+import os
+import runpy
+import sys
+
+DEFAULT_FRAMERATE = 60
+
+
+class SimulatedClock:
+    """Drop-in replacement for ``pygame.time.Clock`` on the simulated time line."""
+
+    now_ms = 0.0
+
+    def __init__(self):
+        self._frame_ms = 0.0
+
+    def tick(self, framerate: float = 0) -> int:
+        self._frame_ms = 1000.0 / (framerate or DEFAULT_FRAMERATE)
+        SimulatedClock.now_ms += self._frame_ms
+        return int(self._frame_ms)
+
+    tick_busy_loop = tick
+
+    def get_time(self) -> int:
+        return int(self._frame_ms)
+
+    def get_rawtime(self) -> int:
+        return int(self._frame_ms)
+
+    def get_fps(self) -> float:
+        return 1000.0 / self._frame_ms if self._frame_ms else 0.0
+
+
+def _get_ticks() -> int:
+    return int(SimulatedClock.now_ms)
+
+
+def _wait(milliseconds: int) -> int:
+    SimulatedClock.now_ms += milliseconds
+    return int(milliseconds)
+
+
+def patch_pygame_time(pygame) -> None:
+    pygame.time.Clock = SimulatedClock
+    pygame.time.get_ticks = _get_ticks
+    pygame.time.wait = _wait
+    pygame.time.delay = _wait
+
+
+def main():
+    game_path = os.path.abspath(sys.argv[1])
+    import pygame
+    patch_pygame_time(pygame)
+
+    sys.argv = [game_path]
+    sys.path[0] = os.path.dirname(game_path)
+    runpy.run_path(game_path, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
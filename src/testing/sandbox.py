@@ -0,0 +1,138 @@
+import os
+import sys
+import threading
+from collections import deque
+from typing import List, Optional
+
+
+def _user_task_count() -> Optional[int]:
+    """Processes + threads of the current user (what RLIMIT_NPROC counts on Linux), or None without /proc."""
+    uid = os.getuid()
+    count = 0
+    try:
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                if entry.stat().st_uid == uid:
+                    count += len(os.listdir(f"/proc/{entry.name}/task"))
+            except OSError:
+                continue
+    except OSError:
+        return None
+    return count
+
+
+def apply_resource_limits(memory_mb: int, cpu_seconds: int, process_headroom: int = 0, open_files: int = 0) -> None:
+    """
+    Per-run limits for a fuzzed game process, applied in the child before the game starts (0 disables a limit).
+    Only available on POSIX.
+    :param memory_mb: RLIMIT_AS (address space) in MB
+    :type memory_mb: int
+
+    :param cpu_seconds: RLIMIT_CPU in seconds (the process receives SIGXCPU, then SIGKILL)
+    :type cpu_seconds: int
+
+    :param process_headroom: RLIMIT_NPROC counts every process and thread of the user (the web server included),
+        so the limit is set to the current count plus this headroom
+    :type process_headroom: int
+
+    :param open_files: RLIMIT_NOFILE
+    :type open_files: int
+    """
+    import resource
+    if memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds > 0:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if process_headroom > 0 and hasattr(resource, "RLIMIT_NPROC"):
+        tasks = _user_task_count()
+        if tasks is not None:
+            soft, hard = resource.getrlimit(resource.RLIMIT_NPROC)
+            limit = tasks + process_headroom
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_NPROC, (limit, hard))
+    if open_files > 0:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        limit = open_files if hard == resource.RLIM_INFINITY else min(open_files, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+
+def limited_command(command: List[str], limits: tuple) -> List[str]:
+    """
+    Run ``command`` through this module as a bootstrap: the new process applies ``limits``
+    (apply_resource_limits arguments) and then execs ``command``.
+    Used instead of Popen's ``preexec_fn``, which is unsafe in a multithreaded parent (the web server):
+    the limits are set in a fresh single-threaded interpreter, not between fork and exec.
+    """
+    return [sys.executable, os.path.abspath(__file__), *(str(value) for value in limits), "--", *command]
+
+
+class RingBuffer:
+    """
+    Keeps only the last ``limit`` bytes written to it (the end of a traceback is what matters),
+    and counts how many bytes were dropped.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+        self._chunks: deque[bytes] = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        with self._lock:
+            self.total += len(data)
+            if len(data) >= self.limit:
+                self._chunks.clear()
+                data = data[-self.limit:]
+                self._size = 0
+            self._chunks.append(data)
+            self._size += len(data)
+            while self._size > self.limit:
+                head = self._chunks.popleft()
+                excess = self._size - self.limit
+                if len(head) > excess:
+                    # 只丟掉最舊那段的前半部
+                    self._chunks.appendleft(head[excess:])
+                    self._size -= excess
+                else:
+                    self._size -= len(head)
+
+    @property
+    def dropped(self) -> int:
+        return self.total - self._size
+
+    def getvalue(self) -> str:
+        with self._lock:
+            return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+
+def drain(fd: int, buffer: RingBuffer) -> None:
+    """Read ``fd`` until EOF into ``buffer``, then close it (run in a thread)."""
+    try:
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            buffer.write(data)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def maxrss_to_mb(maxrss: float) -> float:
+    # ru_maxrss 在 Linux 是 KB，在 macOS 是 bytes
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+if __name__ == "__main__":
+    # python sandbox.py memory_mb cpu_seconds process_headroom open_files -- command... (see limited_command)
+    _separator = sys.argv.index("--")
+    apply_resource_limits(*(int(value) for value in sys.argv[1:_separator]))
+    _command = sys.argv[_separator + 1:]
+    os.execv(_command[0], _command)
@@ -0,0 +1,431 @@
+"""
+Deterministic Arcade 3.0 checks on the game's AST (the mechanical part of LOGIC_REVIEW_PROMPT).
+
+Every rule is a function ``rule(context) -> Iterable[Diagnostic]`` registered in RULES; the context knows under
+which names ``arcade`` (``import arcade as arc``, ``from arcade import Texture``) is visible in the file.
+Arcade rules are skipped for files that do not import arcade at all (a pygame game, a helper module).
+A whole game is checked in a few milliseconds, with the line number of every problem, so the fixer gets a
+precise error message without an LLM round trip.
+"""
+import ast
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from config import config
+from src.testing.arcade_api import get_arcade_api
+
+
+@dataclass
+class Diagnostic:
+    rule: str
+    line: int
+    col: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"line {self.line}: [{self.rule}] {self.message}"
+
+
+class ModuleContext:
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        # 綁定到 arcade 模組本身的名稱 (import arcade / import arcade as arc)
+        self.arcade_aliases: Set[str] = set()
+        # from arcade import X as Y -> {"Y": "X"}
+        self.arcade_names: Dict[str, str] = {}
+        # 任何形式的 arcade import (包含 import arcade.gui / from arcade.math import ...)
+        self.imports_arcade = False
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name.split(".")[0] != "arcade":
+                        continue
+                    self.imports_arcade = True
+                    # import arcade.gui 也會綁定 arcade；import arcade.gui as gui 則不會
+                    if alias.name == "arcade" or alias.asname is None:
+                        self.arcade_aliases.add(alias.asname or "arcade")
+            elif isinstance(node, ast.ImportFrom) and node.module and node.module.split(".")[0] == "arcade":
+                self.imports_arcade = True
+                if node.module == "arcade":
+                    for alias in node.names:
+                        self.arcade_names[alias.asname or alias.name] = alias.name
+
+    def arcade_attr(self, node: ast.AST) -> Optional[str]:
+        """The arcade attribute ``node`` refers to (``arcade.X`` or a name imported from arcade), else None."""
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) \
+                and node.value.id in self.arcade_aliases:
+            return node.attr
+        if isinstance(node, ast.Name):
+            return self.arcade_names.get(node.id)
+        return None
+
+    def arcade_calls(self, name: str) -> Iterable[ast.Call]:
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Call) and self.arcade_attr(node.func) == name:
+                yield node
+
+
+Rule = Callable[[ModuleContext], Iterable[Diagnostic]]
+RULES: List[Rule] = []
+
+
+def rule(func: Optional[Rule] = None, *, arcade: bool = True):
+    """
+    Register a rule. ``@rule`` rules check Arcade usage and only run on files that import arcade;
+    ``@rule(arcade=False)`` rules run on every file.
+    """
+    def register(check: Rule) -> Rule:
+        check.arcade_only = arcade
+        RULES.append(check)
+        return check
+    return register(func) if func is not None else register
+
+
+def _diagnostic(name: str, node: ast.AST, message: str) -> Diagnostic:
+    return Diagnostic(name, node.lineno, node.col_offset, message)
+
+
+# Arcade 2.x 的繪圖函式 -> 3.0 的寫法
+OLD_DRAW_API = {
+    "draw_rectangle_filled": "arcade.draw_rect_filled(arcade.XYWH(x, y, w, h), color)",
+    "draw_rectangle_outline": "arcade.draw_rect_outline(arcade.XYWH(x, y, w, h), color, border_width)",
+    "draw_lrtb_rectangle_filled": "arcade.draw_lrbt_rectangle_filled(left, right, bottom, top, color)",
+    "draw_lrtb_rectangle_outline": "arcade.draw_lrbt_rectangle_outline(left, right, bottom, top, color)",
+    "draw_xywh_rectangle_filled": "arcade.draw_rect_filled(arcade.LBWH(left, bottom, w, h), color)",
+    "draw_xywh_rectangle_outline": "arcade.draw_rect_outline(arcade.LBWH(left, bottom, w, h), color)",
+    "draw_texture_rectangle": "arcade.draw_texture_rect(texture, arcade.XYWH(x, y, w, h))",
+    "draw_lrwh_rectangle_textured": "arcade.draw_texture_rect(texture, arcade.LBWH(left, bottom, w, h))",
+}
+
+
+@rule
+def old_draw_api(context: ModuleContext) -> Iterable[Diagnostic]:
+    for node in ast.walk(context.tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "arcade":
+            for alias in node.names:
+                if alias.name in OLD_DRAW_API:
+                    yield _diagnostic("old-draw-api", node,
+                                      f"`from arcade import {alias.name}`: it was removed in Arcade 3.0, "
+                                      f"use `{OLD_DRAW_API[alias.name]}`")
+            continue
+        name = context.arcade_attr(node) if isinstance(node, (ast.Attribute, ast.Name)) else None
+        if name in OLD_DRAW_API:
+            yield _diagnostic("old-draw-api", node,
+                              f"`arcade.{name}` was removed in Arcade 3.0, use `{OLD_DRAW_API[name]}`")
+
+
+@rule
+def start_render(context: ModuleContext) -> Iterable[Diagnostic]:
+    # 模組層級的 start_render() ... finish_render() (靜態繪圖腳本) 是合法的，只檢查函式 / 方法中的呼叫
+    in_functions = {id(call) for function in ast.walk(context.tree)
+                    if isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef))
+                    for call in ast.walk(function)}
+    for node in context.arcade_calls("start_render"):
+        if id(node) not in in_functions:
+            continue
+        yield _diagnostic("start-render", node,
+                          "`arcade.start_render()` may only be called once per program in Arcade 3.0 (static drawing "
+                          "scripts); in `on_draw` call `self.clear()` instead")
+
+
+@rule
+def texture_name_argument(context: ModuleContext) -> Iterable[Diagnostic]:
+    for node in context.arcade_calls("Texture"):
+        first = node.args[0] if node.args else None
+        is_name = isinstance(first, ast.JoinedStr) or (isinstance(first, ast.Constant) and isinstance(first.value, str))
+        if is_name or len(node.args) > 1:
+            yield _diagnostic("texture-name-arg", node,
+                              "Arcade 3.0 `Texture(image)` takes the image as its only positional argument: "
+                              "change `arcade.Texture(\"name\", image)` to `arcade.Texture(image)`")
+
+
+def _arcade_reference(context: ModuleContext, node: ast.AST) -> Optional[tuple[str, str]]:
+    """(module, name) for ``arcade.name``, ``arcade.<submodule>.name`` or a name imported from arcade, else None."""
+    name = context.arcade_attr(node)
+    if name is not None:
+        return "arcade", name
+    if isinstance(node, ast.Attribute):
+        submodule = context.arcade_attr(node.value)
+        if submodule is not None:
+            return f"arcade.{submodule}", node.attr
+    return None
+
+
+# 已有專屬規則 (訊息更具體) 的名稱，arcade_api_symbols 不重複回報
+DEDICATED_RULE_NAMES = {"Texture", "start_render", *OLD_DRAW_API}
+
+
+@rule
+def arcade_api_symbols(context: ModuleContext) -> Iterable[Diagnostic]:
+    """
+    Check ``arcade.*`` attribute access and calls against the Arcade 3.0 symbol table (arcade_api.py):
+    names that do not exist (with close matches), 2.x names removed in 3.0, and calls whose arguments cannot bind
+    to the function's signature.
+    """
+    api = get_arcade_api()
+    if api is None:
+        return
+
+    def unknown(module: str, name: str, node: ast.AST) -> Optional[Diagnostic]:
+        if module == "arcade" and name in api.removed:
+            return _diagnostic("removed-api", node, f"`arcade.{name}` was removed in Arcade 3.0, "
+                                                    f"use {api.removed[name]}")
+        if api.has(module, name):
+            return None
+        close = api.suggestions(module, name)
+        hint = f" Did you mean {', '.join(f'`{module}.{match}`' for match in close)}?" if close else ""
+        return _diagnostic("unknown-arcade-attr", node,
+                           f"`{module}.{name}` does not exist in Arcade {api.version}.{hint}")
+
+    for node in ast.walk(context.tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.split(".")[0] == "arcade" \
+                and api.has_module(node.module):
+            for alias in node.names:
+                if alias.name != "*" and not (node.module == "arcade" and alias.name in DEDICATED_RULE_NAMES):
+                    diagnostic = unknown(node.module, alias.name, node)
+                    if diagnostic is not None:
+                        yield diagnostic
+        elif isinstance(node, ast.Attribute):
+            reference = _arcade_reference(context, node)
+            if reference is None or not api.has_module(reference[0]) or reference[1] in DEDICATED_RULE_NAMES:
+                continue
+            diagnostic = unknown(*reference, node)
+            if diagnostic is not None:
+                yield diagnostic
+        elif isinstance(node, ast.Call):
+            reference = _arcade_reference(context, node.func)
+            if reference is None or reference[1] in DEDICATED_RULE_NAMES:
+                continue
+            signature = api.signature(*reference)
+            if signature is None:
+                continue
+            problem = signature.check_call(
+                positional=sum(not isinstance(arg, ast.Starred) for arg in node.args),
+                keywords=[keyword.arg for keyword in node.keywords if keyword.arg is not None],
+                star_args=any(isinstance(arg, ast.Starred) for arg in node.args),
+                star_kwargs=any(keyword.arg is None for keyword in node.keywords)
+            )
+            if problem is not None:
+                yield _diagnostic("arcade-call-arity", node, f"`{reference[0]}.{reference[1]}()` {problem}")
+
+
+# arcade 中 update() 會被 SpriteList.update 以 delta_time 呼叫的 Sprite 類別
+ARCADE_SPRITE_CLASSES = {
+    "BasicSprite", "Sprite", "SpriteCircle", "SpriteSolidColor", "TextureAnimationSprite", "AnimatedWalkingSprite",
+}
+
+
+def _positional_params(function: ast.FunctionDef) -> int:
+    return len(function.args.posonlyargs) + len(function.args.args)
+
+
+@rule
+def update_without_delta_time(context: ModuleContext) -> Iterable[Diagnostic]:
+    """
+    ``SpriteList.update()`` calls ``sprite.update(delta_time)`` and the window / view calls ``on_update(delta_time)``
+    in Arcade 3.0, so these methods (``update`` of Sprite subclasses, any ``on_update``) must accept one argument
+    besides ``self``.
+    """
+    classes = [node for node in ast.walk(context.tree) if isinstance(node, ast.ClassDef)]
+    # 直接或間接繼承 arcade Sprite 的類別 (同一檔案內的 class Player(Character), class Character(arcade.Sprite))；
+    # pygame.sprite.Sprite、SpriteList 的子類別不算
+    sprites: Set[str] = set()
+
+    def is_sprite_base(base: ast.expr) -> bool:
+        if context.arcade_attr(base) in ARCADE_SPRITE_CLASSES:
+            return True
+        return isinstance(base, ast.Name) and base.id in sprites
+
+    changed = True
+    while changed:
+        changed = False
+        for node in classes:
+            if node.name not in sprites and any(is_sprite_base(base) for base in node.bases):
+                sprites.add(node.name)
+                changed = True
+
+    for node in classes:
+        for item in node.body:
+            if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) or item.args.vararg is not None:
+                continue
+            # 一般類別自己呼叫的 update() 不受影響，只檢查 Sprite 的 update (SpriteList.update 會傳 delta_time)
+            if item.name == "update" and node.name not in sprites:
+                continue
+            if item.name in ("update", "on_update") and _positional_params(item) < 2:
+                yield _diagnostic("update-delta-time", item,
+                                  f"`{node.name}.{item.name}(self)` does not accept `delta_time`, Arcade 3.0 calls it "
+                                  f"with one; use `def {item.name}(self, delta_time: float = 1/60):`")
+
+
+def _grid_cell(node: ast.AST) -> Optional[ast.Subscript]:
+    """``grid[r][c]`` (a subscript of a subscript), else None."""
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Subscript):
+        return node
+    return None
+
+
+def _grid_base(cell: ast.Subscript) -> str:
+    return ast.unparse(cell.value.value)
+
+
+def _nullable_grids(tree: ast.Module) -> Set[str]:
+    """Containers (source text of the ``grid`` expression) that are built with or assigned ``None`` cells."""
+    grids = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                and node.func.attr in ("append", "extend", "insert"):
+            # grid.append([None] * cols)
+            if any(isinstance(child, ast.Constant) and child.value is None for arg in node.args for child in ast.walk(arg)):
+                grids.add(ast.unparse(node.func.value))
+            continue
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        has_none = any(isinstance(child, ast.Constant) and child.value is None for child in ast.walk(value))
+        if not has_none:
+            continue
+        for target in targets:
+            cell = _grid_cell(target)
+            if cell is not None:
+                grids.add(_grid_base(cell))  # grid[r][c] = None
+            elif not (isinstance(value, ast.Constant) and value.value is None):
+                grids.add(ast.unparse(target))  # grid = [[None] * cols for _ in range(rows)]
+    return grids
+
+
+def _guards(test: ast.AST, negated: bool = False) -> Set[str]:
+    """Cells (source text) known to be non-None when ``test`` is true (false when ``negated``)."""
+    if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+        return _guards(test.operand, not negated)
+    if isinstance(test, ast.BoolOp):
+        # a and b 為真 -> 兩者皆真；a or b 為假 -> 兩者皆假
+        if isinstance(test.op, ast.And) != negated:
+            return set().union(*(_guards(value, negated) for value in test.values))
+        return set()
+    if isinstance(test, ast.Compare):
+        if len(test.ops) != 1:
+            return set()
+        left, right = test.left, test.comparators[0]
+        # None != grid[r][c] 與 grid[r][c] != None 相同
+        if isinstance(left, ast.Constant) and left.value is None:
+            left, right = right, left
+        if isinstance(right, ast.Constant) and right.value is None:
+            # == / != None 與 is / is not None 視為相同的檢查
+            if isinstance(test.ops[0], (ast.IsNot, ast.NotEq) if not negated else (ast.Is, ast.Eq)):
+                return {ast.unparse(left)}
+        return set()
+    if negated:
+        return set()
+    if isinstance(test, ast.Call) and isinstance(test.func, ast.Name) and test.func.id == "isinstance" and test.args:
+        return {ast.unparse(test.args[0])}
+    return {ast.unparse(test)}  # if grid[r][c]:
+
+
+def _exits(body: List[ast.stmt]) -> bool:
+    return bool(body) and isinstance(body[-1], (ast.Return, ast.Continue, ast.Break, ast.Raise))
+
+
+class _GridAccessVisitor:
+    def __init__(self, nullable: Set[str]):
+        self.nullable = nullable
+        self.findings: List[ast.Attribute] = []
+
+    def statements(self, body: List[ast.stmt], guarded: Set[str]) -> None:
+        guarded = set(guarded)
+        for statement in body:
+            self.node(statement, guarded)
+            # if grid[r][c] is None: continue  -> 之後的敘述都受保護
+            if isinstance(statement, ast.If) and _exits(statement.body):
+                guarded |= _guards(statement.test, negated=True)
+
+    def node(self, node: ast.AST, guarded: Set[str]) -> None:
+        if isinstance(node, (ast.If, ast.While)):
+            self.node(node.test, guarded)
+            self.statements(node.body, guarded | _guards(node.test))
+            self.statements(node.orelse, guarded | _guards(node.test, negated=True))
+            return
+        if isinstance(node, ast.IfExp):
+            self.node(node.test, guarded)
+            self.node(node.body, guarded | _guards(node.test))
+            self.node(node.orelse, guarded | _guards(node.test, negated=True))
+            return
+        if isinstance(node, ast.BoolOp):
+            current = set(guarded)
+            for value in node.values:
+                self.node(value, current)
+                current |= _guards(value, negated=isinstance(node.op, ast.Or))
+            return
+        if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+            current = set(guarded)
+            for generator in node.generators:
+                self.node(generator.iter, current)
+                for condition in generator.ifs:
+                    self.node(condition, current)
+                    current |= _guards(condition)
+            for element in (node.key, node.value) if isinstance(node, ast.DictComp) else (node.elt,):
+                self.node(element, current)
+            return
+        if isinstance(node, ast.Attribute):
+            cell = _grid_cell(node.value)
+            if cell is not None and _grid_base(cell) in self.nullable and ast.unparse(cell) not in guarded:
+                self.findings.append(node)
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list) and value and isinstance(value[0], ast.stmt):
+                self.statements(value, guarded)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.node(item, guarded)
+            elif isinstance(value, ast.AST):
+                self.node(value, guarded)
+
+
+@rule(arcade=False)
+def unguarded_grid_access(context: ModuleContext) -> Iterable[Diagnostic]:
+    """
+    ``grid[r][c].attr`` on a grid that can hold None cells, without an ``is not None`` / ``!= None`` (or truthiness)
+    check in an enclosing ``if`` / ``and`` / conditional expression or an earlier ``if grid[r][c] is None: continue``.
+    """
+    nullable = _nullable_grids(context.tree)
+    if not nullable:
+        return
+    visitor = _GridAccessVisitor(nullable)
+    visitor.statements(context.tree.body, set())
+    for node in visitor.findings:
+        cell = ast.unparse(node.value)
+        yield _diagnostic("unguarded-grid-access", node,
+                          f"`{ast.unparse(node)}` but `{cell}` can be None; use "
+                          f"`if {cell} is not None and {ast.unparse(node)}...`")
+
+
+def run_static_rules(code: str) -> List[Diagnostic]:
+    """
+    Run the rules in RULES on ``code`` (which must parse; see static_code_check); the Arcade rules only when the
+    file imports arcade.
+    :return: the diagnostics, sorted by position
+    :rtype: List[Diagnostic]
+    """
+    context = ModuleContext(ast.parse(code))
+    checks = [check for check in RULES if context.imports_arcade or not check.arcade_only]
+    diagnostics = [diagnostic for check in checks for diagnostic in check(context)]
+    return sorted(diagnostics, key=lambda d: (d.line, d.col, d.rule))
+
+
+def static_rules_check(file_path: str) -> tuple[bool, str]:
+    """
+    Same contract as static_code_check: (passed, error message listing every diagnostic with its line).
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        code = f.read()
+    diagnostics = run_static_rules(code)
+    if not diagnostics:
+        return True, ""
+    shown = diagnostics[:config.STATIC_RULES_MAX_DIAGNOSTICS]
+    lines = [f"FAIL: Arcade 3.0 static check found {len(diagnostics)} problem(s) in {file_path}:"]
+    lines += [str(diagnostic) for diagnostic in shown]
+    if len(diagnostics) > len(shown):
+        lines.append(f"... and {len(diagnostics) - len(shown)} more")
+    return False, "\n".join(lines)
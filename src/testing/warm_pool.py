@@ -0,0 +1,169 @@
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from config import config
+from src.testing.fork_server import EXIT_CODE, HEADER, PID, READY, recv_exact
+
+FORK_SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fork_server.py")
+
+# 只在 fork server 啟動 (import 預載模組) 時生效的設定：ARCADE_HEADLESS 在 import arcade 時就決定了
+_SERVER_ENV = {"SDL_AUDIODRIVER": "dummy", "SDL_VIDEODRIVER": "dummy"}
+
+
+class WarmProcess:
+    """
+    The part of ``subprocess.Popen`` that the fuzzer uses, for a process forked by the fork server,
+    plus the read ends of its heartbeat, stdout and stderr pipes (owned by the caller).
+    The process is a child of the server, so its exit code arrives on a status socket instead of from waitpid.
+    """
+
+    def __init__(self, pid: int, status: socket.socket, heartbeat_fd: int, stdout_fd: int, stderr_fd: int):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self.heartbeat_fd = heartbeat_fd
+        self.stdout_fd = stdout_fd
+        self.stderr_fd = stderr_fd
+        self._status = status
+
+    def _read_status(self, timeout: Optional[float]) -> Optional[int]:
+        if self.returncode is None:
+            readable, _, _ = select.select([self._status], [], [], timeout)
+            if readable:
+                data = recv_exact(self._status, EXIT_CODE.size)
+                # 沒有 exit code 就斷線：fork server 已經結束 (它會先 kill 所有子行程)
+                self.returncode = EXIT_CODE.unpack(data)[0] if len(data) == EXIT_CODE.size else -signal.SIGKILL
+                self._status.close()
+        return self.returncode
+
+    def poll(self) -> Optional[int]:
+        return self._read_status(0)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        return self._read_status(timeout)
+
+    def kill(self) -> None:
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+class WarmInterpreterPool:
+    """
+    A fork server (fork_server.py) that has already imported the heavy game libraries (pygame, arcade, pymunk, PIL).
+    Every fuzz run is forked from it, so it starts in a fresh process (own memory, env, cwd-relative imports,
+    resource limits) without paying the import cost (a second or more) again. The server is a separate script,
+    so a fork never re-imports the web server's ``__main__`` (as a ``multiprocessing`` forkserver child would).
+    """
+
+    def __init__(self, preload: List[str], limits: tuple = (0, 0), headless_arcade: bool = True):
+        """
+        :param limits: arguments of apply_resource_limits, applied in every forked process
+        :type limits: tuple
+        """
+        self.preload = preload
+        self.limits = limits
+        self._lock = threading.Lock()
+
+        # server 自己的環境變數 (dummy driver 等)，不修改這個多執行緒 process 的 os.environ
+        server_env = {**os.environ, **_SERVER_ENV}
+        if headless_arcade:
+            server_env["ARCADE_HEADLESS"] = "1"
+        self._start_server(server_env)
+
+    def _start_server(self, server_env: Dict[str, str]) -> None:
+        self._control, server_socket = socket.socketpair()
+        try:
+            self._server = subprocess.Popen(
+                [sys.executable, FORK_SERVER_PATH, str(server_socket.fileno()),
+                 json.dumps({"preload": self.preload, "limits": list(self.limits)})],
+                env=server_env,
+                stdin=subprocess.DEVNULL,
+                pass_fds=(server_socket.fileno(),)
+            )
+        finally:
+            server_socket.close()
+        # 等預載模組 import 完成
+        if recv_exact(self._control, len(READY)) != READY:
+            self._server.wait()
+            raise RuntimeError(f"Warm pool fork server exited during start-up (exit code {self._server.returncode})")
+        print(f"🔥 [Warm Pool] fork server ready (preload: {', '.join(self.preload)})")
+
+    def popen(self, command: List[str], env: Dict[str, str]) -> WarmProcess:
+        """
+        Start ``command`` (``[python, script, *args]``) in a process forked by the warm server.
+        The child gets a heartbeat pipe in FUZZ_HEARTBEAT_FD and its stdout / stderr are piped back.
+        """
+        # heartbeat、stdout、stderr 三條 pipe：(讀取端, 寫入端)
+        pipes = [os.pipe() for _ in range(3)]
+        status, server_status = socket.socketpair()
+        body = json.dumps({"command": command, "env": env, "cwd": os.getcwd()}).encode("utf-8")
+        try:
+            with self._lock:
+                socket.send_fds(self._control, [HEADER.pack(len(body))],
+                                [server_status.fileno(), *(write for _, write in pipes)])
+                self._control.sendall(body)
+        except OSError:
+            status.close()
+            for read, _ in pipes:
+                os.close(read)
+            raise
+        finally:
+            # server 已收到自己的副本，這裡只保留讀取端
+            server_status.close()
+            for _, write in pipes:
+                os.close(write)
+
+        data = recv_exact(status, PID.size)
+        if len(data) != PID.size:
+            status.close()
+            for read, _ in pipes:
+                os.close(read)
+            raise RuntimeError("Warm pool fork server is not running")
+        return WarmProcess(PID.unpack(data)[0], status, *(read for read, _ in pipes))
+
+    def close(self) -> None:
+        """Stop the fork server (it kills the processes it still runs)."""
+        self._control.close()
+        self._server.wait()
+
+
+def resource_limits() -> tuple:
+    """The configured apply_resource_limits arguments for a fuzz run."""
+    return (
+        config.FUZZER_MEMORY_LIMIT_MB,
+        config.FUZZER_CPU_LIMIT_SECONDS,
+        config.FUZZER_PROCESS_HEADROOM,
+        config.FUZZER_MAX_OPEN_FILES
+    )
+
+
+_pool: Optional[WarmInterpreterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_warm_pool() -> Optional[WarmInterpreterPool]:
+    """
+    Return the process-wide warm pool (the fork server starts on first use), or None when FUZZER_WARM_POOL is off
+    or the platform cannot pass fds over Unix sockets (Windows).
+    """
+    global _pool
+    if not config.FUZZER_WARM_POOL or os.name != "posix" or not hasattr(socket, "send_fds"):
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WarmInterpreterPool(
+                    preload=[name.strip() for name in config.FUZZER_WARM_POOL_PRELOAD.split(",") if name.strip()],
+                    limits=resource_limits(),
+                    headless_arcade=config.FUZZER_ARCADE_HEADLESS
+                )
+    return _pool
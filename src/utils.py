@@ -1,11 +1,21 @@
+import asyncio
 import openai
+import httpx
 import requests
 import json
+import threading
+import time
+import weakref
+from requests.adapters import HTTPAdapter
 from config import config
+from src.llm_cache import LLMResponseCache, get_llm_cache
 from src.generation.arcade_tools import get_arcade_3_0_api_conventions, search_arcade_kb
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Iterator, TypeVar, Union
 
-from src.rag_service.rag import RagService
+T = TypeVar("T")
+
+# Streaming callback：每收到一段 token delta 就呼叫一次
+DeltaCallback = Callable[[str], None]
 
 
 def get_client_config(provider: str) -> dict | None:
@@ -44,27 +54,317 @@ def get_client_config(provider: str) -> dict | None:
     return None
 
 
-def call_google_gemini(
+# --- Event Loop Bridge ---
+# 整條生成流程以 asyncio 實作；同步 API 則把 coroutine 丟到一個常駐的背景 event loop 執行，
+# 這樣同步呼叫也能共用同一組 async client 與連線池，且在已經有 running loop 的環境下也能使用。
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_thread: Optional[threading.Thread] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    取得 (必要時啟動) 供同步 wrapper 使用的背景 event loop
+    """
+    global _background_loop, _background_thread
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            _background_thread = threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True)
+            _background_thread.start()
+            _background_loop = loop
+    return _background_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run the given coroutine on the background event loop and block until it finishes.
+    :param coro: The coroutine to run
+    :type coro: Awaitable[T]
+
+    :return: The result of the coroutine
+    :rtype: T
+    """
+    loop = get_background_loop()
+    if threading.current_thread() is _background_thread:
+        raise RuntimeError("run_sync() cannot be called from the background event loop; await the async API instead.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def iter_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Turn an async generator into a blocking generator (driven by the background event loop).
+    :param agen: The async generator
+    :type agen: AsyncIterator[T]
+
+    :return: A blocking generator yielding the same items
+    :rtype: Iterator[T]
+    """
+    try:
+        while True:
+            try:
+                yield run_sync(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(agen.aclose())
+
+
+async def astream_deltas(func: Callable[..., Awaitable[T]], *args, **kwargs) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Run ``func(*args, on_delta=..., **kwargs)`` and stream what it produces.
+    Yields ("delta", text) for every streamed token delta, then ("result", return value) once at the end.
+    If the consumer stops early, the underlying task is cancelled.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(func(*args, on_delta=queue.put_nowait, **kwargs))
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield "delta", getter.result()
+            else:
+                getter.cancel()
+        while not queue.empty():
+            yield "delta", queue.get_nowait()
+        yield "result", task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def format_sse(message: str, event: Optional[str] = None) -> str:
+    """
+    Format a (possibly multi-line) message as one Server-Sent Event.
+    """
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in message.split("\n")]
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_sse(message: str) -> tuple[Optional[str], str]:
+    """
+    Parse one Server-Sent Event produced by format_sse back into (event, data).
+    """
+    event = None
+    data_lines = []
+    for line in message.rstrip("\n").split("\n"):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data_lines.append(line[len("data: "):])
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):])
+    return event, "\n".join(data_lines)
+
+
+def _track_first_token(on_delta: Optional[DeltaCallback], label: str) -> Optional[DeltaCallback]:
+    """
+    包一層 on_delta，在收到第一個 token 時印出 time-to-first-token
+    """
+    if on_delta is None:
+        return None
+    started = time.perf_counter()
+    first = True
+
+    def wrapper(delta: str) -> None:
+        nonlocal first
+        if first:
+            first = False
+            print(f"⏱️ [{label}] time-to-first-token: {time.perf_counter() - started:.2f}s")
+        on_delta(delta)
+
+    return wrapper
+
+
+# --- Client Registry ---
+# 以 (provider, base_url, api_key) 為 key，在整個 process 內共用同一個 client 與其連線池，
+# 避免每次呼叫 LLM 都重新建立 TCP/TLS 連線。
+_client_registry: Dict[tuple, Any] = {}
+_client_registry_lock = threading.Lock()
+
+# Async client 與 semaphore 綁定在建立它們的 event loop 上，因此以 loop 再分一層
+_loop_registry: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
+
+
+def get_pooled_client(provider: str, base_url: Optional[str], api_key: Optional[str], factory) -> Any:
+    """
+    Return the process-wide client registered under (provider, base_url, api_key).
+    The client is created by ``factory`` on first use (thread-safe).
+    :param provider: The LLM service provider
+    :type provider: str
+
+    :param base_url: The base url of the service
+    :type base_url: Optional[str]
+
+    :param api_key: The api key of the service
+    :type api_key: Optional[str]
+
+    :param factory: A zero-argument callable that builds the client
+    :type factory: Callable[[], Any]
+
+    :return: The shared client
+    :rtype: Any
+    """
+    key = (provider, base_url, api_key)
+    client = _client_registry.get(key)
+    if client is None:
+        with _client_registry_lock:
+            client = _client_registry.get(key)
+            if client is None:
+                client = factory()
+                _client_registry[key] = client
+    return client
+
+
+def get_loop_client(provider: str, base_url: Optional[str], api_key: Optional[str], factory) -> Any:
+    """
+    Same as get_pooled_client, but scoped to the running event loop (for async clients).
+    """
+    loop = asyncio.get_running_loop()
+    with _client_registry_lock:
+        clients = _loop_registry.setdefault(loop, {})
+        key = (provider, base_url, api_key)
+        if key not in clients:
+            clients[key] = factory()
+        return clients[key]
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.LLM_POOL_MAXSIZE,
+        max_keepalive_connections=config.LLM_POOL_MAXSIZE,
+        keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY
+    )
+
+
+def get_async_openai_client(provider: str, base_url: Optional[str], api_key: Optional[str]) -> openai.AsyncOpenAI:
+    """
+    取得共用的 OpenAI 相容 async client (keep-alive 連線池)
+    """
+    def factory() -> openai.AsyncOpenAI:
+        http_client = openai.DefaultAsyncHttpxClient(limits=_pool_limits())
+        return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+    return get_loop_client(provider, base_url, api_key, factory)
+
+
+def get_async_http_client(provider: str, base_url: Optional[str], api_key: Optional[str]) -> httpx.AsyncClient:
+    """
+    取得共用的 httpx.AsyncClient (keep-alive 連線池)，供 Ollama 原生 API 使用
+    """
+    def factory() -> httpx.AsyncClient:
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        return httpx.AsyncClient(headers=headers, limits=_pool_limits())
+
+    return get_loop_client(provider, base_url, api_key, factory)
+
+
+def get_provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """
+    每個 provider 同時進行中的請求上限 (LLM_MAX_CONCURRENT_REQUESTS)，
+    讓大量並行的生成任務受限於 provider 的 rate limit 而不是 thread 數量。
+    """
+    return get_loop_client(
+        f"semaphore:{provider}", None, None,
+        lambda: asyncio.Semaphore(config.LLM_MAX_CONCURRENT_REQUESTS)
+    )
+
+
+def get_http_session(provider: str, base_url: Optional[str], api_key: Optional[str]) -> requests.Session:
+    """
+    取得共用的 requests.Session (keep-alive 連線池)，供同步的 HTTP 呼叫使用
+    """
+    def factory() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.LLM_POOL_MAXSIZE,
+            pool_maxsize=config.LLM_POOL_MAXSIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Content-Type"] = "application/json"
+        if api_key:
+            session.headers["Authorization"] = f"Bearer {api_key}"
+        return session
+
+    return get_pooled_client(provider, base_url, api_key, factory)
+
+
+def get_gemini_module(api_key: str):
+    """
+    google.generativeai 的設定是全域的，每次 configure 都會重建底層 client，
+    所以只在第一次使用該 api_key 時 configure 一次。
+    """
+    import google.generativeai as genai
+
+    def factory():
+        genai.configure(api_key=api_key)
+        return genai
+
+    return get_pooled_client("google", None, api_key, factory)
+
+
+def get_response_cache(temperature: float) -> Optional[LLMResponseCache]:
+    """
+    回傳可用於此次呼叫的 response cache；未啟用或 temperature 不符合 deterministic 條件時回傳 None
+    """
+    cache = get_llm_cache()
+    if cache is None or not cache.should_cache(temperature):
+        return None
+    return cache
+
+
+def store_response(cache: LLMResponseCache, cache_key: str, value: Any, elapsed: float) -> None:
+    """
+    Write a response to the cache; a failed write (disk full, permissions ...) only logs a warning, the caller
+    still returns the response it already has.
+    """
+    try:
+        cache.set(cache_key, value, elapsed)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"⚠️ [LLM Cache] failed to store response: {e}")
+
+
+async def acall_google_gemini(
         system_prompt: str,
         user_prompt: str,
         model: str,
         temperature: float,
-        max_tokens: int = 8192
+        max_tokens: int = 8192,
+        on_delta: Optional[DeltaCallback] = None
 ) -> str:
     """
     處理 Google Gemini 的特殊邏輯 (需安裝 google-generativeai)
+    有傳入 on_delta 時改用 streaming，每段 delta 都會回呼，最後仍回傳完整文字。
     """
+    api_key: str = config.GOOGLE_API_KEY
+    if not api_key:
+        return "Error: 未設定 GOOGLE_API_KEY"
+
     try:
-        import google.generativeai as genai
+        genai = get_gemini_module(api_key)
     except ImportError:
         return "Error: 請安裝 google-generativeai 套件 (pip install google-generativeai)"
 
-    api_key: str = config.GOOGLE_API_KEY
-    if not api_key:
-        return "Error: 未設定 GOOGLE_API_KEY"
+    cache = get_response_cache(temperature)
+    cache_key = None
+    if cache:
+        cache_key = cache.make_key(
+            "google", model,
+            [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            temperature
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if on_delta and cached:
+                on_delta(cached)
+            return cached
 
     try:
-        genai.configure(api_key=api_key)
 
         generation_config: dict = {
             "temperature": temperature,
@@ -80,18 +380,45 @@ def call_google_gemini(
             system_instruction=system_prompt
         )
 
-        response = gemini_model.generate_content(user_prompt)
-        return response.text
+        started = time.perf_counter()
+        async with get_provider_semaphore("google"):
+            if on_delta:
+                on_delta = _track_first_token(on_delta, f"google/{model}")
+                parts = []
+                response = await gemini_model.generate_content_async(user_prompt, stream=True)
+                async for chunk in response:
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        on_delta(chunk.text)
+                text = "".join(parts)
+            else:
+                response = await gemini_model.generate_content_async(user_prompt)
+                text = response.text
+        if cache:
+            store_response(cache, cache_key, text, time.perf_counter() - started)
+        return text
     except Exception as e:
         return f"Gemini API Error: {str(e)}"
 
 
-def call_ollama(
+def call_google_gemini(
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int = 8192,
+        on_delta: Optional[DeltaCallback] = None
+) -> str:
+    return run_sync(acall_google_gemini(system_prompt, user_prompt, model, temperature, max_tokens=max_tokens, on_delta=on_delta))
+
+
+async def acall_ollama(
         system_prompt: str,
         user_prompt: str,
         model: str,
         temperature: float,
-        num_ctx: int = 4096
+        num_ctx: int = 4096,
+        on_delta: Optional[DeltaCallback] = None
 ) -> str:
 
     print(f"Run ollama (Native API): {model}")
@@ -114,45 +441,85 @@ def call_ollama(
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
-        "stream": False,
+        # 有 on_delta 時使用 NDJSON streaming
+        "stream": on_delta is not None,
         "options": {
             "num_ctx": num_ctx,
             "temperature": temperature
         }
     }
 
-    headers = {
-        "Content-Type": "application/json"
-    }
+    cache = get_response_cache(temperature)
+    cache_key = None
+    if cache:
+        cache_key = cache.make_key("ollama", model, payload["messages"], temperature)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if on_delta and cached:
+                on_delta(cached)
+            return cached
 
-    if config.OLLAMA_API_KEY:
-        headers["Authorization"] = f"Bearer {config.OLLAMA_API_KEY}"
+    # 共用連線池 (headers 已包含 Content-Type 與 Authorization)
+    client = get_async_http_client("ollama", api_url, config.OLLAMA_API_KEY)
 
-    response = ""
+    response = None
 
 
     try:
-        response = requests.post(
-            api_url,
-            json=payload,
-            headers=headers,  # 帶上 headers
-            timeout=300
-        )
-
-        # 檢查是否有 401 (Unauthorized) 或 403 (Forbidden) 等錯誤
-        if response.status_code == 401:
-            return "Ollama Error: 401 Unauthorized. 請檢查 API Key 是否正確。"
-
-        response.raise_for_status()
-
-        result = response.json()
-        return result["message"]["content"]
-
-    except requests.exceptions.RequestException as e:
+        started = time.perf_counter()
+        async with get_provider_semaphore("ollama"):
+            if on_delta:
+                on_delta = _track_first_token(on_delta, f"ollama/{model}")
+                parts = []
+                async with client.stream("POST", api_url, json=payload, timeout=300) as response:
+                    if response.status_code == 401:
+                        return "Ollama Error: 401 Unauthorized. 請檢查 API Key 是否正確。"
+                    response.raise_for_status()
+
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        delta = json.loads(line)["message"]["content"]
+                        if delta:
+                            parts.append(delta)
+                            on_delta(delta)
+                content = "".join(parts)
+            else:
+                response = await client.post(
+                    api_url,
+                    json=payload,
+                    timeout=300
+                )
+
+                # 檢查是否有 401 (Unauthorized) 或 403 (Forbidden) 等錯誤
+                if response.status_code == 401:
+                    return "Ollama Error: 401 Unauthorized. 請檢查 API Key 是否正確。"
+
+                response.raise_for_status()
+
+                result = response.json()
+                content = result["message"]["content"]
+
+        if cache:
+            store_response(cache, cache_key, content, time.perf_counter() - started)
+        return content
+
+    except httpx.HTTPError as e:
         print(f"[Ollama Error] Connection failed: {e}")
         return f"Ollama Error: {str(e)}"
-    except KeyError:
-        return f"Ollama Error: Unexpected response format. {response.text}"
+    except (KeyError, json.JSONDecodeError):
+        return f"Ollama Error: Unexpected response format. {response.text if not on_delta else ''}"
+
+
+def call_ollama(
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        num_ctx: int = 4096,
+        on_delta: Optional[DeltaCallback] = None
+) -> str:
+    return run_sync(acall_ollama(system_prompt, user_prompt, model, temperature, num_ctx=num_ctx, on_delta=on_delta))
 
 
 def execute_tool(tool_name: str, args: dict, rag_instance: Any = None) -> str:
@@ -169,14 +536,69 @@ def execute_tool(tool_name: str, args: dict, rag_instance: Any = None) -> str:
 
     if tool_name == "search_arcade_kb":
         query = args.get("query", "")
-        if not rag_instance:
-            return "Error: RAG instance is not initialized or passed correctly."
+        # 未傳入 rag_instance 時，search_arcade_kb 會 lazy 建立共用的 Arcade 知識庫連線
         return search_arcade_kb(query=query, rag=rag_instance)
 
     return f"Error: Tool '{tool_name}' not found."
 
 
-def call_llm(
+async def _openai_completion(
+        client: openai.AsyncOpenAI,
+        provider: str,
+        kwargs: Dict[str, Any],
+        on_delta: Optional[DeltaCallback] = None
+) -> tuple[str, List[Dict[str, Any]]]:
+    """
+    執行一次 chat completion，回傳 (content, tool_calls)。
+    有 on_delta 時使用 streaming，並把分段送來的 tool call 依 index 組回完整的呼叫。
+    """
+    async with get_provider_semaphore(provider):
+        if not on_delta:
+            response = await client.chat.completions.create(**kwargs)
+            assistant_message = response.choices[0].message
+
+            content = assistant_message.content if assistant_message.content else ""
+            tool_calls_list = []
+            for tc in assistant_message.tool_calls or []:
+                tool_calls_list.append({
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
+                    }
+                })
+            return content, tool_calls_list
+
+        content_parts = []
+        tool_calls_by_index: Dict[int, Dict[str, Any]] = {}
+        stream = await client.chat.completions.create(**kwargs, stream=True)
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+
+            if delta.content:
+                content_parts.append(delta.content)
+                on_delta(delta.content)
+
+            for tc in delta.tool_calls or []:
+                call = tool_calls_by_index.setdefault(tc.index, {
+                    "id": "",
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["function"]["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["function"]["arguments"] += tc.function.arguments
+
+        return "".join(content_parts), [tool_calls_by_index[i] for i in sorted(tool_calls_by_index)]
+
+
+async def acall_llm(
         system_prompt: str,
         user_prompt: str,
         provider: str = "openai",
@@ -185,28 +607,23 @@ def call_llm(
         max_tokens: int = 8192,
         tools: Optional[List[Dict[str, Any]]] = None,
         rag_instance: Any = None,
-        tool_additional_instruction: str = None  # [新增參數] 允許外部注入特定的提醒
+        tool_additional_instruction: str = None,  # [新增參數] 允許外部注入特定的提醒
+        on_delta: Optional[DeltaCallback] = None
 ) -> str:
     """
-    [統一入口] 支援多種 LLM Provider 並整合 Tool Use 迴圈。
+    [統一入口 (async)] 支援多種 LLM Provider 並整合 Tool Use 迴圈。
+    傳入 on_delta 時改用 streaming，每段 token delta 都會即時回呼；回傳值仍是完整文字。
+    (若要以 async iterator 取得 delta，請用 astream_llm)
     """
     provider = provider.lower()
 
     if provider in ["google", "gemini"]:
         if model.startswith("gpt"):
             model = "gemini-2.5-flash-preview-09-2025"
-        try:
-            from src.utils.llm_clients import call_google_gemini
-            return call_google_gemini(system_prompt, user_prompt, model, temperature, max_tokens=max_tokens)
-        except ImportError:
-            return "Error: call_google_gemini not found."
+        return await acall_google_gemini(system_prompt, user_prompt, model, temperature, max_tokens=max_tokens, on_delta=on_delta)
 
     if provider == "ollama":
-        try:
-            from src.utils.llm_clients import call_ollama
-            return call_ollama(system_prompt, user_prompt, model, temperature, num_ctx=8192)
-        except ImportError:
-            return "Error: call_ollama not found."
+        return await acall_ollama(system_prompt, user_prompt, model, temperature, num_ctx=8192, on_delta=on_delta)
 
     openai_config = get_client_config(provider)
     if not openai_config:
@@ -216,7 +633,9 @@ def call_llm(
     base_url = openai_config.get("base_url")
 
     try:
-        client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        client = get_async_openai_client(provider, base_url, api_key)
+        cache = get_response_cache(temperature)
+        on_delta = _track_first_token(on_delta, f"{provider}/{model}")
 
         messages = [
             {"role": "system", "content": system_prompt},
@@ -237,32 +656,38 @@ def call_llm(
                 kwargs["tools"] = tools
                 kwargs["tool_choice"] = "auto"
 
-            response = client.chat.completions.create(**kwargs)
-            assistant_message = response.choices[0].message
+            # Response cache: key 包含目前為止的完整 messages (含 tool transcript)
+            cache_key = cache.make_key(provider, model, messages, temperature, tools) if cache else None
+            cached = cache.get(cache_key) if cache else None
+
+            if cached is not None:
+                content, tool_calls_list = cached["content"], cached["tool_calls"]
+                if on_delta and content:
+                    on_delta(content)
+            else:
+                started = time.perf_counter()
+                content, tool_calls_list = await _openai_completion(client, provider, kwargs, on_delta)
+
+                if cache:
+                    store_response(
+                        cache,
+                        cache_key,
+                        {"content": content, "tool_calls": tool_calls_list},
+                        time.perf_counter() - started
+                    )
 
             # 1. 檢查是否有工具呼叫
-            if not assistant_message.tool_calls:
-                return assistant_message.content if assistant_message.content else ""
+            if not tool_calls_list:
+                return content
 
             # 2. 處理工具呼叫
-            tool_calls_list = []
-            for tc in assistant_message.tool_calls:
-                tool_calls_list.append({
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments
-                    }
-                })
-
             messages.append({
                 "role": "assistant",
-                "content": assistant_message.content or "",
+                "content": content,
                 "tool_calls": tool_calls_list
             })
 
-            # 3. 執行所有工具
+            # 3. 執行所有工具 (工具是同步/阻塞的，丟到 thread 以免卡住 event loop)
             for tc in tool_calls_list:
                 function_name = tc["function"]["name"]
                 try:
@@ -271,7 +696,7 @@ def call_llm(
                     function_args = {}
 
                 print(f"🛠️ [Tool Call] 執行工具: {function_name} | 參數: {function_args}")
-                observation = execute_tool(function_name, function_args, rag_instance=rag_instance)
+                observation = await asyncio.to_thread(execute_tool, function_name, function_args, rag_instance)
                 print(f"   -> Result: {observation[:200]}..." if observation else "   -> Result: (Empty)")
 
                 messages.append({
@@ -299,4 +724,49 @@ def call_llm(
         print(f"[LLM Call Error] Provider: {provider}, Error: {e}")
         return f"LLM Call Error ({provider}): {str(e)}"
 
-    return "Error: Tool loop exceeded limit."
\ No newline at end of file
+    return "Error: Tool loop exceeded limit."
+
+
+async def astream_llm(
+        system_prompt: str,
+        user_prompt: str,
+        **kwargs
+) -> AsyncIterator[str]:
+    """
+    acall_llm 的 streaming 版本：以 async iterator 逐段產出 token delta。
+    kwargs 與 acall_llm 相同 (provider, model, temperature, tools...)。
+    """
+    async for kind, value in astream_deltas(acall_llm, system_prompt, user_prompt, **kwargs):
+        if kind == "delta":
+            yield value
+
+
+def call_llm(
+        system_prompt: str,
+        user_prompt: str,
+        provider: str = "openai",
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.7,
+        max_tokens: int = 8192,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        rag_instance: Any = None,
+        tool_additional_instruction: str = None,
+        stream: bool = False,
+        on_delta: Optional[DeltaCallback] = None
+) -> Union[str, Iterator[str]]:
+    """
+    [統一入口] acall_llm 的同步版本。
+    stream=True 時回傳一個逐段產出 token delta 的 generator。
+    """
+    kwargs = dict(
+        provider=provider,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        tools=tools,
+        rag_instance=rag_instance,
+        tool_additional_instruction=tool_additional_instruction
+    )
+    if stream:
+        return iter_sync(astream_llm(system_prompt, user_prompt, **kwargs))
+    return run_sync(acall_llm(system_prompt, user_prompt, on_delta=on_delta, **kwargs))